@@ -1,17 +1,23 @@
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import logging
 import os
-from typing import Dict, List
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
 import click
-import flask_s3
-import sentry_sdk
 import time
 from feedsearch_crawler import output_opml
 from flask import (
     Flask,
     jsonify,
+    make_response,
     render_template,
     request,
     Response,
@@ -20,27 +26,55 @@ from flask import (
     redirect,
     url_for,
 )
-from flask_assets import Environment, Bundle
-from flask_s3 import FlaskS3
 from marshmallow import ValidationError
-from sentry_sdk.integrations.aiohttp import AioHttpIntegration
-from sentry_sdk.integrations.aws_lambda import AwsLambdaIntegration
-from sentry_sdk.integrations.flask import FlaskIntegration
-from webassets.merge import FileHunk
+from werkzeug.http import is_resource_modified
 from werkzeug.middleware.proxy_fix import ProxyFix
 from yarl import URL
 
-from gateway.dynamodb_client import DynamoDBClient
+from gateway.batch_search import BatchKey, BatchSearch, batch_key
+from gateway.cache import TTLCache
+from gateway.connections import connection_manager
+from gateway.crawl_params import DEFAULT_CRAWL_PARAMS
+from gateway.dynamodb_client import DynamoDBClient, AsyncDynamoDBClient
 from gateway.exceptions import BadRequestError, NotFoundError
+from gateway.metrics import Metrics, metrics_context, set_metric_property, use_metrics
+from gateway.recrawl import (
+    LocalRecrawlQueue,
+    RecrawlQueue,
+    RecrawlRequest,
+    SQSRecrawlQueue,
+    sqs_event_requests,
+)
 from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.compiled_dump import compiled_dump
 from gateway.schema.external_feedinfo_schema import ExternalFeedInfoSchema
 from gateway.schema.external_site_schema import ExternalSiteSchema
 from gateway.schema.sitehost import SiteHost
+from gateway.scoring import SCORE_VERSION
 from gateway.search import SearchRunner
-from gateway.utils import remove_subdomains, validate_query, no_response_from_crawl
+from gateway.timing import PhaseTimer
+from gateway.warmup import run_warm_up
+from gateway.utils import (
+    force_utc,
+    remove_subdomains,
+    validate_query,
+    no_response_from_crawl,
+    validate_fields,
+    validate_limit,
+)
 
 sentry_initialised = False
 
+# Feed fields that can be selected with the fields query parameter.
+FEED_FIELDS: List[str] = list(ExternalFeedInfoSchema._declared_fields)
+
+# Default and maximum number of sites in each page of the sites list.
+SITES_PAGE_LIMIT = 100
+SITES_PAGE_MAX_LIMIT = 1000
+
+# Warning header of responses containing stored feeds that are being crawled again in the background.
+STALE_WARNING = '110 feedsearch "Response is Stale"'
+
 # Adds StreamHandler for local debugging with 'flask run'
 root_logger = logging.getLogger()
 if not root_logger.handlers:
@@ -82,37 +116,182 @@ app.config["DAYS_CHECKED_RECENTLY"] = 7
 app.config["USER_AGENT"] = os.environ.get("USER_AGENT", "")
 app.config["DYNAMODB_TABLE"] = os.environ.get("DYNAMODB_TABLE", "")
 app.config["SENTRY_DSN"] = os.environ.get("SENTRY_DSN", "")
+app.config["FEEDLY_SEARCH_URL"] = os.environ.get(
+    "FEEDLY_SEARCH_URL", "https://cloud.feedly.com/v3/search/feeds"
+)
+app.config["DNS_CACHE_TTL"] = int(os.environ.get("DNS_CACHE_TTL", 300))
+app.config["SITE_CACHE_TTL"] = int(os.environ.get("SITE_CACHE_TTL", 300))
+app.config["SITE_CACHE_MAX_ITEMS"] = int(os.environ.get("SITE_CACHE_MAX_ITEMS", 512))
+app.config["SITE_CACHE_MAX_BYTES"] = int(
+    os.environ.get("SITE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+)
+app.config["RECRAWL_QUEUE_URL"] = os.environ.get("RECRAWL_QUEUE_URL", "")
+app.config["BATCH_SEARCH_MAX_URLS"] = int(os.environ.get("BATCH_SEARCH_MAX_URLS", 500))
+app.config["BATCH_SEARCH_CONCURRENCY"] = int(
+    os.environ.get("BATCH_SEARCH_CONCURRENCY", 10)
+)
+app.config["BATCH_SEARCH_MAX_REQUESTS"] = int(
+    os.environ.get("BATCH_SEARCH_MAX_REQUESTS", 100)
+)
+app.config["BATCH_SEARCH_TIMEOUT"] = float(os.environ.get("BATCH_SEARCH_TIMEOUT", 15))
+# All crawls of a batch share the connection pool, and waits for a connection count against each request's
+# timeout, so the pool has a connection for every request of the concurrent crawls.
+app.config["CONNECTION_POOL_LIMIT"] = int(
+    os.environ.get(
+        "CONNECTION_POOL_LIMIT",
+        DEFAULT_CRAWL_PARAMS.concurrency * app.config["BATCH_SEARCH_CONCURRENCY"],
+    )
+)
+app.config["FEEDLY_CACHE_TTL"] = int(os.environ.get("FEEDLY_CACHE_TTL", 604800))
+app.config["HOST_FAILURE_BACKOFF"] = int(os.environ.get("HOST_FAILURE_BACKOFF", 300))
+app.config["HOST_FAILURE_MAX_BACKOFF"] = int(
+    os.environ.get("HOST_FAILURE_MAX_BACKOFF", 86400)
+)
+app.config["METRICS_NAMESPACE"] = os.environ.get("METRICS_NAMESPACE", "")
+app.config["SERVER_TIMING"] = os.environ.get("SERVER_TIMING", "true").lower() in (
+    "1",
+    "true",
+)
+app.config["ADAPTIVE_CRAWL"] = os.environ.get("ADAPTIVE_CRAWL", "").lower() in (
+    "1",
+    "true",
+)
+app.config["ADAPTIVE_CRAWL_RATE"] = float(os.environ.get("ADAPTIVE_CRAWL_RATE", 1.0))
+app.config["WARM_UP_URLS"] = [
+    warm_up_url.strip()
+    for warm_up_url in os.environ.get(
+        "WARM_UP_URLS", app.config["FEEDLY_SEARCH_URL"]
+    ).split(",")
+    if warm_up_url.strip()
+]
+app.config["WARM_UP_DYNAMODB_THREADS"] = int(
+    os.environ.get("WARM_UP_DYNAMODB_THREADS", 2)
+)
 
 if app.config["DEBUG"]:
     app.config["FLASK_ASSETS_USE_S3"] = False
     app.config["ASSETS_DEBUG"] = True
     app.config["FLASKS3_ACTIVE"] = False
 
+# Flask-S3 only serves static files from S3 when active, so it isn't imported otherwise.
+if app.config["FLASKS3_ACTIVE"]:
+    from flask_s3 import FlaskS3
+
+    s3 = FlaskS3(app)
+
+# Static assets are only used by HTML pages, so they're loaded by the first page rendered, not at startup.
+css_assets = None
+assets_lock = threading.Lock()
+
+
+def init_assets():
+    """
+    Register the CSS bundle with Flask-Assets, and load the built CSS that is inlined in pages.
+    Must be called before a template is first rendered, as templates use the assets extension.
+
+    :return: CSS Bundle
+    """
+    global css_assets
+    if css_assets is not None:
+        return css_assets
+
+    with assets_lock:
+        if css_assets is None:
+            from flask_assets import Environment, Bundle
+            from webassets.merge import FileHunk
+
+            bundle = Bundle(
+                "normalize.css",
+                "skeleton.css",
+                "custom.css",
+                filters="cssmin",
+                output="packed.min.%(version)s.css",
+            )
+
+            assets = Environment(app)
+            assets.manifest = "json"
+            assets.register("css_all", bundle)
+
+            if not app.config["ASSETS_DEBUG"]:
+                css = FileHunk(bundle.resolve_output())
+                app.jinja_env.globals["css_assets_built"] = css.data()
+
+            css_assets = bundle
+    return css_assets
+
+
+def render_page(template: str, **context) -> str:
+    """
+    Render an HTML page, loading the static assets if they haven't been loaded.
+
+    :param template: Template name
+    :param context: Template variables
+    :return: Rendered page
+    """
+    init_assets()
+    return render_template(template, **context)
+
 
-s3 = FlaskS3(app)
+connection_manager.configure(
+    limit=app.config["CONNECTION_POOL_LIMIT"],
+    dns_cache_ttl=app.config["DNS_CACHE_TTL"],
+)
 
-css_assets = Bundle(
-    "normalize.css",
-    "skeleton.css",
-    "custom.css",
-    filters="cssmin",
-    output="packed.min.%(version)s.css",
+site_cache = TTLCache(
+    maxsize=app.config["SITE_CACHE_MAX_ITEMS"],
+    ttl=app.config["SITE_CACHE_TTL"],
+    max_bytes=app.config["SITE_CACHE_MAX_BYTES"],
 )
 
-assets = Environment(app)
-assets.manifest = "json"
-assets.register("css_all", css_assets)
+db_client = DynamoDBClient(app.config.get("DYNAMODB_TABLE"), cache=site_cache)
+async_db_client = AsyncDynamoDBClient(db_client)
+
+
+def run_recrawl(recrawl_request: RecrawlRequest) -> None:
+    """
+    Crawl a site that was returned stale, and save the results.
+
+    :param recrawl_request: RecrawlRequest
+    """
+    with app.app_context():
+        search_runner = SearchRunner(
+            db_client=async_db_client,
+            check_feedly=recrawl_request.check_feedly,
+            force_crawl=False,
+            check_all=recrawl_request.check_all,
+            skip_crawl=False,
+            failure_backoff=app.config["HOST_FAILURE_BACKOFF"],
+            max_failure_backoff=app.config["HOST_FAILURE_MAX_BACKOFF"],
+            feedly_cache_ttl=app.config["FEEDLY_CACHE_TTL"],
+        )
+        start_time = time.perf_counter()
+        search_runner.run_coalesced_search(URL(recrawl_request.url))
+        app.logger.info(
+            "Ran background crawl of %s in %dms",
+            recrawl_request.url,
+            int((time.perf_counter() - start_time) * 1000),
+        )
 
-if not app.config["ASSETS_DEBUG"]:
-    css = FileHunk(css_assets.resolve_output())
-    app.jinja_env.globals["css_assets_built"] = css.data()
 
-db_client = DynamoDBClient(app.config.get("DYNAMODB_TABLE"))
+# Background crawls of stale sites are sent to SQS if a queue is configured. In debug mode they can run in this
+# process, but on AWS Lambda the worker thread is paused after each response, so without a queue stale results
+# aren't returned, and searches crawl as normal.
+recrawl_queue: Optional[RecrawlQueue] = None
+if app.config["RECRAWL_QUEUE_URL"]:
+    recrawl_queue = SQSRecrawlQueue(app.config["RECRAWL_QUEUE_URL"])
+elif app.config["DEBUG"]:
+    recrawl_queue = LocalRecrawlQueue(run_recrawl)
 
 
 def initialise_sentry():
     global sentry_initialised
     if os.environ.get("SENTRY_DSN", "") and not sentry_initialised:
+        # Sentry and its integrations are only imported when a DSN is configured.
+        import sentry_sdk
+        from sentry_sdk.integrations.aiohttp import AioHttpIntegration
+        from sentry_sdk.integrations.aws_lambda import AwsLambdaIntegration
+        from sentry_sdk.integrations.flask import FlaskIntegration
+
         sentry_sdk.init(
             os.environ.get("SENTRY_DSN"),
             integrations=[
@@ -130,16 +309,99 @@ initialise_sentry()
 
 # noinspection PyUnusedLocal
 def unhandled_exceptions(e, event, context):
+    import sentry_sdk
+
     initialise_sentry()
     sentry_sdk.capture_exception(e)
     return True  # Prevent invocation retry
 
 
+# noinspection PyUnusedLocal
+def recrawl_event_handler(event, context):
+    """
+    Run the background crawls sent to the recrawl SQS queue.
+    """
+    for recrawl_request in sqs_event_requests(event):
+        run_recrawl(recrawl_request)
+
+
+# Whether the process has been warmed up, so that warm-ups of new processes can be told apart.
+warmed_up = False
+
+
+def warm_up_schemas() -> int:
+    """
+    Compile the feed dumps of the common field selections.
+
+    :return: Number of dumps compiled
+    """
+    selections = [select_feed_fields([], True, False), [], ["url"]]
+    for fields in selections:
+        dump_feeds([], fields)
+    return len(selections)
+
+
+def warm_up_templates() -> int:
+    """
+    Load the static assets and compile the page templates.
+
+    :return: Number of templates compiled
+    """
+    init_assets()
+    names = app.jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def warm_up() -> Tuple[Dict[str, Any], PhaseTimer]:
+    """
+    Prime the process for its first search without searching: compile the schemas, load the static assets and
+    templates, open the DynamoDB connections, and connect to the hosts of WARM_UP_URLS.
+
+    :return: Tuple of the durations and results of each step, and the PhaseTimer of the steps
+    """
+    global warmed_up
+    cold = not warmed_up
+    timer = PhaseTimer()
+    start_time = time.perf_counter()
+    steps = run_warm_up(
+        {
+            "schemas": warm_up_schemas,
+            "templates": warm_up_templates,
+            "db": lambda: db_client.warm_up(app.config["WARM_UP_DYNAMODB_THREADS"]),
+            "connections": lambda: connection_manager.preconnect(
+                app.config["WARM_UP_URLS"],
+                headers={"user-agent": app.config["USER_AGENT"]},
+            ),
+        },
+        timer,
+    )
+    total_time = int((time.perf_counter() - start_time) * 1000)
+    warmed_up = True
+
+    app.logger.info(
+        "WARM_UP: cold=%s duration=%dms steps=%s", cold, total_time, timer.to_dict()
+    )
+    return {"cold": cold, "total_ms": total_time, "steps": steps}, timer
+
+
+# noinspection PyUnusedLocal
+def warm_up_event_handler(event, context):
+    """
+    Warm up the process when invoked by a scheduled event, such as a Zappa event that replaces keep_warm.
+    """
+    with app.app_context():
+        with metrics_context(app.config["METRICS_NAMESPACE"], "warmup"):
+            result, _ = warm_up()
+    return result
+
+
 @app.errorhandler(BadRequestError)
 @app.errorhandler(NotFoundError)
 def handle_bad_request(error):
     if g.get("return_html", False):
-        return render_template("error.html", name=error.name, message=error.message)
+        return render_page("error.html", name=error.name, message=error.message)
     else:
         response = jsonify(error.to_dict())
         response.status_code = error.status_code
@@ -151,28 +413,96 @@ def handle_exception(e):
     app.logger.exception(e)
     message = "Feedsearch encountered a server error."
     if g.get("return_html", False):
-        return render_template("error.html", name="Server Error", message=message)
+        return render_page("error.html", name="Server Error", message=message)
     else:
         response = jsonify({"error": "Server Error", "message": message})
         response.status_code = 500
         return response
 
 
+def record_metrics(endpoint: str):
+    """
+    Record the metrics of requests to an endpoint, and emit them in Embedded Metric Format when each request
+    finishes. Does nothing unless METRICS_NAMESPACE is set.
+
+    :param endpoint: Name of the endpoint, used as the metrics dimension
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with metrics_context(app.config["METRICS_NAMESPACE"], endpoint):
+                return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 @app.route("/", methods=["GET"])
 def index():
-    return render_template("index.html")
+    return render_page("index.html")
 
 
 @app.route("/api/v1/sites", methods=["GET"])
+@record_metrics("sites_list")
 def list_sites():
     """
     List all site URLs that have saved feed info.
+
+    If a limit or next page token is given, returns a single page of sites and the token of the next page.
+    Otherwise all sites are streamed as they're queried as a JSON array.
+
+    If format is "ndjson", sites are streamed as newline delimited JSON, starting from the next page token if
+    given, and queried in pages of limit sites.
     """
-    sites = db_client.query_sites_list()
-    return jsonify(sites)
+    limit = request.args.get("limit", "", type=str)
+    cursor = request.args.get("next", "", type=str)
+    output_format = request.args.get("format", "json", type=str).lower()
+
+    if output_format not in ("json", "ndjson"):
+        raise BadRequestError(f"Invalid format: '{output_format}'")
+
+    if output_format == "json" and (limit or cursor):
+        limit = validate_limit(limit, SITES_PAGE_LIMIT, SITES_PAGE_MAX_LIMIT)
+        try:
+            sites, next_cursor = db_client.query_sites_page(limit, cursor or None)
+        except ValueError:
+            raise BadRequestError("Invalid next page token.")
+        return jsonify({"sites": sites, "next": next_cursor})
+
+    page_size = validate_limit(limit, SITES_PAGE_MAX_LIMIT, SITES_PAGE_MAX_LIMIT)
+    try:
+        pages = db_client.iter_sites_pages(page_size, cursor or None)
+        # Query the first page before streaming, so that an invalid token returns an error response. The metrics
+        # are emitted when the response is returned, so they only include the first page.
+        first_page = next(pages, [])
+    except ValueError:
+        raise BadRequestError("Invalid next page token.")
+
+    def dumps(site: Dict) -> str:
+        return json.dumps(site, sort_keys=True, separators=(",", ":"))
+
+    def generate_ndjson():
+        for page in itertools.chain([first_page], pages):
+            yield "".join(dumps(site) + "\n" for site in page)
+
+    def generate_json():
+        separator = ""
+        yield "["
+        for page in itertools.chain([first_page], pages):
+            for site in page:
+                yield separator + dumps(site)
+                separator = ","
+        yield "]"
+
+    if output_format == "ndjson":
+        return Response(generate_ndjson(), mimetype="application/x-ndjson")
+    return Response(generate_json(), mimetype="application/json")
 
 
 @app.route("/api/v1/sites/<url>", methods=["GET"])
+@record_metrics("sites")
 def get_site_feeds(url):
     """
     Displays the saved feed info for a site url.
@@ -180,18 +510,28 @@ def get_site_feeds(url):
     :param url: URL of site
     """
     url: str = remove_subdomains(url)
+    fields = validate_fields(request.args.get("fields", "", type=str), FEED_FIELDS)
 
-    site: SiteHost = db_client.query_site_feeds(url)
+    site: SiteHost = db_client.query_site_feeds(url, fields)
 
     if site:
+        validators = response_validators(site.host, site.last_seen, "site", fields)
+        if not_modified := not_modified_response(validators):
+            return not_modified
+
         try:
-            site_schema = ExternalSiteSchema()
+            kwargs = {}
+            if fields:
+                kwargs["only"] = ["host", "last_seen"] + [
+                    f"feeds.{field}" for field in fields
+                ]
+            site_schema = ExternalSiteSchema(**kwargs)
             result = site_schema.dump(site)
         except ValidationError as err:
             app.logger.warning("Dump errors: %s", err.messages)
             return abort(500)
 
-        return jsonify(result)
+        return set_validators(jsonify(result), validators)
     else:
         response = jsonify({"message": f"No feed information saved for url {url}"})
         response.status_code = 402
@@ -204,6 +544,7 @@ def orginal_search_api():
 
 
 @app.route("/api/v1/search", methods=["GET"])
+@record_metrics("search")
 def search_api():
     """
     Returns info about feeds at a URL.
@@ -218,44 +559,77 @@ def search_api():
     force_crawl = str_to_bool(request.args.get("force", "false", type=str))
     check_feedly = str_to_bool(request.args.get("feedly", "true", type=str))
     skip_crawl = str_to_bool(request.args.get("skip_crawl", "false", type=str))
+    stale = str_to_bool(request.args.get("stale", "false", type=str))
 
     g.return_html = return_html
+    # Phases are recorded for the stats and metrics too, but set_server_timing only sends the header if enabled.
+    timer = PhaseTimer(
+        enabled=app.config["SERVER_TIMING"]
+        or show_stats
+        or bool(app.config["METRICS_NAMESPACE"])
+    )
+
+    with timer.phase("validate"):
+        url: URL = validate_query(query)
+        fields = validate_fields(request.args.get("fields", "", type=str), FEED_FIELDS)
+    set_metric_property("host", remove_subdomains(url.host))
 
-    url: URL = validate_query(query)
+    # Feed fields to dump, and only read from the database. HTML and OPML results use all fields.
+    fields = select_feed_fields(fields, info, favicon)
+    projection = None if return_html or return_opml else fields
 
     start_time = time.perf_counter()
 
     search_runner = SearchRunner(
-        db_client=db_client,
+        db_client=async_db_client,
         check_feedly=check_feedly,
         force_crawl=force_crawl,
         check_all=check_all,
         skip_crawl=skip_crawl,
+        fields=projection,
+        stale_while_revalidate=stale,
+        recrawl_queue=recrawl_queue,
+        timer=timer,
+        failure_backoff=app.config["HOST_FAILURE_BACKOFF"],
+        max_failure_backoff=app.config["HOST_FAILURE_MAX_BACKOFF"],
+        feedly_cache_ttl=app.config["FEEDLY_CACHE_TTL"],
     )
-    feed_list: List[CustomFeedInfo] = search_runner.run_search(url)
+    feed_list: List[CustomFeedInfo] = search_runner.run_coalesced_search(url)
     stats = search_runner.crawl_stats
 
-    search_time = int((time.perf_counter() - start_time) * 1000)
+    search_duration = (time.perf_counter() - start_time) * 1000
+    timer.add("search", search_duration)
+    search_time = int(search_duration)
     stats["search_time"] = search_time
     app.logger.info("Ran search of %s in %dms", url, search_time)
 
     if not feed_list and no_response_from_crawl(stats):
         raise NotFoundError(f"No Response from URL: {url}")
 
+    # Responses that only contain feeds can be validated by when the site was last saved. HTML and stats
+    # responses include the search stats, which change on every request.
+    validators = None
+    if not return_html and not show_stats:
+        variant = "opml" if return_opml else "search"
+        validators = response_validators(
+            remove_subdomains(url.host),
+            search_runner.last_modified,
+            variant,
+            fields,
+            url.path_qs,
+        )
+        if not_modified := not_modified_response(validators):
+            if stats.get("stale"):
+                not_modified.headers["Warning"] = STALE_WARNING
+            return set_server_timing(not_modified, timer)
+
     result: Dict = {}
     if feed_list:
         try:
-            kwargs = {}
-            if not info:
-                kwargs["only"] = ["url"]
-            if not favicon:
-                kwargs["exclude"] = ["favicon_data_uri"]
-
-            feed_schema = ExternalFeedInfoSchema(many=True, **kwargs)
-
-            feed_list = sorted(feed_list, key=lambda x: x.score, reverse=True)
+            feed_list = sort_feeds(feed_list)
             dump_start = time.perf_counter()
-            result = feed_schema.dump(feed_list)
+            with timer.phase("dump"):
+                result = dump_feeds(feed_list, fields)
             dump_duration = int((time.perf_counter() - dump_start) * 1000)
             app.logger.debug(
                 "Schema dump: feeds=%d duration=%dms", len(result), dump_duration
@@ -266,21 +640,310 @@ def search_api():
             abort(500)
 
     if show_stats:
-        result = {"feeds": result, "search_time_ms": search_time, "crawl_stats": stats}
+        result = {
+            "feeds": result,
+            "search_time_ms": search_time,
+            "crawl_stats": stats,
+            "timings": timer.to_dict(),
+            "site_cache": db_client.cache_stats(),
+            "connections": connection_manager.stats(),
+        }
+
+    if stats.get("stale"):
+        app.logger.info("Returned stale feeds of %s", url)
 
     if return_html:
-        return render_template(
-            "results.html",
-            feeds=feed_list,
-            json=get_pretty_print(result),
-            url=url,
-            stats=get_pretty_print(stats),
+        response = make_response(
+            render_page(
+                "results.html",
+                feeds=feed_list,
+                json=get_pretty_print(result),
+                url=url,
+                stats=get_pretty_print(stats),
+            )
         )
+        return set_server_timing(response, timer, show_stats)
     elif return_opml:
         opml_result = output_opml(feed_list).decode("utf-8")
-        return Response(opml_result, mimetype="text/xml")
+        response = Response(opml_result, mimetype="text/xml")
+    else:
+        response = jsonify(result)
+
+    if stats.get("stale"):
+        response.headers["Warning"] = STALE_WARNING
+    set_server_timing(response, timer, show_stats)
+    return set_validators(response, validators)
 
-    return jsonify(result)
+
+@app.route("/api/v1/search/batch", methods=["POST"])
+def batch_search_api():
+    """
+    Searches many URLs in one request, streaming the result of each URL as newline delimited JSON as soon as
+    its search finishes.
+
+    The request body is a JSON object with a "urls" list, and optional search options with the same names
+    as the search query parameters.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise BadRequestError("Request body must be a JSON object.")
+
+    queries = body.get("urls")
+    if (
+        not isinstance(queries, list)
+        or not queries
+        or not all(isinstance(query, str) for query in queries)
+    ):
+        raise BadRequestError("urls must be a list of URL strings.")
+    max_urls = app.config["BATCH_SEARCH_MAX_URLS"]
+    if len(queries) > max_urls:
+        raise BadRequestError(f"Too many URLs: the maximum is {max_urls}.")
+
+    fields = body.get("fields", "")
+    if isinstance(fields, list):
+        fields = ",".join(str(field) for field in fields)
+    fields = validate_fields(str(fields), FEED_FIELDS)
+    fields = select_feed_fields(
+        fields, body_bool(body, "info", True), body_bool(body, "favicon", False)
+    )
+
+    metrics = None
+    if app.config["METRICS_NAMESPACE"]:
+        metrics = Metrics(app.config["METRICS_NAMESPACE"], {"Endpoint": "batch"})
+        metrics.put("BatchUrls", len(queries))
+
+    batch = BatchSearch(
+        async_db_client,
+        concurrency=app.config["BATCH_SEARCH_CONCURRENCY"],
+        max_requests=app.config["BATCH_SEARCH_MAX_REQUESTS"],
+        timeout=app.config["BATCH_SEARCH_TIMEOUT"],
+        check_feedly=body_bool(body, "feedly", True),
+        force_crawl=body_bool(body, "force", False),
+        check_all=body_bool(body, "checkall", False),
+        skip_crawl=body_bool(body, "skip_crawl", False),
+        fields=fields,
+        timer=PhaseTimer(enabled=metrics is not None),
+        failure_backoff=app.config["HOST_FAILURE_BACKOFF"],
+        max_failure_backoff=app.config["HOST_FAILURE_MAX_BACKOFF"],
+        feedly_cache_ttl=app.config["FEEDLY_CACHE_TTL"],
+    )
+
+    # Queries are grouped by the search that returns their results.
+    invalid_queries: List[Tuple[str, BadRequestError]] = []
+    searches: Dict[BatchKey, List[str]] = {}
+    urls: List[URL] = []
+    for query in queries:
+        try:
+            url = validate_query(query)
+        except BadRequestError as e:
+            invalid_queries.append((query, e))
+            continue
+        urls.append(url)
+        searches.setdefault(batch_key(url), []).append(query)
+
+    # Results are passed from the event loop to the response stream as each search finishes.
+    results: queue.Queue = queue.Queue()
+    future = None
+    if urls:
+        # The searches record their metrics, such as DynamoDB capacity, in the batch's metrics.
+        with use_metrics(metrics):
+            future = connection_manager.submit(
+                batch.run(urls, lambda *result: results.put(result))
+            )
+        future.add_done_callback(lambda _: results.put(None))
+
+    def result_lines(key: BatchKey, feeds, error) -> str:
+        result = batch_error(error) if error else None
+        if result is None:
+            try:
+                dump_start = time.perf_counter()
+                result = {"feeds": dump_feeds(sort_feeds(feeds), fields)}
+                if metrics is not None:
+                    dump_duration = (time.perf_counter() - dump_start) * 1000
+                    metrics.put("DumpTime", dump_duration, "Milliseconds")
+            except ValidationError as err:
+                app.logger.warning("Dump errors: %s", err.messages)
+                result = batch_error(err)
+        return "".join(
+            json.dumps({"url": query, **result}) + "\n" for query in searches[key]
+        )
+
+    def stream_results():
+        for query, error in invalid_queries:
+            yield json.dumps({"url": query, **error.to_dict()}) + "\n"
+        if future is None:
+            return
+
+        finished = set()
+        while (result := results.get()) is not None:
+            finished.add(result[0])
+            yield result_lines(*result)
+
+        # Report the searches that didn't finish if the batch failed.
+        if future.exception():
+            app.logger.error("Batch search error: %s", future.exception())
+            for key in searches.keys() - finished:
+                yield result_lines(key, None, future.exception())
+
+    def generate():
+        # The response is streamed after the request has returned, so the metrics are emitted once the
+        # stream ends, including when the client disconnects and the stream is closed early.
+        try:
+            yield from stream_results()
+        finally:
+            if metrics is not None:
+                metrics.emit()
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.route("/api/v1/warmup", methods=["GET"])
+@record_metrics("warmup")
+def warm_up_api():
+    """
+    Warm up the process that serves the request, and return how long each step took.
+    """
+    result, timer = warm_up()
+    response = jsonify(result)
+    response.headers["Cache-Control"] = "no-store"
+    return set_server_timing(response, timer)
+
+
+def batch_error(error: BaseException) -> Dict:
+    """
+    Return the result of a search in a batch that failed.
+
+    :param error: Exception that ended the search
+    :return: Error Dict
+    """
+    if isinstance(error, (BadRequestError, NotFoundError)):
+        return error.to_dict()
+    if isinstance(error, asyncio.TimeoutError):
+        return {
+            "error": "Timeout",
+            "message": "The search did not finish within the batch time limit.",
+        }
+    app.logger.error("Batch search error: %r", error)
+    return {
+        "error": "Server Error",
+        "message": "Feedsearch encountered a server error.",
+    }
+
+
+def select_feed_fields(fields: List[str], info: bool, favicon: bool) -> List[str]:
+    """
+    Return the feed fields to return for the search options.
+
+    :param fields: Requested fields
+    :param info: If False, only feed URLs are returned
+    :param favicon: If False, favicon data URIs are not returned unless requested
+    :return: List of fields, or an empty List for all fields
+    """
+    if not info:
+        return ["url"]
+    if not fields and not favicon:
+        return [field for field in FEED_FIELDS if field != "favicon_data_uri"]
+    return fields
+
+
+def sort_feeds(feeds: List[CustomFeedInfo]) -> List[CustomFeedInfo]:
+    return sorted(feeds, key=lambda x: x.score, reverse=True)
+
+
+def dump_feeds(feeds: List[CustomFeedInfo], fields: List[str]) -> List[Dict]:
+    """
+    Dump feeds with the external feed schema.
+
+    :param feeds: List of feeds
+    :param fields: Fields to dump, or an empty List for all fields
+    :return: List of dumped feeds
+    """
+    feed_schema = compiled_dump(
+        ExternalFeedInfoSchema, only=tuple(fields) if fields else None, many=True
+    )
+    return feed_schema.dump(feeds)
+
+
+def body_bool(body: Dict, name: str, default: bool) -> bool:
+    """
+    Read a boolean option from a JSON request body, accepting booleans or the strings of query parameters.
+    """
+    value: Any = body.get(name, default)
+    if isinstance(value, str):
+        return str_to_bool(value)
+    return bool(value)
+
+
+def response_validators(
+    host: str, last_modified: Optional[datetime], *variant
+) -> Optional[Tuple[str, datetime]]:
+    """
+    Create the ETag and Last-Modified validators of a response for a site. The ETag changes when the site is
+    saved, when the scoring rules change, and between the variants of the response.
+
+    :param host: Site host
+    :param last_modified: When the site feeds were last saved, or None if the response can't be validated
+    :param variant: Values that select the response variant, such as the output format and fields
+    :return: Tuple of ETag and Last-Modified, or None
+    """
+    if not last_modified:
+        return None
+    last_modified = force_utc(last_modified).replace(microsecond=0)
+    key = repr((host, last_modified.isoformat(), SCORE_VERSION, variant))
+    etag = hashlib.sha1(key.encode("utf-8")).hexdigest()[:32]
+    return etag, last_modified
+
+
+def not_modified_response(
+    validators: Optional[Tuple[str, datetime]],
+) -> Optional[Response]:
+    """
+    Return a 304 Not Modified response if the request's If-None-Match or If-Modified-Since headers match
+    the validators, so that the response doesn't need to be serialized.
+
+    :param validators: Tuple of ETag and Last-Modified, or None
+    :return: 304 Response, or None if the response must be sent
+    """
+    if not validators:
+        return None
+    etag, last_modified = validators
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return set_validators(Response(status=304), validators)
+
+
+def set_validators(
+    response: Response, validators: Optional[Tuple[str, datetime]]
+) -> Response:
+    """
+    Set the ETag and Last-Modified headers of a response.
+
+    :param response: Response
+    :param validators: Tuple of ETag and Last-Modified, or None
+    :return: Response
+    """
+    if validators:
+        etag, last_modified = validators
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+    return response
+
+
+def set_server_timing(
+    response: Response, timer: PhaseTimer, show_stats: bool = False
+) -> Response:
+    """
+    Set the Server-Timing header of a response to the durations of the request phases, if SERVER_TIMING is
+    enabled or the request asked for stats.
+
+    :param response: Response
+    :param timer: PhaseTimer of the request
+    :param show_stats: Whether the request asked for stats
+    :return: Response
+    """
+    if (app.config["SERVER_TIMING"] or show_stats) and timer.phases:
+        response.headers["Server-Timing"] = timer.server_timing()
+    return response
 
 
 def get_pretty_print(json_object):
@@ -315,6 +978,8 @@ def upload(env):
         click.Abort()
         return
 
+    import flask_s3
+
     session = boto3.Session()
     credentials = session.get_credentials()
     current_credentials = credentials.get_frozen_credentials()
@@ -322,7 +987,7 @@ def upload(env):
     app.config["FLASKS3_FORCE_MIMETYPE"] = True
 
     try:
-        css_assets.build()
+        init_assets().build()
 
         flask_s3.create_all(
             app,
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from yarl import URL
+
+from gateway.dynamodb_client import AsyncDynamoDBClient
+from gateway.exceptions import NotFoundError
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.search import SearchRunner
+from gateway.utils import no_response_from_crawl, remove_subdomains
+
+logger = logging.getLogger(__name__)
+
+# Key of the searches in a batch that return the same results.
+BatchKey = Tuple[str, str]
+
+# Called with the key of each finished search, and its feeds or the error that ended it.
+ResultCallback = Callable[
+    [BatchKey, Optional[List[CustomFeedInfo]], Optional[BaseException]], None
+]
+
+
+def batch_key(url: URL) -> BatchKey:
+    """
+    Return the key of a search in a batch. URLs with the same root host and path, such as "http://example.com"
+    and "https://www.example.com", are searched once.
+
+    :param url: Query URL
+    :return: Tuple of root host and path
+    """
+    return remove_subdomains(url.host), url.path_qs
+
+
+class BatchSearch:
+    """
+    Runs the searches of many URLs concurrently in one event loop.
+
+    Duplicate URLs are only searched once. Searches of the same site run one at a time, so that each crawl of a
+    site sees the feeds saved by the previous one. All searches share a limit on the number of concurrent
+    searches, a budget of concurrent crawl requests that is split equally between the running searches, and a
+    total time budget.
+    """
+
+    def __init__(
+        self,
+        db_client: AsyncDynamoDBClient,
+        concurrency: int = 10,
+        max_requests: int = 100,
+        timeout: float = 15,
+        **search_options,
+    ):
+        """
+        :param db_client: DynamoDB client
+        :param concurrency: Maximum number of searches running at once
+        :param max_requests: Maximum number of crawl requests of all running searches at once
+        :param timeout: Time budget in seconds for all searches. Searches still running are cancelled.
+        :param search_options: SearchRunner options of each search
+        """
+        self.db_client = db_client
+        self.concurrency = concurrency
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self.search_options = search_options
+
+    async def run(self, urls: List[URL], on_result: ResultCallback) -> Dict:
+        """
+        Search the URLs, calling on_result as each search finishes.
+
+        :param urls: Query URLs
+        :param on_result: Callback for the results of each unique search
+        :return: Dict of batch stats
+        """
+        start = time.perf_counter()
+        searches: Dict[BatchKey, URL] = {}
+        for url in urls:
+            searches.setdefault(batch_key(url), url)
+
+        hosts = {host for host, _ in searches}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        host_locks = {host: asyncio.Lock() for host in hosts}
+        crawl_concurrency = max(1, self.max_requests // self.concurrency)
+
+        async def search(key: BatchKey, url: URL) -> List[CustomFeedInfo]:
+            host = key[0]
+            async with host_locks[host], semaphore:
+                runner = SearchRunner(
+                    db_client=self.db_client,
+                    max_crawl_concurrency=crawl_concurrency,
+                    **self.search_options,
+                )
+                feeds = await runner.run_search_async(url)
+            if not feeds and no_response_from_crawl(runner.crawl_stats):
+                raise NotFoundError(f"No Response from URL: {url}")
+            return feeds
+
+        tasks: Dict[asyncio.Task, BatchKey] = {
+            asyncio.ensure_future(search(key, url)): key
+            for key, url in searches.items()
+        }
+        deadline = start + self.timeout
+        pending = set(tasks)
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                on_result(tasks[task], None if error else task.result(), error)
+
+        for task in pending:
+            task.cancel()
+            on_result(tasks[task], None, asyncio.TimeoutError())
+        if pending:
+            await asyncio.wait(pending)
+
+        duration = int((time.perf_counter() - start) * 1000)
+        stats = {
+            "urls": len(urls),
+            "searches": len(searches),
+            "timed_out": len(pending),
+            "duration": duration,
+        }
+        logger.info("Ran batch search: %s", stats)
+        return stats
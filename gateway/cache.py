@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry expiry and least-recently-used eviction.
+
+    The cache is bounded both by number of entries and by the approximate size in bytes of the cached values,
+    so that large sites can't exhaust the memory of a warm Lambda container or worker.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 300,
+        max_bytes: int = 0,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param maxsize: Maximum number of entries. The cache is disabled if 0.
+        :param ttl: Time in seconds before an entry expires.
+        :param max_bytes: Maximum total approximate size of entries in bytes. Unbounded if 0.
+        :param timer: Function returning the current time in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._timer = timer
+        self._lock = threading.Lock()
+        # Maps key to Tuple of (expiry time, size in bytes, value), ordered from least to most recently used.
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return bool(entry) and entry[0] > self._timer()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for the key, or None if the key is missing or expired.
+
+        :param key: Cache key
+        :return: Cached value or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, size, value = entry
+            if expires <= self._timer():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int = 0) -> None:
+        """
+        Add a value to the cache, evicting the least recently used entries if the cache is full.
+
+        :param key: Cache key
+        :param value: Value to cache
+        :param size: Approximate size of the value in bytes
+        """
+        if not self.enabled:
+            return
+        if self.max_bytes and size > self.max_bytes:
+            self.invalidate(key)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (self._timer() + self.ttl, size, value)
+            self._bytes += size
+
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove a key from the cache if it exists.
+
+        :param key: Cache key
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the cache counters and current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxsize": self.maxsize,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
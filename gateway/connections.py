@@ -0,0 +1,248 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+from typing import Any, Coroutine, Dict, List
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """
+    Keeps a pool of keep-alive HTTP connections and a DNS cache alive for the life of the process, so that
+    Feedly calls and crawls in warm Lambda invocations can reuse connections made by previous searches.
+
+    aiohttp connectors are bound to the event loop they were created in, so the manager runs a single event
+    loop in a background thread, and coroutines from any thread are run on that loop with run().
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+    ):
+        """
+        :param limit: Maximum number of open connections in each connection pool. Unlimited if 0. Requests wait
+            for a free connection when the limit is reached, so it should be at least the total concurrency of
+            the crawls that run at once.
+        :param dns_cache_ttl: Time in seconds to cache DNS lookups.
+        :param keepalive_timeout: Time in seconds to keep idle connections open.
+        """
+        self.limit = limit
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop = None
+        self._thread: threading.Thread = None
+        # Connection pools, keyed by whether SSL certificates are verified.
+        self._connectors: Dict[bool, aiohttp.TCPConnector] = {}
+
+        self._stats: Dict[str, int] = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+        }
+        self._trace_config = self._create_trace_config()
+
+    def configure(self, **kwargs) -> None:
+        """
+        Update the connection settings. Only affects connection pools that have not yet been created.
+        """
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="gateway-connections",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine on the shared event loop and wait for its result.
+
+        The coroutine runs in a copy of the caller's context, so context variables such as the Flask
+        application context are available to it.
+
+        :param coro: Coroutine to run
+        :return: Result of the coroutine
+        """
+        return self.submit(coro).result()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Start running a coroutine on the shared event loop, without waiting for its result.
+
+        The coroutine runs in a copy of the caller's context, as with run().
+
+        :param coro: Coroutine to run
+        :return: Future of the coroutine result
+        """
+        loop = self._ensure_loop()
+        ctx = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def on_done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def start() -> None:
+            # Tasks copy the current context when created, so create it within the caller's context.
+            task = loop.create_task(coro)
+            task.add_done_callback(on_done)
+
+        loop.call_soon_threadsafe(ctx.run, start)
+        return future
+
+    def connector(self, verify_ssl: bool = True) -> aiohttp.TCPConnector:
+        """
+        Return the shared connection pool. Must be called from within the shared event loop.
+
+        :param verify_ssl: Whether the pool verifies SSL certificates
+        :return: TCPConnector
+        """
+        connector = self._connectors.get(verify_ssl)
+        if connector is None or connector.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                ssl=verify_ssl,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._connectors[verify_ssl] = connector
+        return connector
+
+    def session(
+        self,
+        verify_ssl: bool = True,
+        trace_configs: List[aiohttp.TraceConfig] = None,
+        **kwargs,
+    ) -> aiohttp.ClientSession:
+        """
+        Create a ClientSession using the shared connection pool. Closing the session leaves the pool open.
+
+        Sessions created outside the shared event loop, e.g. within asyncio.run(), get their own connection pool
+        that is closed with the session.
+
+        :param verify_ssl: Whether to verify SSL certificates
+        :param trace_configs: Additional aiohttp TraceConfigs
+        :param kwargs: ClientSession keyword arguments
+        :return: ClientSession
+        """
+        if asyncio.get_running_loop() is not self._loop:
+            return aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=verify_ssl),
+                trace_configs=[self._trace_config] + (trace_configs or []),
+                **kwargs,
+            )
+
+        return aiohttp.ClientSession(
+            connector=self.connector(verify_ssl),
+            connector_owner=False,
+            trace_configs=[self._trace_config] + (trace_configs or []),
+            **kwargs,
+        )
+
+    def preconnect(self, urls: List[str], timeout: float = 5, **kwargs) -> int:
+        """
+        Make HEAD requests to URLs through the shared pool, so that the first requests to their hosts don't pay
+        for the DNS lookup, the SSL context, and the TLS handshake. The connections are only kept open for the
+        keep-alive timeout, but the DNS cache and SSL context last longer.
+
+        :param urls: URLs to request
+        :param timeout: Total timeout of the requests in seconds
+        :param kwargs: ClientSession keyword arguments, such as headers
+        :return: Number of URLs that responded
+        """
+
+        async def head(session: aiohttp.ClientSession, url: str) -> bool:
+            async with session.head(url, allow_redirects=False):
+                return True
+
+        async def preconnect_all() -> int:
+            async with self.session(
+                timeout=aiohttp.ClientTimeout(total=timeout), **kwargs
+            ) as session:
+                results = await asyncio.gather(
+                    *(head(session, url) for url in urls), return_exceptions=True
+                )
+            for url, result in zip(urls, results):
+                if isinstance(result, BaseException):
+                    logger.warning("Preconnect to %s failed: %r", url, result)
+            return sum(result is True for result in results)
+
+        return self.run(preconnect_all())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return counters of requests, connections, and DNS lookups made through the shared pools.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        connections = stats["connections_created"] + stats["connections_reused"]
+        stats["connection_reuse_ratio"] = (
+            round(stats["connections_reused"] / connections, 3) if connections else 0
+        )
+        return stats
+
+    def close(self) -> None:
+        """
+        Close the connection pools and stop the shared event loop.
+        """
+        with self._lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None or loop.is_closed():
+            return
+
+        async def close_connectors():
+            for connector in self._connectors.values():
+                await connector.close()
+            self._connectors.clear()
+
+        asyncio.run_coroutine_threadsafe(close_connectors(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+    def _increment(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        # noinspection PyUnusedLocal
+        def counter(key: str):
+            async def on_event(session, trace_config_ctx, params):
+                self._increment(key)
+
+            return on_event
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(counter("requests"))
+        trace_config.on_connection_create_end.append(counter("connections_created"))
+        trace_config.on_connection_reuseconn.append(counter("connections_reused"))
+        trace_config.on_dns_cache_hit.append(counter("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(counter("dns_cache_misses"))
+        return trace_config
+
+
+connection_manager = ConnectionManager()
@@ -0,0 +1,173 @@
+import math
+from typing import Dict, List, Optional
+
+# Summary values kept from the stats of a crawl.
+CRAWL_STATS_KEYS: Dict[str, str] = {
+    "requests": "requests_queued",
+    "failed": "requests_failed",
+    "urls_seen": "urls_seen",
+    "duration_med": "requests_duration_med",
+    "duration_max": "requests_duration_max",
+    "total_duration": "total_duration",
+}
+
+
+# Lower limits of adaptive parameters, as crawls of a site's root may need more than crawls of its paths.
+MIN_CONCURRENCY = 5
+MIN_TOTAL_TIMEOUT = 4
+
+
+class CrawlParams:
+    """
+    Parameters of a site crawl that can be adjusted for each host.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 20,
+        request_timeout: float = 4,
+        total_timeout: float = 10,
+        max_depth: int = 5,
+        adaptive: bool = False,
+    ):
+        """
+        :param concurrency: Maximum number of concurrent requests
+        :param request_timeout: Timeout of each request in seconds
+        :param total_timeout: Timeout of the crawl in seconds
+        :param max_depth: Maximum depth of links followed from the start URLs
+        :param adaptive: True if the parameters were adjusted from the host's past crawls
+        """
+        self.concurrency = concurrency
+        self.request_timeout = request_timeout
+        self.total_timeout = total_timeout
+        self.max_depth = max_depth
+        self.adaptive = adaptive
+
+    def copy(self, **changes) -> "CrawlParams":
+        """
+        :param changes: Parameters to change
+        :return: Copy of the parameters with the changes
+        """
+        return CrawlParams(**{**self.to_dict(), **changes})
+
+    def to_dict(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "request_timeout": self.request_timeout,
+            "total_timeout": self.total_timeout,
+            "max_depth": self.max_depth,
+            "adaptive": self.adaptive,
+        }
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()})"
+
+
+DEFAULT_CRAWL_PARAMS = CrawlParams()
+
+
+def summarize_crawl_stats(
+    stats: Dict,
+    feeds_found: int,
+    previous: Optional[Dict] = None,
+    params: CrawlParams = DEFAULT_CRAWL_PARAMS,
+) -> Dict[str, int]:
+    """
+    Create the compact summary of a crawl's stats that is saved with the site.
+
+    :param stats: Stats returned by the crawler
+    :param feeds_found: Number of feeds found by the crawl
+    :param previous: Summary of the site's previous crawls
+    :param params: Parameters the crawl ran with
+    :return: Crawl stats summary
+    """
+    summary = {
+        key: int(stats.get(stat_key) or 0) for key, stat_key in CRAWL_STATS_KEYS.items()
+    }
+    status_codes: Dict = stats.get("status_codes") or {}
+    summary["ok"] = sum(
+        count for status, count in status_codes.items() if 200 <= int(status) < 300
+    )
+    summary["feeds"] = feeds_found
+    summary["crawls"] = int((previous or {}).get("crawls", 0)) + 1
+    summary["concurrency"] = params.concurrency
+    summary["total_timeout"] = int(params.total_timeout * 1000)
+    return summary
+
+
+def _clamp(value: float, minimum: float, maximum: float) -> float:
+    return max(minimum, min(maximum, value))
+
+
+def adaptive_crawl_params(
+    summary: Optional[Dict], defaults: CrawlParams = DEFAULT_CRAWL_PARAMS
+) -> CrawlParams:
+    """
+    Choose the crawl parameters of a host from the summary of its last crawl.
+
+    - Concurrency is reduced for small sites that only needed a few requests, and halved for hosts that fail
+      most requests, as they may be rate limiting the crawler.
+    - The request timeout allows for the slowest response of the last crawl, within the default limits.
+    - Crawls that finished early have their total timeout reduced to twice their duration, so that slow
+      responses can't use the full budget, and crawls that used the full total timeout they ran with follow
+      fewer links.
+
+    :param summary: Crawl stats summary of the host's last root crawl, or None if the host hasn't been crawled
+    :param defaults: Default crawl parameters, which are also the maximum values
+    :return: CrawlParams
+    """
+    if not summary or not summary.get("requests"):
+        return defaults
+
+    requests = int(summary["requests"])
+    failed = int(summary.get("failed", 0))
+    duration_max = int(summary.get("duration_max", 0)) / 1000
+    total_duration = int(summary.get("total_duration", 0)) / 1000
+    # Summaries saved before the timeout was recorded are of crawls with the default timeout.
+    last_total_timeout = (
+        int(summary.get("total_timeout") or defaults.total_timeout * 1000) / 1000
+    )
+
+    concurrency = int(_clamp(requests, MIN_CONCURRENCY, defaults.concurrency))
+    if failed * 2 > requests:
+        concurrency = max(2, concurrency // 2)
+
+    request_timeout = _clamp(
+        math.ceil(duration_max * 1.5 * 10) / 10, 1.5, defaults.request_timeout
+    )
+
+    max_depth = defaults.max_depth
+    if total_duration >= last_total_timeout * 0.95:
+        total_timeout = defaults.total_timeout
+        max_depth = max(2, defaults.max_depth - 2)
+    else:
+        total_timeout = _clamp(
+            math.ceil(total_duration * 2),
+            max(MIN_TOTAL_TIMEOUT, request_timeout + 1),
+            defaults.total_timeout,
+        )
+
+    return CrawlParams(
+        concurrency=concurrency,
+        request_timeout=request_timeout,
+        total_timeout=total_timeout,
+        max_depth=max_depth,
+        adaptive=True,
+    )
+
+
+def crawl_params_stats(params: CrawlParams, stats: Dict, feeds: List) -> Dict:
+    """
+    Return the values logged for each crawl to compare adaptive crawl parameters against the defaults.
+
+    :param params: Parameters the crawl ran with
+    :param stats: Stats returned by the crawler
+    :param feeds: Feeds found by the crawl
+    :return: Dict of crawl parameters and results
+    """
+    return {
+        **params.to_dict(),
+        "total_duration": stats.get("total_duration"),
+        "requests": stats.get("requests_queued"),
+        "feeds": len(feeds),
+    }
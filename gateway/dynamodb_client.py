@@ -1,34 +1,287 @@
+import asyncio
+import base64
+import binascii
+import contextvars
+import copy
+import functools
+import hashlib
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
 import boto3
 import time
-from typing import Dict, List, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from marshmallow import ValidationError
 
+from gateway.cache import TTLCache
+from gateway.metrics import current_metrics, put_consumed_capacity, put_metric
 from gateway.schema.customfeedinfo import CustomFeedInfo
 from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.dynamodb_feedly_schema import DynamoDbFeedlyResultSchema
+from gateway.schema.dynamodb_hostfailure_schema import DynamoDbHostFailureSchema
 from gateway.schema.dynamodb_site_schema import DynamoDbSiteSchema
 from gateway.schema.dynamodb_sitepath_schema import DynamoDbSitePathSchema
+from gateway.schema.feed_loader import FeedLoadError, load_feed_items
+from gateway.schema.feedlyresult import FeedlyResult
+from gateway.schema.hostfailure import HostFailure
 from gateway.schema.sitehost import SiteHost
 from gateway.schema.sitepath import SitePath
 
-from sentry_sdk import capture_exception
+logger = logging.getLogger(__name__)
 
+# Host of the item read to warm up connections. It is on the reserved .invalid domain, so no feeds are saved for it.
+WARM_UP_HOST = "warm-up.invalid"
 
-logger = logging.getLogger(__name__)
+
+def capture_exception(error: BaseException) -> None:
+    """
+    Report an error to Sentry. Sentry is only imported when an error is reported, as it isn't needed
+    to serve requests, and reporting does nothing unless Sentry was initialised.
+
+    :param error: Exception to report
+    """
+    import sentry_sdk
+
+    sentry_sdk.capture_exception(error)
+
+
+def dynamodb_item_size(item: Any) -> int:
+    """
+    Approximate the size in bytes of a DynamoDB item or attribute value, using the DynamoDB item size rules.
+
+    :param item: DynamoDB item Dict, or attribute value
+    :return: Approximate size in bytes
+    """
+    if isinstance(item, str):
+        return len(item.encode("utf-8"))
+    if isinstance(item, (bytes, bytearray)):
+        return len(item)
+    if isinstance(item, bool) or item is None:
+        return 1
+    if isinstance(item, (int, float, Decimal)):
+        return len(str(item)) // 2 + 1
+    if isinstance(item, dict):
+        return 3 + sum(
+            len(str(key)) + dynamodb_item_size(value) for key, value in item.items()
+        )
+    if isinstance(item, (list, tuple, set)):
+        return 3 + sum(dynamodb_item_size(value) + 1 for value in item)
+    # Boto3 Binary values
+    if hasattr(item, "value"):
+        return dynamodb_item_size(item.value)
+    return len(str(item))
+
+
+def _normalize_item_value(value: Any) -> Any:
+    """
+    Normalize a DynamoDB attribute value, so that values read from DynamoDB and values dumped by the schemas
+    are equal if they would be stored as the same value.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {key: _normalize_item_value(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_item_value(val) for val in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize_item_value(val) for val in value)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    # Boto3 Binary values
+    if hasattr(value, "value") and isinstance(value.value, (bytes, bytearray)):
+        return bytes(value.value).hex()
+    return value
+
+
+def dynamodb_item_hash(item: Dict) -> str:
+    """
+    Create a hash of the content of a DynamoDB item, to detect whether it has changed since it was stored.
+
+    :param item: DynamoDB item
+    :return: Hash as hex string
+    """
+    normalized = json.dumps(
+        _normalize_item_value(item),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def encode_cursor(key: Dict[str, str]) -> str:
+    """
+    Encode a DynamoDB LastEvaluatedKey as an opaque pagination token.
+
+    :param key: LastEvaluatedKey of a query
+    :return: URL safe token string
+    """
+    data = json.dumps(key, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, str]:
+    """
+    Decode a pagination token created by encode_cursor.
+    Raises a ValueError if the token is invalid.
+
+    :param token: Pagination token
+    :return: ExclusiveStartKey for a query
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise ValueError("Invalid pagination token") from e
+
+    if (
+        not isinstance(key, dict)
+        or set(key.keys()) != {"PK", "SK"}
+        or not all(isinstance(value, str) for value in key.values())
+    ):
+        raise ValueError("Invalid pagination token")
+    return key
 
 
 class DynamoDBClient:
     db_feed_schema = DynamoDbFeedInfoSchema(many=True)
     db_site_schema = DynamoDbSiteSchema()
     db_path_schema = DynamoDbSitePathSchema()
+    db_failure_schema = DynamoDbHostFailureSchema()
+    db_feedly_schema = DynamoDbFeedlyResultSchema()
+
+    # Attributes that are always read when querying a projection of a site, as they're needed to identify,
+    # crawl, and score the site and its feeds.
+    projection_required_attributes = (
+        "PK",
+        "SK",
+        "host",
+        "url",
+        "last_seen",
+        "last_updated",
+        "title",
+        "description",
+        "bozo",
+        "is_push",
+        "velocity",
+        "score",
+        "score_version",
+    )
 
-    def __init__(self, table_name: str):
-        self.dynamodb = boto3.resource("dynamodb")
-        self.table = self.dynamodb.Table(table_name)
+    def __init__(self, table_name: str, cache: TTLCache = None, max_workers: int = 8):
+        """
+        :param table_name: Name of the DynamoDB table
+        :param cache: Optional in-process cache of loaded SiteHost and SitePath objects
+        :param max_workers: Maximum number of DynamoDB calls run in parallel
+        """
+        self.table_name = table_name
+        self.cache = cache if cache is not None else TTLCache(maxsize=0)
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self._executor: ThreadPoolExecutor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def table(self):
+        """
+        DynamoDB Table resource for the current thread. Boto3 resources are not thread safe, so each thread
+        that accesses the table gets its own resource.
+        """
+        table = getattr(self._local, "table", None)
+        if table is None:
+            table = self.resource.Table(self.table_name)
+            self._local.table = table
+        return table
+
+    @property
+    def resource(self):
+        """
+        DynamoDB service resource for the current thread.
+        """
+        resource = getattr(self._local, "resource", None)
+        if resource is None:
+            session = boto3.session.Session()
+            resource = session.resource("dynamodb")
+            self._local.resource = resource
+        return resource
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Thread pool for running DynamoDB calls in parallel.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="dynamodb"
+                    )
+        return self._executor
+
+    @staticmethod
+    def site_cache_key(host: str) -> str:
+        return DynamoDbSiteSchema.create_primary_key(host)
+
+    @staticmethod
+    def failure_cache_key(host: str) -> str:
+        return DynamoDbHostFailureSchema.create_primary_key(
+            host
+        ) + DynamoDbHostFailureSchema.create_sort_key("")
+
+    @staticmethod
+    def path_cache_key(host: str, path: str) -> str:
+        return DynamoDbSitePathSchema.create_primary_key(
+            host
+        ) + DynamoDbSitePathSchema.create_sort_key(path)
+
+    def _get_cached(self, query_name: str, key: str) -> Any:
+        """
+        Return a copy of a cached SiteHost or SitePath, or None if not cached.
+
+        :param query_name: Name of the query for logging
+        :param key: Cache key
+        :return: Copy of cached object or None
+        """
+        if not self.cache.enabled:
+            return None
+
+        cached = self.cache.get(key)
+        logger.debug("DB_CACHE: query=%s hit=%s", query_name, cached is not None)
+        if cached is not None:
+            return cached.copy()
+        return None
+
+    @staticmethod
+    def _put_call_metrics(
+        duration: float, calls: int, items: List[Dict], direction: str
+    ) -> None:
+        """
+        Add the number of DynamoDB calls, and the number and size of the items read or written, to the
+        metrics of the current request.
+
+        :param duration: Duration of the calls in milliseconds
+        :param calls: Number of calls
+        :param items: Items read or written
+        :param direction: "Read" or "Written"
+        """
+        if current_metrics() is None:
+            return
+        put_metric("DynamoDBCalls", calls)
+        put_metric("DynamoDBTime", duration, "Milliseconds")
+        put_metric(f"DynamoDBItems{direction}", len(items))
+        put_metric(
+            f"DynamoDBBytes{direction}",
+            sum(dynamodb_item_size(item) for item in items),
+            "Bytes",
+        )
 
     def _paginate_query(self, query_name, **kwargs) -> List[Dict]:
         """
@@ -40,10 +293,12 @@ class DynamoDBClient:
         items = []
         queries = 0
         query_start = time.perf_counter()
+        kwargs["ReturnConsumedCapacity"] = "TOTAL"
 
         try:
             response = self.table.query(**kwargs)
             queries += 1
+            put_consumed_capacity(response.get("ConsumedCapacity"), "Read")
 
             if "Items" not in response:
                 return items
@@ -54,6 +309,7 @@ class DynamoDBClient:
                 kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
                 response = self.table.query(**kwargs)
                 queries += 1
+                put_consumed_capacity(response.get("ConsumedCapacity"), "Read")
 
                 if "Items" not in response:
                     return items
@@ -65,7 +321,7 @@ class DynamoDBClient:
             logger.error(e)
             return []
         finally:
-            duration = int((time.perf_counter() - query_start) * 1000)
+            duration = (time.perf_counter() - query_start) * 1000
 
             logger.debug(
                 "DB_QUERY: query=%s duration=%d queries=%d",
@@ -73,19 +329,93 @@ class DynamoDBClient:
                 duration,
                 queries,
             )
+            self._put_call_metrics(duration, queries, items, "Read")
 
         return items
 
-    def load_site_feeds(self, items: List[Dict]) -> SiteHost:
+    @classmethod
+    def projection_attributes(cls, fields: Iterable[str]) -> List[str]:
+        """
+        Return the attributes to read for a projection of the given feed fields.
+
+        :param fields: Feed fields to read
+        :return: List of attribute names
+        """
+        return list(dict.fromkeys([*cls.projection_required_attributes, *fields]))
+
+    @classmethod
+    def projection_kwargs(cls, fields: Optional[Iterable[str]]) -> Dict:
+        """
+        Create the Boto3 query arguments to only read the given feed fields, and the attributes required
+        to load a site. Attribute names are aliased, as many are DynamoDB reserved words.
+
+        :param fields: Feed fields to read, or None to read all attributes
+        :return: Dict of query arguments
+        """
+        if not fields:
+            return {}
+        names = {
+            f"#p{index}": attribute
+            for index, attribute in enumerate(cls.projection_attributes(fields))
+        }
+        return {
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def projected_feed_schema(attributes: Tuple[str]) -> DynamoDbFeedInfoSchema:
+        """
+        Return a feed schema that only loads the given attributes.
+
+        :param attributes: Tuple of attribute names
+        :return: DynamoDbFeedInfoSchema
+        """
+        only = [
+            name
+            for name in attributes
+            if name in DynamoDbFeedInfoSchema._declared_fields
+        ]
+        return DynamoDbFeedInfoSchema(many=True, only=only)
+
+    def load_feeds(
+        self, items: List[Dict], fields: List[str] = None
+    ) -> List[CustomFeedInfo]:
+        """
+        Load DynamoDB items into Feeds. Items are loaded by the fast feed loader, or loaded and validated by
+        the feed schema if any item contains values the fast loader doesn't handle.
+
+        :param items: List of DynamoDB feed items
+        :param fields: Feed fields that were read, if the items are a projection
+        :return: List of CustomFeedInfo
+        """
+        attributes = self.projection_attributes(fields) if fields else None
+        try:
+            return load_feed_items(items, attributes)
+        except FeedLoadError as e:
+            logger.debug("Loading feeds with schema: %s", e)
+
+        if fields:
+            return self.projected_feed_schema(tuple(attributes)).load(items)
+        return self.db_feed_schema.load(items)
+
+    def load_site_feeds(self, items: List[Dict], fields: List[str] = None) -> SiteHost:
         """
         Load items from DynamoDB into SiteHost and Feeds.
 
         :param items: List of DynamoDB items
+        :param fields: Feed fields that were read, if the items are a projection
         :return: SiteHost object
         """
         try:
             site: SiteHost = self.db_site_schema.load(items[0])
-            feeds: List[CustomFeedInfo] = self.db_feed_schema.load(items[1:])
+            feeds: List[CustomFeedInfo] = self.load_feeds(items[1:], fields)
+            site.partial = bool(fields)
+            # Record the stored content of each item, so that unchanged items aren't written again on save.
+            site.stored_hash = dynamodb_item_hash(items[0])
+            for feed, item in zip(feeds, items[1:]):
+                feed.stored_hash = dynamodb_item_hash(item)
             site.load_feeds(feeds)
             return site
         except ValidationError as e:
@@ -95,21 +425,39 @@ class DynamoDBClient:
             capture_exception(e)
             logger.error(e)
 
-    def query_site_feeds(self, site: Union[str, SiteHost]) -> SiteHost:
+    def query_site_feeds(
+        self, site: Union[str, SiteHost], fields: List[str] = None
+    ) -> SiteHost:
         """
         Queries DynamoDB for the SiteHost and all its associated Feeds.
 
+        If fields are given and the cache is disabled, only those feed fields and the attributes needed to score
+        the feeds are read, and the returned SiteHost is marked as partial. Partial sites cannot be saved.
+        If the cache is enabled, all attributes are read and the complete site is cached, so that later reads of
+        any projection don't query DynamoDB.
+
         :param site: SiteHost object or string of website domain root
+        :param fields: Optional List of feed fields to read
         :return: SiteHost object containing associated Feeds
         """
         if isinstance(site, str):
             site = SiteHost(site)
+
+        # Cached sites are complete, so can be returned for any projection.
+        cache_key = self.site_cache_key(site.host)
+        if cached_site := self._get_cached("SiteHost", cache_key):
+            return cached_site
+        if self.cache.enabled:
+            fields = None
+
+        query_name = "SiteHostProjection" if fields else "SiteHost"
         try:
             key = DynamoDbSiteSchema.create_primary_key(site.host)
             items = self._paginate_query(
-                "SiteHost",
+                query_name,
                 KeyConditionExpression=Key("PK").eq(key)
                 & Key("SK").between("#METADATA#", "FEED$"),
+                **self.projection_kwargs(fields),
             )
         except ClientError as e:
             capture_exception(e)
@@ -119,7 +467,9 @@ class DynamoDBClient:
         if not items:
             return site
 
-        if loaded_site := self.load_site_feeds(items):
+        if loaded_site := self.load_site_feeds(items, fields):
+            size = sum(dynamodb_item_size(item) for item in items)
+            self.cache.set(cache_key, loaded_site.copy(), size)
             return loaded_site
         else:
             return site
@@ -133,6 +483,7 @@ class DynamoDBClient:
         """
         try:
             existing_path = self.db_path_schema.load(items[0])
+            existing_path.stored_hash = dynamodb_item_hash(items[0])
             return existing_path
         except ValidationError as e:
             capture_exception(e)
@@ -148,6 +499,10 @@ class DynamoDBClient:
         :param site_path: SitePath record to query
         :return: SitePath record
         """
+        cache_key = self.path_cache_key(site_path.host, site_path.path)
+        if cached_path := self._get_cached("SitePath", cache_key):
+            return cached_path
+
         try:
             key = DynamoDbSitePathSchema.create_primary_key(site_path.host)
             sort_key = DynamoDbSitePathSchema.create_sort_key(site_path.path)
@@ -164,6 +519,8 @@ class DynamoDBClient:
             return site_path
 
         if loaded_path := self.load_site_path(items):
+            size = sum(dynamodb_item_size(item) for item in items)
+            self.cache.set(cache_key, loaded_path.copy(), size)
             return loaded_path
 
         return site_path
@@ -178,6 +535,10 @@ class DynamoDBClient:
         :param feeds: List of CustomFeedInfo
         :param site_path: SitePath object
         """
+        if site.partial:
+            logger.error("Unable to save partially loaded site %s", site.host)
+            return
+
         try:
             dumped_site: Dict = self.db_site_schema.dump(site)
             dumped_feeds: Dict = self.db_feed_schema.dump(feeds)
@@ -186,15 +547,262 @@ class DynamoDBClient:
             logger.error("Dump errors: %s", e.messages)
             return
 
+        site_cache_key = self.site_cache_key(site.host)
+        path_cache_key = self.path_cache_key(site_path.host, site_path.path)
+
+        # Only write the items that are new or have changed since they were loaded or last saved.
+        changed: List[Tuple[Any, Dict, str]] = []
+        skipped_items = 0
+        skipped_bytes = 0
+        for obj, item in [(site, dumped_site), (site_path, dumped_site_path)] + list(
+            zip(feeds, dumped_feeds)
+        ):
+            item_hash = dynamodb_item_hash(item)
+            if obj.stored_hash == item_hash:
+                skipped_items += 1
+                skipped_bytes += dynamodb_item_size(item)
+            else:
+                changed.append((obj, item, item_hash))
+
+        write_start = time.perf_counter()
+        changed_items = [item for _, item, _ in changed]
+        requests = 0
         try:
-            with self.table.batch_writer() as batch:
-                batch.put_item(dumped_site)
-                batch.put_item(dumped_site_path)
-                for item in dumped_feeds:
-                    batch.put_item(Item=item)
+            requests, written = self._batch_write_items(changed_items)
         except (ClientError, ValidationError) as e:
             capture_exception(e)
             logger.error(e)
+            written = False
+        finally:
+            duration = (time.perf_counter() - write_start) * 1000
+            logger.debug(
+                "DB_WRITE: query=SiteFeeds duration=%d written=%d written_bytes=%d skipped=%d skipped_bytes=%d",
+                duration,
+                len(changed),
+                sum(dynamodb_item_size(item) for item in changed_items),
+                skipped_items,
+                skipped_bytes,
+            )
+            self._put_call_metrics(duration, requests, changed_items, "Written")
+
+        if not written:
+            self.cache.invalidate(site_cache_key)
+            self.cache.invalidate(path_cache_key)
+            return
+
+        for obj, _, item_hash in changed:
+            obj.stored_hash = item_hash
+
+        # Update the cache with the saved state of the site, so that following requests don't need to query it.
+        saved_site = SiteHost(site.host, site.last_seen, crawl_stats=site.crawl_stats)
+        saved_site.load_feeds([copy.copy(feed) for feed in feeds])
+        site_size = dynamodb_item_size(dumped_site) + sum(
+            dynamodb_item_size(item) for item in dumped_feeds
+        )
+        self.cache.set(site_cache_key, saved_site, site_size)
+        self.cache.set(
+            path_cache_key, site_path.copy(), dynamodb_item_size(dumped_site_path)
+        )
+
+    def _batch_write_items(
+        self, items: List[Dict], max_attempts: int = 8
+    ) -> Tuple[int, bool]:
+        """
+        Put items with BatchWriteItem, retrying unprocessed items, and record the consumed write capacity.
+
+        :param items: Items to put
+        :param max_attempts: Maximum number of requests for each batch of items
+        :return: Tuple of the number of requests, and whether all items were written
+        """
+        requests = 0
+        # BatchWriteItem writes at most 25 items in each request.
+        for index in range(0, len(items), 25):
+            request_items = {
+                self.table_name: [
+                    {"PutRequest": {"Item": item}} for item in items[index : index + 25]
+                ]
+            }
+            for attempt in range(max_attempts):
+                if attempt:
+                    time.sleep(min(0.05 * 2**attempt, 1))
+                response = self.resource.batch_write_item(
+                    RequestItems=request_items, ReturnConsumedCapacity="TOTAL"
+                )
+                requests += 1
+                put_consumed_capacity(response.get("ConsumedCapacity"), "Write")
+                request_items = response.get("UnprocessedItems")
+                if not request_items:
+                    break
+            else:
+                logger.warning("Unprocessed items after %d attempts", max_attempts)
+                return requests, False
+        return requests, True
+
+    def _get_item(self, query_name: str, schema, host: str) -> Any:
+        """
+        Read the single item of a schema for a host, such as its failure record, using the in-process cache.
+
+        :param query_name: Name of the query for logging
+        :param schema: Schema of the item, whose sort key prefix is the item's sort key
+        :param host: Site host
+        :return: Loaded object, or None if there's no item
+        """
+        cache_key = schema.create_primary_key(host) + schema.sort_key_prefix
+        if cached := self._get_cached(query_name, cache_key):
+            return cached
+
+        query_start = time.perf_counter()
+        item = None
+        try:
+            response = self.table.get_item(
+                Key={
+                    "PK": schema.create_primary_key(host),
+                    "SK": schema.sort_key_prefix,
+                },
+                ReturnConsumedCapacity="TOTAL",
+            )
+            put_consumed_capacity(response.get("ConsumedCapacity"), "Read")
+            item = response.get("Item")
+        except ClientError as e:
+            capture_exception(e)
+            logger.error(e)
+            return None
+        finally:
+            duration = (time.perf_counter() - query_start) * 1000
+            logger.debug(
+                "DB_QUERY: query=%s duration=%d queries=1", query_name, duration
+            )
+            self._put_call_metrics(duration, 1, [item] if item else [], "Read")
+
+        if not item:
+            return None
+        try:
+            loaded = schema.load(item)
+        except ValidationError as e:
+            logger.warning("Dump errors: %s", e.messages)
+            return None
+        self.cache.set(cache_key, loaded.copy(), dynamodb_item_size(item))
+        return loaded
+
+    def _put_item(self, query_name: str, schema, obj: Any) -> None:
+        """
+        Save the single item of a schema for a host, and cache the saved object.
+
+        :param query_name: Name of the query for logging
+        :param schema: Schema of the item
+        :param obj: Object to save, with a host attribute
+        """
+        try:
+            item = schema.dump(obj)
+        except ValidationError as e:
+            logger.error("Dump errors: %s", e.messages)
+            return
+
+        cache_key = schema.create_primary_key(obj.host) + schema.sort_key_prefix
+        write_start = time.perf_counter()
+        try:
+            response = self.table.put_item(Item=item, ReturnConsumedCapacity="TOTAL")
+            put_consumed_capacity(response.get("ConsumedCapacity"), "Write")
+        except ClientError as e:
+            capture_exception(e)
+            logger.error(e)
+            self.cache.invalidate(cache_key)
+            return
+        finally:
+            duration = (time.perf_counter() - write_start) * 1000
+            logger.debug("DB_WRITE: query=%s duration=%d", query_name, duration)
+            self._put_call_metrics(duration, 1, [item], "Written")
+        self.cache.set(cache_key, obj.copy(), dynamodb_item_size(item))
+
+    def query_host_failure(self, host: str) -> Optional[HostFailure]:
+        """
+        Queries DynamoDB for the failure record of a host whose last crawls received no response.
+
+        :param host: Site host
+        :return: HostFailure, or None if the host's last crawl didn't fail
+        """
+        return self._get_item("HostFailure", self.db_failure_schema, host)
+
+    def save_host_failure(self, failure: HostFailure) -> None:
+        """
+        Saves the failure record of a host, which DynamoDB deletes once it expires.
+
+        :param failure: HostFailure
+        """
+        self._put_item("HostFailure", self.db_failure_schema, failure)
+
+    def query_feedly_result(self, host: str) -> Optional[FeedlyResult]:
+        """
+        Queries DynamoDB for the stored Feedly search result of a host. The result may have expired.
+
+        :param host: Root host of the Feedly query
+        :return: FeedlyResult, or None if not stored
+        """
+        return self._get_item("FeedlyResult", self.db_feedly_schema, host)
+
+    def save_feedly_result(self, result: FeedlyResult) -> None:
+        """
+        Saves the Feedly search result of a host, which DynamoDB deletes once it expires.
+
+        :param result: FeedlyResult
+        """
+        self._put_item("FeedlyResult", self.db_feedly_schema, result)
+
+    def delete_host_failure(self, host: str) -> None:
+        """
+        Deletes the failure record of a host after a successful crawl.
+
+        :param host: Site host
+        """
+        self.cache.invalidate(self.failure_cache_key(host))
+        try:
+            response = self.table.delete_item(
+                Key={
+                    "PK": DynamoDbHostFailureSchema.create_primary_key(host),
+                    "SK": DynamoDbHostFailureSchema.sort_key_prefix,
+                },
+                ReturnConsumedCapacity="TOTAL",
+            )
+            put_consumed_capacity(response.get("ConsumedCapacity"), "Write")
+        except ClientError as e:
+            capture_exception(e)
+            logger.error(e)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Return the hit and miss counters and size of the SiteHost and SitePath cache.
+        """
+        return self.cache.stats()
+
+    def warm_up(self, threads: int = 0) -> int:
+        """
+        Create the DynamoDB resources of the current thread and of threads in the pool, and open their
+        connections by reading an item that doesn't exist, so that the first queries of a request don't pay
+        for them.
+
+        :param threads: Number of pool threads to warm up, at most the pool size
+        :return: Number of threads warmed up
+        """
+
+        def read_item() -> int:
+            response = self.table.get_item(
+                Key={
+                    "PK": DynamoDbSiteSchema.create_primary_key(WARM_UP_HOST),
+                    "SK": DynamoDbSiteSchema.sort_key_prefix,
+                },
+                ReturnConsumedCapacity="TOTAL",
+            )
+            put_consumed_capacity(response.get("ConsumedCapacity"), "Read")
+            return threading.get_ident()
+
+        thread_ids = {read_item()}
+        # Pool threads are only reused once idle, so submitting the reads together starts a thread for each.
+        futures = [
+            self.executor.submit(read_item)
+            for _ in range(min(threads, self.max_workers))
+        ]
+        thread_ids.update(future.result() for future in futures)
+        return len(thread_ids)
 
     @staticmethod
     def load_sites_list(items: List[Dict]) -> List[Dict]:
@@ -231,3 +839,190 @@ class DynamoDBClient:
         )
 
         return self.load_sites_list(items)
+
+    def query_sites_page(
+        self, limit: int = 100, cursor: str = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Query DynamoDB for a single page of Sites.
+        Raises a ValueError if the cursor is not a valid token.
+
+        :param limit: Maximum number of Sites to return
+        :param cursor: Token of the page to return, from a previous query. Returns the first page if None.
+        :return: Tuple of List of Sites as Dict, and the token of the next page, or None if this is the last page.
+        """
+        kwargs = {
+            "IndexName": "InvertedIndex",
+            "KeyConditionExpression": Key("SK").eq(DynamoDbSiteSchema.sort_key_prefix),
+            "Limit": limit,
+        }
+        if cursor:
+            start_key = decode_cursor(cursor)
+            if start_key["SK"] != DynamoDbSiteSchema.sort_key_prefix:
+                raise ValueError("Invalid pagination token")
+            kwargs["ExclusiveStartKey"] = start_key
+
+        query_start = time.perf_counter()
+        response: Dict = {}
+        try:
+            response = self.table.query(**kwargs, ReturnConsumedCapacity="TOTAL")
+            put_consumed_capacity(response.get("ConsumedCapacity"), "Read")
+        except ClientError as e:
+            capture_exception(e)
+            logger.error(e)
+            return [], None
+        finally:
+            duration = (time.perf_counter() - query_start) * 1000
+            logger.debug("DB_QUERY: query=Sites_Page duration=%d queries=1", duration)
+            self._put_call_metrics(duration, 1, response.get("Items", []), "Read")
+
+        last_key = response.get("LastEvaluatedKey")
+        next_cursor = encode_cursor(last_key) if last_key else None
+        return self.load_sites_list(response.get("Items", [])), next_cursor
+
+    def iter_sites_pages(
+        self, page_size: int = 1000, cursor: str = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Query DynamoDB for all Sites, yielding each page of Sites as it's returned, so that only one page is
+        held in memory at a time.
+
+        :param page_size: Maximum number of Sites in each page
+        :param cursor: Optional token of the page to start from
+        :return: Iterator of Lists of Sites as Dict
+        """
+        while True:
+            sites, cursor = self.query_sites_page(page_size, cursor)
+            if sites:
+                yield sites
+            if not cursor:
+                return
+
+
+class AsyncDynamoDBClient:
+    """
+    Asyncio interface to a DynamoDBClient, with the same query and save methods.
+
+    Boto3 calls block, so they are run in a thread pool and awaited, allowing DynamoDB queries to run
+    concurrently with each other and with crawls in the same event loop.
+    """
+
+    def __init__(self, client: DynamoDBClient):
+        """
+        :param client: DynamoDBClient to run queries with, using its thread pool
+        """
+        self.client = client
+
+    async def _run(self, func, *args, **kwargs) -> Any:
+        """
+        Run a blocking function in the thread pool, in a copy of the current context.
+
+        :param func: Function to run
+        :return: Result of the function
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.client.executor, functools.partial(ctx.run, func, *args, **kwargs)
+        )
+
+    async def query_site_feeds(
+        self, site: Union[str, SiteHost], fields: List[str] = None
+    ) -> SiteHost:
+        """
+        Queries DynamoDB for the SiteHost and all its associated Feeds.
+
+        :param site: SiteHost object or string of website domain root
+        :param fields: Optional List of feed fields to read
+        :return: SiteHost object containing associated Feeds
+        """
+        return await self._run(self.client.query_site_feeds, site, fields)
+
+    async def query_host_failure(self, host: str) -> Optional[HostFailure]:
+        """
+        Queries DynamoDB for the failure record of a host.
+
+        :param host: Site host
+        :return: HostFailure, or None if the host's last crawl didn't fail
+        """
+        return await self._run(self.client.query_host_failure, host)
+
+    async def save_host_failure(self, failure: HostFailure) -> None:
+        """
+        Saves the failure record of a host.
+
+        :param failure: HostFailure
+        """
+        await self._run(self.client.save_host_failure, failure)
+
+    async def query_feedly_result(self, host: str) -> Optional[FeedlyResult]:
+        """
+        Queries DynamoDB for the stored Feedly search result of a host.
+
+        :param host: Root host of the Feedly query
+        :return: FeedlyResult, or None if not stored
+        """
+        return await self._run(self.client.query_feedly_result, host)
+
+    async def save_feedly_result(self, result: FeedlyResult) -> None:
+        """
+        Saves the Feedly search result of a host.
+
+        :param result: FeedlyResult
+        """
+        await self._run(self.client.save_feedly_result, result)
+
+    async def delete_host_failure(self, host: str) -> None:
+        """
+        Deletes the failure record of a host.
+
+        :param host: Site host
+        """
+        await self._run(self.client.delete_host_failure, host)
+
+    async def query_site_path(self, site_path: SitePath) -> SitePath:
+        """
+        Queries DynamoDB for the given SitePath.
+
+        :param site_path: SitePath record to query
+        :return: SitePath record
+        """
+        return await self._run(self.client.query_site_path, site_path)
+
+    async def query_site_with_path(
+        self, site: Union[str, SiteHost], site_path: SitePath, fields: List[str] = None
+    ) -> Tuple[SiteHost, SitePath]:
+        """
+        Queries DynamoDB for the SiteHost with all its associated Feeds, and for the given SitePath, with both
+        queries running concurrently.
+
+        The site and path items are in the same partition, but the Feeds and the requested path are not adjacent
+        in the sort key order, so a single Query would also read every other path of the site before it.
+
+        :param site: SiteHost object or string of website domain root
+        :param site_path: SitePath record to query
+        :param fields: Optional List of feed fields to read
+        :return: Tuple of SiteHost object containing associated Feeds, and SitePath record
+        """
+        loaded_site, loaded_path = await asyncio.gather(
+            self.query_site_feeds(site, fields), self.query_site_path(site_path)
+        )
+        return loaded_site, loaded_path
+
+    async def save_site_feeds(
+        self, site: SiteHost, feeds: List[CustomFeedInfo], site_path: SitePath
+    ) -> None:
+        """
+        Saves the SiteHost, its list of Feeds, and the queried SitePath to DynamoDB.
+
+        :param site: SiteHost object
+        :param feeds: List of CustomFeedInfo
+        :param site_path: SitePath object
+        """
+        return await self._run(self.client.save_site_feeds, site, feeds, site_path)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Return the hit and miss counters and size of the SiteHost and SitePath cache.
+        """
+        return self.client.cache_stats()
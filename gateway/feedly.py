@@ -1,13 +1,24 @@
-import asyncio
 from datetime import datetime, timedelta
 from typing import List, Set
 
-import aiohttp
+from dateutil.tz import tzutc
 from flask import current_app as app
 from yarl import URL
 
+from gateway.connections import connection_manager
+from gateway.dynamodb_client import AsyncDynamoDBClient
+from gateway.metrics import put_metric
+from gateway.schema.feedlyresult import FeedlyResult
 from gateway.utils import truncate_integer, remove_subdomains
 
+FEEDLY_SEARCH_URL = "https://cloud.feedly.com/v3/search/feeds"
+
+
+class FeedlyError(Exception):
+    """
+    The Feedly API returned an error response, such as when rate limited.
+    """
+
 
 def is_stale_feed(last_updated: int, stale_feed_date: datetime) -> bool:
     """
@@ -36,7 +47,7 @@ def is_stale_feed(last_updated: int, stale_feed_date: datetime) -> bool:
 async def fetch_feedly(query: str) -> List[str]:
     """
     Call the Feedly API for searching feeds, and return the URLs of feeds that have been updated
-    in the last 3 months.
+    in the last 3 months. Raises FeedlyError if the API doesn't return results.
 
     :param query: search query
     :return: List of URLs
@@ -45,12 +56,12 @@ async def fetch_feedly(query: str) -> List[str]:
 
     params = {"query": query}
     headers = {"user-agent": app.config.get("USER_AGENT")}
-    async with aiohttp.ClientSession(headers=headers) as session:
+    async with connection_manager.session(headers=headers) as session:
         async with session.get(
-            "https://cloud.feedly.com/v3/search/feeds", params=params
+            app.config.get("FEEDLY_SEARCH_URL") or FEEDLY_SEARCH_URL, params=params
         ) as resp:
             if resp.status != 200:
-                return []
+                raise FeedlyError(f"Feedly returned status {resp.status}")
 
             result = await resp.json()
 
@@ -97,17 +108,41 @@ def validate_feedly_urls(
     return list(new_urls)
 
 
-def fetch_feedly_feeds(query: str) -> List[str]:
+async def fetch_feedly_feeds(
+    query: str, db_client: AsyncDynamoDBClient = None, cache_ttl: int = 0
+) -> List[str]:
     """
-    Call the Feedly API in an async session, and match returned URLs against existing URLs.
+    Call the Feedly API, returning an empty list if the call fails.
+
+    If a cache TTL is given, the results are stored for the root host of the query, including empty results,
+    and following queries of the host return the stored results until they expire. The root host is found
+    in the same way as validate_feedly_urls, which only keeps URLs on the root host. Failed calls aren't
+    stored.
 
     :param query: The query string
+    :param db_client: DynamoDB client that stores the results
+    :param cache_ttl: Seconds that results are stored for. Results aren't stored if 0.
     :return: List of found URL strings
     """
+    host = remove_subdomains(URL(query).host) if cache_ttl and db_client else None
+    if host:
+        stored = await db_client.query_feedly_result(host)
+        if stored and stored.is_fresh(datetime.now(tzutc())):
+            app.logger.debug("Stored Feedly urls: %s", stored.urls)
+            put_metric("FeedlyCacheHits", 1)
+            return stored.urls
+
     try:
-        feed_urls: List[str] = asyncio.run(fetch_feedly(query))
+        feed_urls: List[str] = await fetch_feedly(query)
         app.logger.debug("Feedly urls: %s", feed_urls)
-        return feed_urls
+    except FeedlyError as e:
+        app.logger.warning("Search error: %s", e)
+        return []
     except Exception as e:
         app.logger.exception("Search error: %s", e)
         return []
+
+    if host:
+        result = FeedlyResult.create(host, feed_urls, datetime.now(tzutc()), cache_ttl)
+        await db_client.save_feedly_result(result)
+    return feed_urls
@@ -0,0 +1,175 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Union
+
+
+class Metrics:
+    """
+    Metrics of a single request, emitted as one CloudWatch Embedded Metric Format (EMF) log line.
+
+    Metrics with the same name are added together, so each DynamoDB call or search phase adds to the request's
+    totals. Metrics may be added from the request thread, the event loop, and the DynamoDB thread pool.
+    """
+
+    def __init__(self, namespace: str, dimensions: Dict[str, str]):
+        """
+        :param namespace: CloudWatch namespace of the metrics
+        :param dimensions: Dimensions of the metrics, such as the endpoint
+        """
+        self.namespace = namespace
+        self.dimensions = dimensions
+        self.values: Dict[str, float] = {}
+        self.units: Dict[str, str] = {}
+        self.properties: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def put(self, name: str, value: float, unit: str = "Count") -> None:
+        """
+        Add a value to a metric.
+
+        :param name: Metric name
+        :param value: Value to add
+        :param unit: CloudWatch unit of the metric
+        """
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def set_property(self, key: str, value: Any) -> None:
+        """
+        Set a property of the log line, which can be queried in CloudWatch Logs Insights but isn't a metric.
+
+        :param key: Property name
+        :param value: JSON serializable value
+        """
+        self.properties[key] = value
+
+    def to_emf(self, timestamp: int = None) -> Dict[str, Any]:
+        """
+        :param timestamp: Timestamp in milliseconds since the epoch. Defaults to now.
+        :return: EMF log object
+        """
+        with self._lock:
+            values = dict(self.values)
+            units = dict(self.units)
+        return {
+            **self.properties,
+            **self.dimensions,
+            **{name: round(value, 3) for name, value in values.items()},
+            "_aws": {
+                "Timestamp": timestamp or int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [list(self.dimensions)],
+                        "Metrics": [
+                            {"Name": name, "Unit": unit} for name, unit in units.items()
+                        ],
+                    }
+                ],
+            },
+        }
+
+    def emit(self, stream: TextIO = None) -> None:
+        """
+        Write the metrics to stdout, where AWS Lambda sends them to CloudWatch Logs.
+
+        :param stream: Optional stream to write to
+        """
+        if not self.values:
+            return
+        stream = stream or sys.stdout
+        stream.write(json.dumps(self.to_emf(), default=str) + "\n")
+        stream.flush()
+
+
+_current_metrics: ContextVar[Optional[Metrics]] = ContextVar(
+    "gateway_metrics", default=None
+)
+
+
+def current_metrics() -> Optional[Metrics]:
+    """
+    :return: Metrics of the current request, or None if metrics aren't recorded
+    """
+    return _current_metrics.get()
+
+
+def put_metric(name: str, value: float, unit: str = "Count") -> None:
+    """
+    Add a value to a metric of the current request. Does nothing if metrics aren't recorded.
+
+    :param name: Metric name
+    :param value: Value to add
+    :param unit: CloudWatch unit of the metric
+    """
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.put(name, value, unit)
+
+
+def set_metric_property(key: str, value: Any) -> None:
+    """
+    Set a property of the current request's metrics. Does nothing if metrics aren't recorded.
+
+    :param key: Property name
+    :param value: JSON serializable value
+    """
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.set_property(key, value)
+
+
+def put_consumed_capacity(
+    consumed: Union[Dict, List[Dict], None], capacity_type: str
+) -> None:
+    """
+    Add the capacity units consumed by a DynamoDB call made with ReturnConsumedCapacity.
+
+    :param consumed: ConsumedCapacity of the response, which is a list for batch calls
+    :param capacity_type: "Read" or "Write"
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or not consumed:
+        return
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    units = sum(float(item.get("CapacityUnits", 0)) for item in consumed)
+    metrics.put(f"DynamoDB{capacity_type}CapacityUnits", units)
+
+
+@contextmanager
+def use_metrics(metrics: Optional[Metrics]) -> Iterator[Optional[Metrics]]:
+    """
+    Record metrics of code run within the context, and of tasks and threads started with a copy of it.
+
+    :param metrics: Metrics to record, or None to not record metrics
+    :return: Context manager yielding the Metrics
+    """
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def metrics_context(namespace: str, endpoint: str) -> Iterator[Optional[Metrics]]:
+    """
+    Record the metrics of a request, and emit them when the context exits.
+
+    :param namespace: CloudWatch namespace. Metrics aren't recorded if empty.
+    :param endpoint: Name of the endpoint, used as the metrics dimension
+    :return: Context manager yielding the Metrics, or None if metrics aren't recorded
+    """
+    metrics = Metrics(namespace, {"Endpoint": endpoint}) if namespace else None
+    with use_metrics(metrics):
+        try:
+            yield metrics
+        finally:
+            if metrics is not None:
+                metrics.emit()
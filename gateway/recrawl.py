@@ -0,0 +1,182 @@
+import json
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Set, Tuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+
+class RecrawlRequest:
+    """
+    Request to crawl a site again in the background, after its stored feeds were returned as stale.
+    """
+
+    def __init__(self, url: str, check_feedly: bool = True, check_all: bool = False):
+        """
+        :param url: URL that was searched
+        :param check_feedly: Whether to query Feedly for feed URLs
+        :param check_all: Whether to check all standard feed URL locations
+        """
+        self.url = url
+        self.check_feedly = check_feedly
+        self.check_all = check_all
+
+    @property
+    def key(self) -> Tuple:
+        return self.url, self.check_feedly, self.check_all
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "url": self.url,
+                "check_feedly": self.check_feedly,
+                "check_all": self.check_all,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: str) -> "RecrawlRequest":
+        """
+        Load a RecrawlRequest from a queue message body. Raises ValueError if the message isn't a request.
+
+        :param data: JSON message body
+        :return: RecrawlRequest
+        """
+        try:
+            values: Dict = json.loads(data)
+            return cls(
+                url=str(values["url"]),
+                check_feedly=bool(values.get("check_feedly", True)),
+                check_all=bool(values.get("check_all", False)),
+            )
+        except (TypeError, KeyError, AttributeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid recrawl request: {data!r}") from e
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.url})"
+
+
+class RecrawlQueue(ABC):
+    """
+    Queue of sites to crawl in the background.
+    """
+
+    @abstractmethod
+    def enqueue(self, request: RecrawlRequest) -> bool:
+        """
+        Add a recrawl request to the queue.
+
+        :param request: RecrawlRequest
+        :return: True if the request was queued
+        """
+        raise NotImplementedError
+
+
+class LocalRecrawlQueue(RecrawlQueue):
+    """
+    In-process queue that runs recrawls in a background worker thread.
+
+    Requests for a site that is already waiting in the queue are dropped. Intended for tests and local
+    development, as the worker thread is paused between AWS Lambda invocations.
+    """
+
+    def __init__(self, handler: Callable[[RecrawlRequest], None], maxsize: int = 100):
+        """
+        :param handler: Function that runs the recrawl
+        :param maxsize: Maximum number of waiting requests. Requests are dropped when the queue is full.
+        """
+        self.handler = handler
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._pending: Set[Tuple] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread = None
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._work, name="gateway-recrawl", daemon=True
+            )
+            self._thread.start()
+
+    def enqueue(self, request: RecrawlRequest) -> bool:
+        with self._lock:
+            if request.key in self._pending:
+                return False
+            try:
+                self._queue.put_nowait(request)
+            except queue.Full:
+                logger.warning("Recrawl queue is full, dropped %s", request.url)
+                return False
+            self._pending.add(request.key)
+            self._ensure_worker()
+        return True
+
+    def _work(self) -> None:
+        while True:
+            request: RecrawlRequest = self._queue.get()
+            try:
+                self.handler(request)
+            except Exception as e:
+                logger.exception("Recrawl of %s failed: %s", request.url, e)
+            finally:
+                with self._lock:
+                    self._pending.discard(request.key)
+                self._queue.task_done()
+
+    def join(self) -> None:
+        """
+        Wait until all queued recrawls have run.
+        """
+        self._queue.join()
+
+
+class SQSRecrawlQueue(RecrawlQueue):
+    """
+    Sends recrawl requests to an Amazon SQS queue, to be run by a separate worker that receives the messages.
+    """
+
+    def __init__(self, queue_url: str, client=None):
+        """
+        :param queue_url: URL of the SQS queue
+        :param client: Optional boto3 SQS client
+        """
+        self.queue_url = queue_url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("sqs")
+        return self._client
+
+    def enqueue(self, request: RecrawlRequest) -> bool:
+        try:
+            self.client.send_message(
+                QueueUrl=self.queue_url, MessageBody=request.to_json()
+            )
+        except (BotoCoreError, ClientError) as e:
+            logger.error("Unable to queue recrawl of %s: %s", request.url, e)
+            return False
+        return True
+
+
+def sqs_event_requests(event: Dict) -> Tuple[RecrawlRequest, ...]:
+    """
+    Read the recrawl requests from the records of an SQS Lambda event. Invalid messages are logged and skipped.
+
+    :param event: SQS event
+    :return: Tuple of RecrawlRequests
+    """
+    requests = []
+    for record in event.get("Records", []):
+        try:
+            requests.append(RecrawlRequest.from_json(record.get("body", "")))
+        except ValueError as e:
+            logger.warning(e)
+    return tuple(requests)
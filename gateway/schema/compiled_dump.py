@@ -0,0 +1,214 @@
+import functools
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from marshmallow import Schema, ValidationError, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from yarl import URL
+
+from gateway.schema.fields import NoneString, URLField
+
+# Function that returns the serialized value of a field for an object, or missing if the field is omitted.
+FieldDumper = Callable[[Any], Any]
+
+
+def _none_string(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValidationError("value must be a string or None")
+    if not value or not value.strip():
+        return None
+    return str(value)
+
+
+def _url_string(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if not isinstance(value, (URL, str)):
+        raise ValidationError("value must be a URL, string, or None")
+    value = str(value)
+    if not value.strip():
+        return None
+    return value
+
+
+def _string(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def _value_serializer(field: fields.Field) -> Optional[Callable[[Any], Any]]:
+    """
+    Return a function that serializes a value in the same way as the field, or None if the field type is not
+    supported and the field must serialize its own values.
+
+    Only exact field types are matched, as subclasses may override serialization.
+
+    :param field: Marshmallow field
+    :return: Serializer function or None
+    """
+    field_type = type(field)
+
+    if field_type is NoneString:
+        return _none_string
+    if field_type is URLField:
+        return _url_string
+    if field_type is fields.String:
+        return _string
+
+    if field_type in (fields.Integer, fields.Float) and not field.as_string:
+        num_type = field.num_type
+
+        def number(value):
+            return None if value is None else num_type(value)
+
+        return number
+
+    if field_type is fields.Boolean:
+        truthy, falsy = field.truthy, field.falsy
+
+        def boolean(value):
+            if value is None:
+                return None
+            try:
+                if value in truthy:
+                    return True
+                if value in falsy:
+                    return False
+            except TypeError:
+                pass
+            return bool(value)
+
+        return boolean
+
+    if field_type is fields.DateTime:
+        format_func = field.SERIALIZATION_FUNCS.get(
+            field.format or field.DEFAULT_FORMAT
+        )
+        if not format_func:
+            return None
+
+        def date_time(value):
+            return None if value is None else format_func(value)
+
+        return date_time
+
+    if field_type is fields.List:
+        inner = _value_serializer(field.inner)
+        if inner is None:
+            return None
+
+        def list_values(value):
+            return None if value is None else [inner(each) for each in value]
+
+        return list_values
+
+    return None
+
+
+def _field_dumper(schema: Schema, name: str, field: fields.Field) -> FieldDumper:
+    """
+    Create the function that dumps a single field of an object.
+
+    :param schema: Schema instance the field is bound to
+    :param name: Field name in the schema
+    :param field: Marshmallow field
+    :return: FieldDumper
+    """
+    serialize = _value_serializer(field)
+    attribute = field.attribute or name
+
+    # Fields with unsupported types, or that read values other than simple object attributes, are
+    # serialized by marshmallow.
+    if serialize is None or not field._CHECK_ATTRIBUTE or "." in attribute:
+
+        def marshmallow_dumper(obj):
+            return field.serialize(name, obj, accessor=schema.get_attribute)
+
+        return marshmallow_dumper
+
+    default = field.dump_default
+
+    def dumper(obj):
+        value = getattr(obj, attribute, missing)
+        if value is missing:
+            value = default() if callable(default) else default
+            if value is missing:
+                return missing
+        return serialize(value)
+
+    return dumper
+
+
+class CompiledDump:
+    """
+    Precompiled serializer that produces the same output as dumping objects with a marshmallow Schema, but
+    without the per-value overhead of marshmallow's field dispatch.
+
+    The fields are resolved once by the Schema, including only and exclude options, and each supported field
+    type is replaced by a plain serializer function. Schemas with pre_dump or post_dump hooks, and objects that
+    are accessed by key rather than attribute, are dumped by the Schema.
+    """
+
+    def __init__(self, schema: Schema):
+        """
+        :param schema: Schema instance to compile
+        """
+        self.schema = schema
+        self._use_schema = bool(schema._hooks[PRE_DUMP] or schema._hooks[POST_DUMP])
+        self._dumpers: List[Tuple[str, FieldDumper]] = [
+            (
+                field.data_key if field.data_key is not None else name,
+                _field_dumper(schema, name, field),
+            )
+            for name, field in schema.dump_fields.items()
+        ]
+
+    def _dump_one(self, obj: Any) -> Dict:
+        data = {}
+        for key, dumper in self._dumpers:
+            value = dumper(obj)
+            if value is not missing:
+                data[key] = value
+        return data
+
+    def dump(self, obj: Any, many: bool = None) -> Any:
+        """
+        Serialize an object, or a collection of objects, to native Python data types.
+
+        :param obj: Object or collection of objects to serialize
+        :param many: Whether obj is a collection. Uses the Schema's many option if None.
+        :return: Serialized data
+        """
+        many = self.schema.many if many is None else many
+        if self._use_schema or obj is None:
+            return self.schema.dump(obj, many=many)
+
+        items = list(obj) if many else [obj]
+        if any(hasattr(item, "__getitem__") for item in items):
+            return self.schema.dump(items if many else obj, many=many)
+
+        dumped = [self._dump_one(item) for item in items]
+        return dumped if many else dumped[0]
+
+
+@functools.lru_cache(maxsize=128)
+def compiled_dump(
+    schema_class: Type[Schema],
+    only: Tuple[str, ...] = None,
+    exclude: Tuple[str, ...] = (),
+    many: bool = False,
+) -> CompiledDump:
+    """
+    Return the CompiledDump for a Schema class and options, compiling it on first use.
+
+    :param schema_class: Marshmallow Schema class
+    :param only: Optional Tuple of the only fields to dump
+    :param exclude: Tuple of fields to exclude
+    :param many: Whether to dump collections of objects by default
+    :return: CompiledDump
+    """
+    return CompiledDump(schema_class(only=only, exclude=exclude, many=many))
@@ -2,10 +2,17 @@ from datetime import datetime
 
 from feedsearch_crawler import FeedInfo
 
+from gateway.scoring import feed_scorer
+
 
 class CustomFeedInfo(FeedInfo):
     last_seen: datetime = None
     host: str = ""
+    # Hash of the DynamoDB item this feed was loaded from or last saved as, to skip writing unchanged feeds.
+    stored_hash: str = None
+    # Version of the scoring rules that calculated the score, so stored scores are only recalculated when the
+    # rules change.
+    score_version: int = None
 
     @property
     def is_valid(self) -> bool:
@@ -44,50 +51,10 @@ class CustomFeedInfo(FeedInfo):
 
 
 def score_item(item: FeedInfo, query_host: str):
-    score = 0
-
-    url_str = str(item.url).lower()
-
-    # -- Score Decrement --
-
-    if query_host and query_host not in item.url.host:
-        score -= 20
-
-    # Decrement the score by every extra path in the url
-    parts_len = len(item.url.parts)
-    if parts_len > 2:
-        score -= (parts_len - 2) * 2
-
-    if item.bozo:
-        score -= 20
-    if not item.description:
-        score -= 10
-    if "georss" in url_str:
-        score -= 10
-    if "alt" in url_str:
-        score -= 7
-    if "feedburner" in url_str:
-        score -= 10
-
-    # -- Score Increment --
-    if item.url.scheme == "https":
-        score += 10
-    if item.is_push:
-        score += 10
-    if "index" in url_str:
-        score += 30
-
-    if "comments" in url_str or "comments" in item.title.lower():
-        score -= 15
-    else:
-        score += int(item.velocity)
-
-    if any(map(url_str.count, ["/home", "/top", "/most", "/magazine"])):
-        score += 10
-
-    kw = ["atom", "rss", ".xml", "feed", "rdf"]
-    for p, t in zip(range(len(kw) * 2, 0, -2), kw):
-        if t in url_str:
-            score += p
+    """
+    Score a single feed according to the queried host. Use gateway.scoring.score_feeds to score many feeds.
 
-    item.score = score
+    :param item: Feed to score
+    :param query_host: Root domain of the queried URL
+    """
+    feed_scorer.score_feed(item, query_host)
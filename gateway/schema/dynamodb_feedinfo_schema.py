@@ -6,6 +6,7 @@ from gateway.schema.dynamodb_schema_base import (
     ExternalFeedInfoSchemaDynamoDbMeta,
 )
 from gateway.schema.external_feedinfo_schema import ExternalFeedInfoSchema
+from gateway.schema.fields import CompressedString
 
 
 class DynamoDbFeedInfoSchema(
@@ -18,6 +19,10 @@ class DynamoDbFeedInfoSchema(
     SK = fields.Method("serialize_sort_key")
     host = fields.String()
     velocity = fields.Decimal(allow_none=True)
+    score_version = fields.Integer(allow_none=True)
+    # Large text values are stored compressed to reduce item size, and the read and write capacity used.
+    description = CompressedString(allow_none=True)
+    favicon_data_uri = CompressedString(allow_none=True)
 
     def serialize_primary_key(self, obj):
         if not obj.host:
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from dateutil import tz
+from marshmallow import Schema, fields, ValidationError, post_load, EXCLUDE
+
+from gateway.schema.dynamodb_schema_base import DynamoDBSchema, SchemaDynamoDbMeta
+from gateway.schema.feedlyresult import FeedlyResult
+
+
+class DynamoDbFeedlyResultSchema(Schema, DynamoDBSchema, metaclass=SchemaDynamoDbMeta):
+    primary_key_prefix = "SITE#"
+    sort_key_prefix = "#FEEDLY#"
+
+    host = fields.String()
+    urls = fields.List(fields.String())
+    fetched = fields.DateTime()
+    expires = fields.Method("serialize_expires", deserialize="load_expires")
+    PK = fields.Method("serialize_primary_key")
+    SK = fields.Method("serialize_sort_key")
+
+    def serialize_primary_key(self, obj):
+        if not obj.host:
+            raise ValidationError("Host value must exist.")
+        return self.create_primary_key(obj.host)
+
+    def serialize_sort_key(self, obj):
+        return self.create_sort_key("")
+
+    def serialize_expires(self, obj):
+        # Stored as seconds since the epoch, for the table's Time to Live.
+        if not obj.expires:
+            raise ValidationError("Expires value must exist.")
+        return int(obj.expires.timestamp())
+
+    def load_expires(self, value):
+        return datetime.fromtimestamp(int(value), tz.tzutc())
+
+    # noinspection PyUnusedLocal
+    @post_load
+    def make_feedly_result(self, data, **kwargs):
+        return FeedlyResult(**data)
+
+    class Meta:
+        # Pass EXCLUDE as Meta option to keep marshmallow 2 behavior
+        unknown = EXCLUDE
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from marshmallow import Schema, fields, ValidationError, post_load, EXCLUDE
+
+from gateway.schema.dynamodb_schema_base import DynamoDBSchema, SchemaDynamoDbMeta
+from gateway.schema.hostfailure import HostFailure
+
+
+class DynamoDbHostFailureSchema(Schema, DynamoDBSchema, metaclass=SchemaDynamoDbMeta):
+    primary_key_prefix = "SITE#"
+    sort_key_prefix = "#FAILED#"
+
+    # Failure records are kept for this long after their backoff window, so that consecutive failures of a
+    # host keep increasing the window, and are then deleted by the table's Time to Live.
+    expiry_delay = timedelta(days=1)
+
+    host = fields.String()
+    failures = fields.Integer()
+    last_failed = fields.DateTime()
+    retry_after = fields.DateTime()
+    expires = fields.Method("serialize_expires", dump_only=True)
+    PK = fields.Method("serialize_primary_key")
+    SK = fields.Method("serialize_sort_key")
+
+    def serialize_primary_key(self, obj):
+        if not obj.host:
+            raise ValidationError("Host value must exist.")
+        return self.create_primary_key(obj.host)
+
+    def serialize_sort_key(self, obj):
+        return self.create_sort_key("")
+
+    def serialize_expires(self, obj):
+        if not obj.retry_after:
+            raise ValidationError("Retry after value must exist.")
+        return int((obj.retry_after + self.expiry_delay).timestamp())
+
+    # noinspection PyUnusedLocal
+    @post_load
+    def make_host_failure(self, data, **kwargs):
+        return HostFailure(**data)
+
+    class Meta:
+        # Pass EXCLUDE as Meta option to keep marshmallow 2 behavior
+        unknown = EXCLUDE
@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, ValidationError, post_load, EXCLUDE
+from marshmallow import Schema, fields, ValidationError, post_load, post_dump, EXCLUDE
 
 from gateway.schema.sitehost import SiteHost
 from gateway.schema.dynamodb_schema_base import DynamoDBSchema, SchemaDynamoDbMeta
@@ -10,6 +10,9 @@ class DynamoDbSiteSchema(Schema, DynamoDBSchema, metaclass=SchemaDynamoDbMeta):
 
     host = fields.String()
     last_seen = fields.DateTime()
+    crawl_stats = fields.Dict(
+        keys=fields.String(), values=fields.Integer(), allow_none=True
+    )
     PK = fields.Method("serialize_primary_key")
     SK = fields.Method("serialize_sort_key")
 
@@ -21,6 +24,13 @@ class DynamoDbSiteSchema(Schema, DynamoDBSchema, metaclass=SchemaDynamoDbMeta):
     def serialize_sort_key(self, obj):
         return self.create_sort_key("")
 
+    # noinspection PyUnusedLocal
+    @post_dump
+    def remove_empty_crawl_stats(self, data, **kwargs):
+        if data.get("crawl_stats") is None:
+            data.pop("crawl_stats", None)
+        return data
+
     # noinspection PyUnusedLocal
     @post_load
     def make_site_host(self, data, **kwargs):
@@ -0,0 +1,194 @@
+import re
+import zlib
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from marshmallow import ValidationError, fields
+from yarl import URL
+
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.fields import CompressedString, NoneString, URLField
+
+# Datetime strings in the format written by datetime.isoformat(), which is how dates are stored.
+ISO_DATETIME_REGEX = re.compile(
+    r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{6})?([+-]\d{2}:\d{2})?$"
+)
+
+
+class FeedLoadError(Exception):
+    """
+    Raised when an item contains a value that the fast loader doesn't handle, and must be loaded by the schema.
+    """
+
+
+def _fixed_timezone(offset: timedelta) -> timezone:
+    """
+    Return a timezone equal to the one marshmallow creates for the offset, including its name.
+    """
+    minutes = int(offset.total_seconds()) // 60
+    sign = "-" if minutes < 0 else "+"
+    hours, minutes = divmod(abs(minutes), 60)
+    return timezone(offset, f"{sign}{hours:02d}{minutes:02d}")
+
+
+_timezones: Dict[timedelta, timezone] = {}
+
+
+def _datetime(value: Any) -> datetime:
+    if not isinstance(value, str) or not ISO_DATETIME_REGEX.match(value):
+        raise FeedLoadError("Unsupported datetime format")
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed
+    offset = parsed.utcoffset()
+    tzinfo = _timezones.get(offset)
+    if tzinfo is None:
+        tzinfo = _timezones.setdefault(offset, _fixed_timezone(offset))
+    return parsed.replace(tzinfo=tzinfo)
+
+
+def _string(value: Any) -> str:
+    if type(value) is not str:
+        raise FeedLoadError("Value is not a string")
+    return value
+
+
+def _url(value: Any) -> URL:
+    if type(value) is not str:
+        raise FeedLoadError("Value is not a string")
+    return URL(value)
+
+
+def _boolean(value: Any) -> bool:
+    if value is True or value is False:
+        return value
+    raise FeedLoadError("Value is not a boolean")
+
+
+def _integer(value: Any) -> int:
+    if type(value) not in (Decimal, int):
+        raise FeedLoadError("Value is not a number")
+    return int(value)
+
+
+def _decimal(value: Any) -> Decimal:
+    if type(value) not in (Decimal, int):
+        raise FeedLoadError("Value is not a number")
+    return Decimal(str(value))
+
+
+def _converter(field: fields.Field) -> Optional[Callable[[Any], Any]]:
+    """
+    Return a function that converts a DynamoDB attribute value in the same way as the field deserializes it,
+    or None if the field must be loaded by marshmallow.
+
+    Converters only handle the value types written by DynamoDbFeedInfoSchema, and raise a FeedLoadError
+    for any other value.
+
+    :param field: Marshmallow field
+    :return: Converter function or None
+    """
+    if field.validators:
+        return None
+
+    field_type = type(field)
+    if field_type in (NoneString, fields.String):
+        converter = _string
+    elif field_type is URLField:
+        converter = _url
+    elif field_type is CompressedString:
+
+        def converter(value):
+            if type(value) is str:
+                return value
+            return field._deserialize(value, None, None)
+
+    elif field_type is fields.Boolean:
+        converter = _boolean
+    elif field_type is fields.Integer and not field.strict:
+        converter = _integer
+    elif field_type is fields.Decimal and field.places is None:
+        converter = _decimal
+    elif field_type is fields.DateTime and field.format in (None, "iso"):
+        converter = _datetime
+    elif field_type is fields.List and type(field.inner) in (NoneString, fields.String):
+
+        def converter(value):
+            if type(value) is not list:
+                raise FeedLoadError("Value is not a list")
+            return [_string(each) for each in value]
+
+    else:
+        return None
+
+    if not field.allow_none:
+        return converter
+
+    def allow_none(value):
+        return None if value is None else converter(value)
+
+    return allow_none
+
+
+def _create_converters(schema: DynamoDbFeedInfoSchema) -> Dict[str, Callable]:
+    """
+    Create the converters for each loaded field of the schema, keyed by DynamoDB attribute name.
+    """
+    converters = {}
+    for name, field in schema.load_fields.items():
+        attribute = field.attribute or name
+        converter = _converter(field)
+        # Attributes are set directly on the CustomFeedInfo, so they must be existing attributes.
+        if converter is None or attribute != name or not hasattr(CustomFeedInfo, name):
+            raise TypeError(f"Field {name} is not supported by the feed loader")
+        converters[field.data_key or name] = converter
+    return converters
+
+
+_converters = _create_converters(DynamoDbFeedInfoSchema())
+
+
+def load_feed_item(item: Dict[str, Any], only: Iterable[str] = None) -> CustomFeedInfo:
+    """
+    Load a DynamoDB item into a CustomFeedInfo, with the same result as DynamoDbFeedInfoSchema.load.
+    Raises a FeedLoadError if the item can't be loaded without validation.
+
+    :param item: DynamoDB item
+    :param only: Optional attribute names to load. All schema fields are loaded if None.
+    :return: CustomFeedInfo
+    """
+    data = {}
+    try:
+        for key, value in item.items():
+            converter = _converters.get(key)
+            if converter is None or (only is not None and key not in only):
+                continue
+            data[key] = converter(value)
+    except (TypeError, ValueError, ArithmeticError, ValidationError, zlib.error) as e:
+        raise FeedLoadError(f"Unable to load {key}") from e
+
+    if "url" not in data:
+        raise FeedLoadError("Feed has no URL")
+
+    feed = CustomFeedInfo.__new__(CustomFeedInfo)
+    feed.__dict__.update(data)
+    return feed
+
+
+def load_feed_items(
+    items: List[Dict[str, Any]], only: Iterable[str] = None
+) -> List[CustomFeedInfo]:
+    """
+    Load DynamoDB items into CustomFeedInfo objects, without the overhead of schema validation.
+    Raises a FeedLoadError if any item can't be loaded, so that the items can be loaded and validated by
+    DynamoDbFeedInfoSchema instead.
+
+    :param items: List of DynamoDB items
+    :param only: Optional attribute names to load. All schema fields are loaded if None.
+    :return: List of CustomFeedInfo
+    """
+    if only is not None:
+        only = frozenset(only)
+    return [load_feed_item(item, only) for item in items]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from typing import List
+
+
+class FeedlyResult:
+    """
+    Feed URLs returned by the Feedly search API for a host, stored so that Feedly isn't queried again for
+    the host until the result expires.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        urls: List[str] = None,
+        fetched: datetime = None,
+        expires: datetime = None,
+    ):
+        """
+        :param host: Root host of the query
+        :param urls: Feed URLs returned by Feedly, which may be empty
+        :param fetched: When Feedly was queried
+        :param expires: When the result should no longer be used
+        """
+        self.host = host
+        self.urls = urls or []
+        self.fetched = fetched
+        self.expires = expires
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.host}, urls={len(self.urls)})"
+
+    @classmethod
+    def create(cls, host: str, urls: List[str], now: datetime, ttl: int):
+        """
+        :param host: Root host of the query
+        :param urls: Feed URLs returned by Feedly
+        :param now: When Feedly was queried
+        :param ttl: Seconds that the result may be used for
+        :return: FeedlyResult
+        """
+        return cls(host, urls, now, now + timedelta(seconds=ttl))
+
+    def copy(self) -> "FeedlyResult":
+        return self.__class__(
+            host=self.host,
+            urls=list(self.urls),
+            fetched=self.fetched,
+            expires=self.expires,
+        )
+
+    def is_fresh(self, now: datetime) -> bool:
+        """
+        :param now: Current time
+        :return: True if the result hasn't expired. Expired items may still be read before DynamoDB deletes
+            them.
+        """
+        return bool(self.expires and now < self.expires)
@@ -1,6 +1,52 @@
+import base64
+import binascii
+import zlib
+
 from marshmallow import fields, ValidationError
 from yarl import URL
 
+# First byte of compressed values, identifying how the value was encoded.
+ZLIB_TEXT = b"\x01"
+ZLIB_DATA_URI = b"\x02"
+
+
+def compress_string(value: str, level: int = 9) -> bytes:
+    """
+    Compress a string to bytes. Base64 data URIs are decoded before compression, as base64 text compresses badly.
+
+    :param value: String to compress
+    :param level: zlib compression level
+    :return: Compressed bytes, prefixed with the encoding type
+    """
+    if value.startswith("data:") and ";base64," in value:
+        header, _, data = value.partition(",")
+        try:
+            raw = base64.b64decode(data, validate=True)
+            # Only use the decoded data if it encodes back to exactly the same string.
+            if base64.b64encode(raw).decode("ascii") == data:
+                payload = header.encode("utf-8") + b"," + raw
+                return ZLIB_DATA_URI + zlib.compress(payload, level)
+        except (binascii.Error, ValueError):
+            pass
+
+    return ZLIB_TEXT + zlib.compress(value.encode("utf-8"), level)
+
+
+def decompress_string(value: bytes) -> str:
+    """
+    Decompress bytes created by compress_string.
+
+    :param value: Compressed bytes
+    :return: Original string
+    """
+    encoding, data = value[:1], zlib.decompress(value[1:])
+    if encoding == ZLIB_DATA_URI:
+        header, _, raw = data.partition(b",")
+        return header.decode("utf-8") + "," + base64.b64encode(raw).decode("ascii")
+    if encoding == ZLIB_TEXT:
+        return data.decode("utf-8")
+    raise ValueError("Unknown compressed string encoding")
+
 
 class NoneString(fields.String):
     def _serialize(self, value, attr, obj, **kwargs):
@@ -31,3 +77,39 @@ class URLField(fields.String):
             return URL(value)
         except Exception as error:
             raise self.make_error("invalid") from error
+
+
+class CompressedString(NoneString):
+    """
+    String that is serialized as compressed bytes if it's long enough to be worth compressing.
+
+    Stored values may be either compressed bytes or plain strings, so that values stored before compression was
+    enabled can still be loaded.
+    """
+
+    def __init__(self, min_length: int = 128, **kwargs):
+        """
+        :param min_length: Strings shorter than this are not compressed.
+        """
+        super().__init__(**kwargs)
+        self.min_length = min_length
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        value = super(CompressedString, self)._serialize(value, attr, obj, **kwargs)
+        if value is None or len(value) < self.min_length:
+            return value
+        compressed = compress_string(value)
+        if len(compressed) >= len(value.encode("utf-8")):
+            return value
+        return compressed
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        # Boto3 returns binary attributes as Binary objects.
+        if hasattr(value, "value") and isinstance(value.value, bytes):
+            value = value.value
+        if isinstance(value, (bytes, bytearray)):
+            try:
+                return decompress_string(bytes(value))
+            except (zlib.error, ValueError, UnicodeDecodeError) as error:
+                raise self.make_error("invalid") from error
+        return super(CompressedString, self)._deserialize(value, attr, data, **kwargs)
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+
+class HostFailure:
+    """
+    Record of a host whose crawls failed to connect to it, so that it isn't crawled again until its backoff
+    window has passed.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failures: int = 0,
+        last_failed: datetime = None,
+        retry_after: datetime = None,
+    ):
+        """
+        :param host: Crawled host, including any subdomain
+        :param failures: Number of consecutive failed crawls
+        :param last_failed: When the last crawl failed
+        :param retry_after: When the host may be crawled again
+        """
+        self.host = host
+        self.failures = failures
+        self.last_failed = last_failed
+        self.retry_after = retry_after
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.host}, failures={self.failures})"
+
+    def copy(self) -> "HostFailure":
+        return self.__class__(
+            host=self.host,
+            failures=self.failures,
+            last_failed=self.last_failed,
+            retry_after=self.retry_after,
+        )
+
+    def in_backoff(self, now: datetime) -> bool:
+        """
+        :param now: Current time
+        :return: True if the host shouldn't be crawled yet
+        """
+        return bool(self.retry_after and now < self.retry_after)
+
+    def add_failure(self, now: datetime, backoff: int, max_backoff: int) -> None:
+        """
+        Record a failed crawl. The backoff window doubles with each consecutive failure.
+
+        :param now: When the crawl failed
+        :param backoff: Backoff window in seconds after the first failure
+        :param max_backoff: Maximum backoff window in seconds
+        """
+        self.failures += 1
+        window = min(backoff * 2 ** (self.failures - 1), max_backoff)
+        self.last_failed = now
+        self.retry_after = now + timedelta(seconds=window)
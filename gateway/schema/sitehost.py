@@ -1,3 +1,4 @@
+import copy
 from datetime import datetime
 from typing import List, Dict
 
@@ -10,10 +11,17 @@ class SiteHost:
         host: str,
         last_seen: datetime = None,
         feeds: Dict[str, CustomFeedInfo] = None,
+        crawl_stats: Dict[str, int] = None,
     ):
         self.host = host
         self.last_seen = last_seen
         self.feeds = feeds or {}
+        # Summary of the stats of the site's last crawl, used to choose the parameters of the next crawl.
+        self.crawl_stats = crawl_stats
+        # Hash of the DynamoDB item this site was loaded from or last saved as.
+        self.stored_hash: str = None
+        # True if only some of the feed attributes were loaded.
+        self.partial: bool = False
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and other.host == self.host
@@ -26,3 +34,18 @@ class SiteHost:
 
     def load_feeds(self, feeds: List[CustomFeedInfo]) -> None:
         self.feeds = {str(feed.url): feed for feed in feeds}
+
+    def copy(self) -> "SiteHost":
+        """
+        Return a copy of the SiteHost with copies of its Feeds, so that the copy can be modified without changing
+        the original.
+        """
+        copied = self.__class__(
+            host=self.host,
+            last_seen=self.last_seen,
+            feeds={url: copy.copy(feed) for url, feed in self.feeds.items()},
+            crawl_stats=copy.copy(self.crawl_stats),
+        )
+        copied.stored_hash = self.stored_hash
+        copied.partial = self.partial
+        return copied
@@ -10,6 +10,8 @@ class SitePath:
         self.path = path
         self.last_seen = last_seen
         self.feeds = feeds or []
+        # Hash of the DynamoDB item this path was loaded from or last saved as.
+        self.stored_hash: str = None
 
     def __eq__(self, other):
         return (
@@ -23,3 +25,16 @@ class SitePath:
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.host}{self.path})"
+
+    def copy(self) -> "SitePath":
+        """
+        Return a copy of the SitePath that can be modified without changing the original.
+        """
+        copied = self.__class__(
+            host=self.host,
+            path=self.path,
+            last_seen=self.last_seen,
+            feeds=list(self.feeds),
+        )
+        copied.stored_hash = self.stored_hash
+        return copied
@@ -0,0 +1,170 @@
+import functools
+from typing import Dict, Iterable, List, Tuple
+
+from dateutil import tz
+from feedsearch_crawler import FeedInfo
+from yarl import URL
+
+from gateway.utils import force_utc
+
+UTC = tz.tzutc()
+
+# Version of the scoring rules. Scores are stored with the version they were calculated by, so increment it
+# whenever the rules change to have stored scores recalculated when they're next read.
+SCORE_VERSION = 1
+
+
+class FeedScorer:
+    """
+    Scores feeds by how likely they are to be the main feeds of the queried site.
+
+    Keywords are compiled into a table of the keywords with their scores, and each URL is lowercased and scanned
+    for them once. The score of each URL is cached, as the same feeds of a site are scored again on every search
+    of that site, and scoring a cached URL only needs the feed attributes that change between crawls.
+    """
+
+    # Score added for each keyword found in the feed URL.
+    url_keyword_scores: Dict[str, int] = {
+        "georss": -10,
+        "alt": -7,
+        "feedburner": -10,
+        "index": 30,
+        "atom": 10,
+        "rss": 8,
+        ".xml": 6,
+        "feed": 4,
+        "rdf": 2,
+    }
+    # Score added once if any of these keywords are found in the feed URL.
+    section_keywords: Tuple[str, ...] = ("/home", "/top", "/most", "/magazine")
+    section_score = 10
+    comments_keyword = "comments"
+
+    def __init__(self, cache_size: int = 4096, version: int = SCORE_VERSION):
+        """
+        :param cache_size: Maximum number of URL scores to cache
+        :param version: Version of the scoring rules set on scored feeds
+        """
+        self.version = version
+        self._keyword_table: Tuple[Tuple[str, int], ...] = tuple(
+            self.url_keyword_scores.items()
+        )
+        self._score_url = functools.lru_cache(maxsize=cache_size)(self._url_score)
+
+    def _url_score(self, url: URL) -> Tuple[int, bool]:
+        """
+        Score the parts of a feed that only depend on its URL.
+
+        :param url: Feed URL
+        :return: Tuple of URL score, and whether the URL contains the comments keyword
+        """
+        url_str = str(url).lower()
+        score = 0
+
+        # Decrement the score by every extra path in the url
+        parts_len = len(url.parts)
+        if parts_len > 2:
+            score -= (parts_len - 2) * 2
+
+        if url.scheme == "https":
+            score += 10
+
+        for keyword, keyword_score in self._keyword_table:
+            if keyword in url_str:
+                score += keyword_score
+
+        for keyword in self.section_keywords:
+            if keyword in url_str:
+                score += self.section_score
+                break
+
+        return score, self.comments_keyword in url_str
+
+    def score_feed(self, feed: FeedInfo, query_host: str) -> int:
+        """
+        Score a feed, and set its score and score version.
+
+        :param feed: Feed to score
+        :param query_host: Root domain of the queried URL
+        :return: Feed score
+        """
+        score, has_comments = self._score_url(feed.url)
+
+        if query_host and query_host not in feed.url.host:
+            score -= 20
+
+        if feed.bozo:
+            score -= 20
+        if not feed.description:
+            score -= 10
+        if feed.is_push:
+            score += 10
+
+        if has_comments or self.comments_keyword in feed.title.lower():
+            score -= 15
+        else:
+            score += int(feed.velocity)
+
+        feed.score = score
+        feed.score_version = self.version
+        return score
+
+    def is_scored(self, feed: FeedInfo, query_host: str) -> bool:
+        """
+        Check if the feed already has a score calculated by the current scoring rules for the queried host.
+
+        :param feed: Feed to check
+        :param query_host: Root domain of the queried URL
+        :return: True if the feed score is current
+        """
+        return (
+            getattr(feed, "score_version", None) == self.version
+            and getattr(feed, "host", None) == query_host
+        )
+
+    def score_feeds(
+        self, feeds: Iterable[FeedInfo], query_host: str, force: bool = False
+    ) -> int:
+        """
+        Score a list of feeds found for the queried host, setting the score and host of each feed, and
+        converting their last updated dates to UTC.
+
+        Feeds that already have a current score, such as feeds loaded with their stored score, are skipped.
+        Feeds with changed attributes must have their score version reset, or be scored with force.
+
+        :param feeds: Feeds to score
+        :param query_host: Root domain of the queried URL
+        :param force: Score all feeds, even if their scores are current
+        :return: Number of feeds scored
+        """
+        score_feed, is_scored = self.score_feed, self.is_scored
+        scored = 0
+        for feed in feeds:
+            if not force and is_scored(feed, query_host):
+                continue
+            score_feed(feed, query_host)
+            scored += 1
+            feed.host = query_host
+            last_updated = feed.last_updated
+            if last_updated and last_updated.tzinfo is not UTC:
+                feed.last_updated = force_utc(last_updated)
+        return scored
+
+    def cache_info(self):
+        return self._score_url.cache_info()
+
+
+feed_scorer = FeedScorer()
+
+
+def score_feeds(feeds: List[FeedInfo], query_host: str, force: bool = False) -> int:
+    """
+    Score feeds according to the queried URL, using the shared FeedScorer.
+    Feeds with current scores are not scored again.
+
+    :param feeds: List of feeds to score
+    :param query_host: Root domain of queried URL
+    :param force: Score all feeds, even if their scores are current
+    :return: Number of feeds scored
+    """
+    return feed_scorer.score_feeds(feeds, query_host, force)
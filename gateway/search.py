@@ -1,19 +1,49 @@
 import asyncio
+import random
 from datetime import datetime, timedelta
-from typing import List, Tuple, Dict, Union, Set
+from typing import List, Tuple, Dict, Union, Set, Optional
 
 from dateutil.tz import tzutc
-from feedsearch_crawler import FeedsearchSpider, sort_urls, FeedInfo
+from feedsearch_crawler import sort_urls, FeedInfo
 from flask import current_app as app
 from werkzeug.exceptions import abort
 from yarl import URL
 
-from gateway.dynamodb_client import DynamoDBClient
+from gateway.connections import connection_manager
+from gateway.crawl_params import (
+    CrawlParams,
+    DEFAULT_CRAWL_PARAMS,
+    adaptive_crawl_params,
+    crawl_params_stats,
+    summarize_crawl_stats,
+)
+from gateway.dynamodb_client import AsyncDynamoDBClient
 from gateway.feedly import fetch_feedly_feeds, validate_feedly_urls
-from gateway.schema.customfeedinfo import CustomFeedInfo, score_item
+from gateway.metrics import put_metric
+from gateway.recrawl import RecrawlQueue, RecrawlRequest
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.hostfailure import HostFailure
 from gateway.schema.sitehost import SiteHost
 from gateway.schema.sitepath import SitePath
-from gateway.utils import force_utc, remove_subdomains, remove_scheme, has_path
+from gateway.scoring import score_feeds
+from gateway.singleflight import SingleFlight
+from gateway.spider import GatewaySpider, UrlSource
+from gateway.timing import NULL_TIMER, PhaseTimer
+from gateway.utils import (
+    force_utc,
+    remove_subdomains,
+    remove_scheme,
+    has_path,
+    connection_failed_crawl,
+)
+
+# Searches currently running in this process, keyed by normalized host and path.
+search_flight = SingleFlight()
+
+
+def latest(*dates: Optional[datetime]) -> Optional[datetime]:
+    """Return the latest of the dates, or None if no dates are set."""
+    return max((force_utc(date) for date in dates if date), default=None)
 
 
 def seen_recently(last_seen: datetime, days: int = 7) -> bool:
@@ -24,34 +54,36 @@ def seen_recently(last_seen: datetime, days: int = 7) -> bool:
     return False
 
 
-def crawl(urls: List[URL], checkall) -> Tuple[List[FeedInfo], Dict]:
+async def crawl(
+    urls: List[URL],
+    checkall,
+    url_sources: List[UrlSource] = None,
+    params: CrawlParams = DEFAULT_CRAWL_PARAMS,
+) -> Tuple[List[FeedInfo], Dict]:
     """
-    Call Feedsearch Crawler and return the results and crawl stats.
+    Call Feedsearch Crawler within the running event loop and return the results and crawl stats.
 
     :param urls: List of initial URLs to crawl
     :param checkall: If True, will check all standard Feed URL locations
+    :param url_sources: Coroutine functions run concurrently with the crawl, whose returned URLs are
+        added to the running crawl.
+    :param params: Crawl parameters
     :return: List of found FeedInfo, Dict of crawl stats
     """
-
-    async def run_crawler():
-        spider = FeedsearchSpider(
+    try:
+        crawler = GatewaySpider(
             try_urls=checkall,
-            concurrency=20,
-            request_timeout=4,
-            total_timeout=10,
+            concurrency=params.concurrency,
+            request_timeout=params.request_timeout,
+            total_timeout=params.total_timeout,
             max_retries=0,
-            max_depth=5,
+            max_depth=params.max_depth,
             delay=0,
             user_agent=app.config.get("USER_AGENT"),
             start_urls=urls,
             crawl_hosts=True,
         )
-
-        await spider.crawl()
-        return spider
-
-    try:
-        crawler = asyncio.run(run_crawler())
+        await crawler.crawl(url_sources=url_sources)
         feed_list = sort_urls(list(crawler.items))
         stats = crawler.get_stats()
         return feed_list, stats
@@ -110,19 +142,57 @@ def should_run_crawl(
 class SearchRunner:
     def __init__(
         self,
-        db_client: DynamoDBClient,
+        db_client: AsyncDynamoDBClient,
         check_feedly: bool = True,
         force_crawl: bool = True,
         check_all: bool = False,
         skip_crawl: bool = True,
         days_checked_recently: int = 7,
+        fields: List[str] = None,
+        stale_while_revalidate: bool = False,
+        recrawl_queue: RecrawlQueue = None,
+        max_crawl_concurrency: int = 0,
+        timer: PhaseTimer = NULL_TIMER,
+        failure_backoff: int = 0,
+        max_failure_backoff: int = 86400,
+        feedly_cache_ttl: int = 0,
     ):
+        """
+        :param db_client: DynamoDB client
+        :param check_feedly: Whether to query Feedly for feed URLs
+        :param force_crawl: Always crawl if True
+        :param check_all: If True, will check all standard Feed URL locations
+        :param skip_crawl: Never crawl if True, unless force_crawl is also True
+        :param days_checked_recently: How recently a site is allowed to have been crawled in days
+        :param fields: Optional List of the feed fields that will be returned. Existing feeds are loaded with only
+            these fields, unless the site needs to be crawled.
+        :param stale_while_revalidate: If True, return stored feeds that are due to be crawled instead of waiting
+            for the crawl, and queue the crawl on the recrawl queue
+        :param recrawl_queue: Queue of background crawls, required to return stale feeds
+        :param max_crawl_concurrency: Maximum number of concurrent requests of the crawl, such as the share of
+            a batch search's request budget. Not limited if 0.
+        :param timer: Timer of the search phases
+        :param failure_backoff: Seconds that a host isn't crawled again after all requests of a root crawl failed
+            to connect to it, doubling with each consecutive failure. Failed hosts aren't recorded if 0.
+        :param max_failure_backoff: Maximum seconds that a failed host isn't crawled again
+        :param feedly_cache_ttl: Seconds that the Feedly results of a host are stored for. Results aren't
+            stored if 0.
+        """
         self.db_client = db_client
         self.check_feedly = check_feedly
         self.force_crawl = force_crawl
         self.check_all = check_all
         self.skip_crawl = skip_crawl
         self.days_checked_recently = days_checked_recently
+        self.fields = fields
+        self.stale_while_revalidate = stale_while_revalidate
+        self.recrawl_queue = recrawl_queue
+        self.max_crawl_concurrency = max_crawl_concurrency
+        self.timer = timer
+        self.failure_backoff = failure_backoff
+        self.max_failure_backoff = max_failure_backoff
+        self.feedly_cache_ttl = feedly_cache_ttl
+        self.host_failure: Optional[HostFailure] = None
         self.searching_path: bool = False
         self.host: str = ""
         self.site = None
@@ -134,12 +204,65 @@ class SearchRunner:
         self.upgraded_crawled_feeds: List[CustomFeedInfo] = []
         self.crawled: bool = False
         self.query_url: URL = URL()
+        # When the returned feeds were last changed, or None if the feeds haven't been saved.
+        self.last_modified: Optional[datetime] = None
+
+    def search_key(self, query_url: URL) -> Tuple:
+        """
+        Create the key used to coalesce concurrent searches. Searches with the same root host, path, and
+        search options will return the same results.
+
+        :param query_url: Query URL
+        :return: Tuple of normalized host, path and query string, and search options
+        """
+        return (
+            remove_subdomains(query_url.host),
+            query_url.path_qs,
+            self.check_feedly,
+            self.force_crawl,
+            self.check_all,
+            self.skip_crawl,
+            self.days_checked_recently,
+            self.stale_while_revalidate,
+            tuple(self.fields or ()),
+        )
+
+    def run_coalesced_search(self, query_url: URL) -> List[CustomFeedInfo]:
+        """
+        Run the search, or wait for an identical search that is already running in this process and return
+        its results, so that concurrent requests for the same URL only crawl and save the site once.
+
+        :param query_url: Initial URL start the crawl
+        :return: List of found Feeds
+        """
+
+        def search() -> Tuple[List[CustomFeedInfo], Dict, Optional[datetime]]:
+            return self.run_search(query_url), self.crawl_stats, self.last_modified
+
+        (feeds, crawl_stats, last_modified), shared = search_flight.do(
+            self.search_key(query_url), search
+        )
+        if shared:
+            self.crawl_stats = {**crawl_stats, "coalesced": True}
+            self.last_modified = last_modified
+            app.logger.debug("Coalesced search of %s", query_url)
+        return feeds
 
     def run_search(self, query_url: URL) -> List[CustomFeedInfo]:
         """
         Run a search crawl of the query URL for Feeds, querying the database for existing Feeds, and saving the results
         of the crawl back to the database.
 
+        :param query_url: Initial URL start the crawl
+        :return: List of found Feeds
+        """
+        return connection_manager.run(self.run_search_async(query_url))
+
+    async def run_search_async(self, query_url: URL) -> List[CustomFeedInfo]:
+        """
+        Run the search within the running event loop, so that database queries, Feedly, and the crawl can
+        run concurrently.
+
         :param query_url: Initial URL start the crawl
         :return: List of found Feeds
         """
@@ -153,41 +276,89 @@ class SearchRunner:
         self.site_path = SitePath(self.host, query_url.path)
         self.crawl_stats: Dict = {}
 
-        # Query existing data for the site
-        existing_site = self.db_client.query_site_feeds(self.site)
+        # Query existing data for the site, and the site path info if it may be needed.
+        # The path is loaded with the site, instead of waiting to see if the site has feeds.
+        if self.should_query_site_path(self.searching_path, True, self.force_crawl):
+            with self.timer.phase("db"):
+                loaded = await self.db_client.query_site_with_path(
+                    self.site, self.site_path, self.fields
+                )
+            existing_site, existing_site_path = loaded
+        else:
+            with self.timer.phase("db"):
+                existing_site = await self.db_client.query_site_feeds(
+                    self.site, self.fields
+                )
+            existing_site_path = None
+
         if existing_site:
             self.site = existing_site
+        self.last_modified = latest(self.site.last_seen)
 
-        # Query the site path info from DynamoDB
-        if self.should_query_site_path(
+        # Only use the site path info if the site has existing feeds.
+        if existing_site_path and self.should_query_site_path(
             self.searching_path, bool(self.site.feeds), self.force_crawl
         ):
-            self.check_site_path()
+            self.site_path = existing_site_path
 
         # Return previously found feeds if path has already been crawled recently.
         if seen_recently(self.site_path.last_seen, self.days_checked_recently):
-            return self.match_existing_feeds_to_path(
+            path_feeds = self.match_existing_feeds_to_path(
                 self.site_path.feeds, self.site.feeds
             )
+            with self.timer.phase("score"):
+                self.score_feeds(path_feeds, self.site.host)
+            self.last_modified = latest(self.site.last_seen, self.site_path.last_seen)
+            return path_feeds
 
         # Calculate if the site was recently crawled.
         self.site_crawled_recently = seen_recently(
             self.site.last_seen, self.days_checked_recently
         )
 
-        # Crawl the site if the following conditions are met.
-        if should_run_crawl(
+        run_crawl = should_run_crawl(
             force_crawl=self.force_crawl,
             skip_crawl=self.skip_crawl,
             searching_path=self.searching_path,
             crawled_recently=self.site_crawled_recently,
-        ):
+        )
+
+        # Don't crawl hosts that failed to respond to a recent crawl, unless the crawl is forced. Failures are
+        # recorded for the crawled host, as subdomains of a site may be served separately.
+        if run_crawl and self.failure_backoff:
+            with self.timer.phase("db"):
+                self.host_failure = await self.db_client.query_host_failure(
+                    query_url.host
+                )
+            if self.should_skip_failed_host():
+                self.crawl_stats = {
+                    "host_failed": True,
+                    "failures": self.host_failure.failures,
+                    "retry_after": self.host_failure.retry_after.isoformat(),
+                }
+                run_crawl = False
+
+        # Return the stored feeds without waiting for the crawl, which runs in the background.
+        if run_crawl and self.should_return_stale():
+            stale_feeds = self.stored_feeds()
+            if stale_feeds:
+                return await self.return_stale(query_url, stale_feeds)
+
+        # Crawl the site if the following conditions are met.
+        if run_crawl:
+            # The crawled feeds are merged with the existing feeds and saved, so all their fields are needed.
+            if self.site.partial:
+                with self.timer.phase("db"):
+                    self.site = await self.db_client.query_site_feeds(
+                        SiteHost(self.host)
+                    )
+
             crawl_start_urls: List[URL] = [query_url]
+            url_sources: List[UrlSource] = []
 
-            # Check Feedly for feed urls
+            # Check Feedly for feed urls, adding them to the crawl as soon as they're returned.
             if self.should_check_feedly(self.check_feedly, self.site_crawled_recently):
-                feedly_urls = self.run_feedly_check(query_url)
-                crawl_start_urls.extend(feedly_urls)
+                url_sources.append(lambda: self.run_feedly_check(query_url))
 
             # Check each feed again if it has not been crawled recently.
             if not self.searching_path:
@@ -198,10 +369,34 @@ class SearchRunner:
                 )
 
             # Crawl the start urls.
-            self.crawl_feed_list, self.crawl_stats = crawl(
-                list(crawl_start_urls), self.check_all
-            )
+            params = self.choose_crawl_params(self.site.crawl_stats)
+            if 0 < self.max_crawl_concurrency < params.concurrency:
+                params = params.copy(concurrency=self.max_crawl_concurrency)
+            with self.timer.phase("crawl"):
+                self.crawl_feed_list, self.crawl_stats = await crawl(
+                    list(crawl_start_urls), self.check_all, url_sources, params
+                )
             self.crawled = True
+            self.crawl_stats["crawl_params"] = params.to_dict()
+            app.logger.info(
+                "CRAWL_PARAMS: host=%s %s",
+                self.host,
+                crawl_params_stats(params, self.crawl_stats, self.crawl_feed_list),
+            )
+            # Path crawls only make a few requests, so only root crawls are summarized for the site's next crawl.
+            if not self.searching_path:
+                self.site.crawl_stats = summarize_crawl_stats(
+                    self.crawl_stats,
+                    len(self.crawl_feed_list),
+                    self.site.crawl_stats,
+                    params,
+                )
+            put_metric("Crawls", 1)
+            put_metric("CrawlRequests", self.crawl_stats.get("requests_queued", 0))
+
+            if self.failure_backoff:
+                with self.timer.phase("save"):
+                    await self.update_host_failure()
 
         now: datetime = force_utc(datetime.now(tzutc()))
         self.site.last_seen = now
@@ -213,8 +408,9 @@ class SearchRunner:
 
         all_feeds: List[CustomFeedInfo] = list(self.site.feeds.values())
 
-        # Score the feeds
-        self.score_feeds(all_feeds, self.site.host)
+        # Score new and crawled feeds. Existing feeds keep their stored scores unless the scoring rules changed.
+        with self.timer.phase("score"):
+            self.score_feeds(all_feeds, self.site.host)
 
         # Only upload new file if crawl occurred.
         if (
@@ -226,7 +422,14 @@ class SearchRunner:
                 str(feed.url) for feed in self.upgraded_crawled_feeds
             ]
             self.site_path.last_seen = now
-            self.db_client.save_site_feeds(self.site, all_feeds, self.site_path)
+            with self.timer.phase("save"):
+                await self.db_client.save_site_feeds(
+                    self.site, all_feeds, self.site_path
+                )
+            self.last_modified = now
+        elif self.crawled:
+            # The returned feeds may include unsaved results of the crawl.
+            self.last_modified = None
 
         # If the requested URL has a path component, then only return the feeds found from the crawl.
         if self.searching_path:
@@ -234,19 +437,116 @@ class SearchRunner:
         else:
             return all_feeds
 
+    @staticmethod
+    def choose_crawl_params(summary: Optional[Dict]) -> CrawlParams:
+        """
+        Choose the parameters of a site crawl. When adaptive crawls are enabled, a sample of crawls uses
+        parameters adjusted from the summary of the site's last crawl, so that their latency and feeds found
+        can be compared against crawls with the default parameters.
+
+        :param summary: Crawl stats summary of the site
+        :return: CrawlParams
+        """
+        if not app.config.get("ADAPTIVE_CRAWL"):
+            return DEFAULT_CRAWL_PARAMS
+        rate = app.config.get("ADAPTIVE_CRAWL_RATE", 1.0)
+        if random.random() >= rate:
+            return DEFAULT_CRAWL_PARAMS
+        return adaptive_crawl_params(summary)
+
+    def should_skip_failed_host(self) -> bool:
+        """
+        Check if the host failed to respond to a recent crawl, and its backoff window hasn't passed.
+
+        :return: True if the crawl should be skipped
+        """
+        return (
+            not self.force_crawl
+            and self.host_failure is not None
+            and self.host_failure.in_backoff(force_utc(datetime.now(tzutc())))
+        )
+
+    async def update_host_failure(self) -> None:
+        """
+        Record a root crawl whose requests all failed to connect to the crawled host, extending the host's
+        backoff window, or delete the host's failure record after a crawl that received a response.
+
+        Crawls of paths aren't recorded, as their few requests may fail for reasons that don't affect the rest
+        of the host. HTTP error responses, such as 404, show that the host is responding.
+        """
+        host = self.query_url.host
+        if connection_failed_crawl(self.crawl_stats):
+            if self.searching_path:
+                return
+            failure = self.host_failure or HostFailure(host)
+            failure.add_failure(
+                force_utc(datetime.now(tzutc())),
+                self.failure_backoff,
+                self.max_failure_backoff,
+            )
+            await self.db_client.save_host_failure(failure)
+            self.host_failure = failure
+        elif self.host_failure is not None:
+            await self.db_client.delete_host_failure(host)
+            self.host_failure = None
+
+    def should_return_stale(self) -> bool:
+        """
+        Check if stored feeds may be returned while the site is crawled in the background.
+
+        :return: True if stale feeds may be returned
+        """
+        return (
+            self.stale_while_revalidate
+            and self.recrawl_queue is not None
+            and not self.force_crawl
+        )
+
+    def stored_feeds(self) -> List[CustomFeedInfo]:
+        """
+        Return the stored feeds that a crawl of the queried URL would update. These are the site feeds, or the
+        feeds previously found at the queried path.
+
+        :return: List of stored feeds
+        """
+        if self.searching_path:
+            if not self.site_path.last_seen:
+                return []
+            return self.match_existing_feeds_to_path(
+                self.site_path.feeds, self.site.feeds
+            )
+        return list(self.site.feeds.values())
+
+    async def return_stale(
+        self, query_url: URL, feeds: List[CustomFeedInfo]
+    ) -> List[CustomFeedInfo]:
+        """
+        Queue a background crawl of the queried URL, and return the stored feeds marked as stale.
+
+        :param query_url: Queried URL
+        :param feeds: Stored feeds
+        :return: Scored stored feeds
+        """
+        request = RecrawlRequest(str(query_url), self.check_feedly, self.check_all)
+        # Queues may make network calls, so don't block the event loop.
+        loop = asyncio.get_running_loop()
+        queued = await loop.run_in_executor(None, self.recrawl_queue.enqueue, request)
+        self.crawl_stats = {"stale": True, "recrawl_queued": queued}
+
+        with self.timer.phase("score"):
+            self.score_feeds(feeds, self.site.host)
+        self.last_modified = latest(self.site.last_seen, self.site_path.last_seen)
+        return feeds
+
     @staticmethod
     def score_feeds(feeds: List[CustomFeedInfo], host: str) -> None:
         """
-        Score feeds according to the queried URL
+        Score feeds according to the queried URL. Feeds that already have a current score are skipped.
 
         :param feeds: List of feeds to score
         :param host: Root domain of queried URL
         """
-        for feed in feeds:
-            score_item(feed, host)
-            feed.host = host
-            if feed.last_updated:
-                feed.last_updated = force_utc(feed.last_updated)
+        score_feeds(feeds, host)
 
     @staticmethod
     def update_crawled_feeds(
@@ -308,14 +608,6 @@ class SearchRunner:
         """
         return searching_path and has_site_feeds and not force_crawl
 
-    def check_site_path(self) -> None:
-        """
-        Query the database for existing site path information
-        """
-        existing_site_path = self.db_client.query_site_path(self.site_path)
-        if existing_site_path:
-            self.site_path = existing_site_path
-
     @staticmethod
     def should_check_feedly(check_feedly: bool, site_crawled_recently: bool) -> bool:
         """
@@ -327,14 +619,17 @@ class SearchRunner:
         """
         return check_feedly and not site_crawled_recently
 
-    def run_feedly_check(self, query_url: URL) -> List[URL]:
+    async def run_feedly_check(self, query_url: URL) -> List[URL]:
         """
         Fetch list of feed URLs from feedly.com for the given query URL
 
         :return: List of URLs
         """
         existing_urls: List[str] = list(self.site.feeds.keys())
-        feedly_urls = fetch_feedly_feeds(str(query_url))
+        with self.timer.phase("feedly"):
+            feedly_urls = await fetch_feedly_feeds(
+                str(query_url), self.db_client, self.feedly_cache_ttl
+            )
         if not feedly_urls:
             return []
 
@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key, so that only one call runs at a time for each key.
+
+    Callers that arrive while a call for their key is in flight wait for it to finish, and receive its result
+    (or its exception) instead of running the function themselves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run the function for the key, or wait for the in-flight call with the same key.
+
+        :param key: Key identifying duplicate calls
+        :param fn: Function to run
+        :param args: Positional arguments for the function
+        :param kwargs: Keyword arguments for the function
+        :return: Tuple of the function result, and True if the result was shared from another caller's call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """
+        Return the number of keys with a call currently running.
+        """
+        with self._lock:
+            return len(self._calls)
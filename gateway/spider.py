@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Union
+
+import aiohttp
+import time
+from feedsearch_crawler import FeedsearchSpider
+from feedsearch_crawler.crawler.lib import (
+    CrawlerPriorityQueue,
+    Stats,
+    coerce_url,
+    ignore_aiohttp_ssl_error,
+)
+from feedsearch_crawler.crawler.trace import add_trace_config
+from yarl import URL
+
+from gateway.connections import connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Coroutine function that returns more URLs to crawl.
+UrlSource = Callable[[], Awaitable[List[URL]]]
+
+
+class GatewaySpider(FeedsearchSpider):
+    """
+    FeedsearchSpider that accepts extra start URLs while the crawl is already running.
+
+    URL sources are coroutine functions, e.g. a Feedly search, that are run concurrently with the crawl.
+    The URLs they return are added to the running crawl, and the crawl does not finish until all sources
+    have returned or the total timeout is reached.
+    """
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """
+        Create the ClientSession for the crawl's HTTP Requests, using the process-wide connection pool so that
+        connections and DNS lookups are reused between crawls.
+        """
+        trace_configs = []
+        if self._trace:
+            trace_configs.append(add_trace_config())
+
+        return connection_manager.session(
+            verify_ssl=self._ssl,
+            timeout=self.total_timeout,
+            headers=self.headers,
+            trace_configs=trace_configs,
+        )
+
+    async def follow_source(self, source: UrlSource) -> None:
+        """
+        Wait for the URL source to return, then add its URLs to the crawl. The URLs are expanded in the same way
+        as the start URLs, so their hosts are also crawled and, if enabled, the common feed paths are tried.
+
+        :param source: Coroutine function returning a List of URLs
+        """
+        try:
+            urls = await source()
+        except Exception as e:
+            logger.exception("URL source error: %s", e)
+            return
+
+        if not urls:
+            return
+
+        # Start URLs are already queued, and would only be filtered as duplicates.
+        start_urls = set(self.start_urls)
+        for url in self.create_start_urls(list(urls)):
+            if url in start_urls:
+                continue
+            req = await self.follow(coerce_url(url), self.parse, delay=0)
+            if req:
+                self._process_request(req)
+
+    async def _wait_until_done(self, source_tasks: List[asyncio.Task]) -> None:
+        """
+        Wait until all URL sources have returned, and the Request Queue is empty.
+        """
+        if source_tasks:
+            await asyncio.gather(*source_tasks)
+        await self._request_queue.join()
+
+    async def crawl(
+        self,
+        urls: Union[URL, str, List[Union[URL, str]]] = None,
+        url_sources: List[UrlSource] = None,
+    ) -> None:
+        """
+        Start the web crawler.
+
+        :param urls: An optional URL or List of URLS to start the crawl, in addition to start_urls.
+        :param url_sources: Optional List of coroutine functions returning URLs to add to the running crawl.
+        """
+        # Fix for ssl errors
+        ignore_aiohttp_ssl_error(asyncio.get_running_loop())
+
+        start = time.perf_counter()
+
+        if not urls:
+            urls = []
+        if isinstance(urls, (URL, str)):
+            urls = [urls]
+        self.start_urls = self.create_start_urls(urls)
+
+        if not self.start_urls:
+            raise ValueError("crawler.start_urls are required")
+
+        self._request_queue = CrawlerPriorityQueue()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = self.create_session()
+
+        for url in self.start_urls:
+            req = await self.follow(coerce_url(url), self.parse, delay=0)
+            if req:
+                self._process_request(req)
+
+        self._workers = [
+            asyncio.create_task(self._work(i)) for i in range(self.concurrency * 2)
+        ]
+        source_tasks = [
+            asyncio.create_task(self.follow_source(source))
+            for source in url_sources or []
+        ]
+
+        try:
+            async with self._session:
+                await asyncio.wait_for(
+                    self._wait_until_done(source_tasks),
+                    timeout=self.total_timeout.total,
+                )
+        except asyncio.TimeoutError:
+            logger.debug("Timed out after %s seconds", self.total_timeout.total)
+            self._request_queue.clear()
+        finally:
+            for task in self._workers + source_tasks:
+                task.cancel()
+            await asyncio.gather(*self._workers, *source_tasks, return_exceptions=True)
+
+        await self._run_callback(self.post_crawl_callback)
+
+        await self._session.close()
+
+        duration = int((time.perf_counter() - start) * 1000)
+        self.stats[Stats.TOTAL_DURATION] = duration
+
+        self.record_statistics()
+
+        logger.info(
+            "Crawl finished: requests=%s time=%dms",
+            self.stats[Stats.REQUESTS_QUEUED],
+            duration,
+        )
@@ -0,0 +1,82 @@
+import time
+from contextlib import nullcontext
+from typing import ContextManager, Dict
+
+from gateway.metrics import put_metric
+
+# Returned for every phase of a disabled timer, so that timing can be left in place at almost no cost.
+_NULL_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "PhaseTimer", name: str):
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.timer.add(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class PhaseTimer:
+    """
+    Records how long each phase of a request took, such as the database queries, the crawl, and the dump.
+
+    Phases with the same name are added together, and phases may overlap, as Feedly is queried during the crawl.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        :param enabled: If False, phases are not timed
+        """
+        self.enabled = enabled
+        self.phases: Dict[str, float] = {}
+
+    def phase(self, name: str) -> ContextManager:
+        """
+        Time the phase run within the returned context manager.
+
+        :param name: Phase name, which must be a valid Server-Timing metric name
+        :return: Context manager
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, name: str, duration: float) -> None:
+        """
+        Add the duration of a phase, which is also added to the request's "<Phase>Time" metric. Does nothing if
+        the timer is disabled.
+
+        :param name: Phase name
+        :param duration: Duration in milliseconds
+        """
+        if not self.enabled:
+            return
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+        put_metric(f"{name.capitalize()}Time", duration, "Milliseconds")
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        :return: Dict of phase names to durations in milliseconds, in the order the phases first ran
+        """
+        return {name: round(duration, 1) for name, duration in self.phases.items()}
+
+    def server_timing(self) -> str:
+        """
+        :return: Value of the Server-Timing response header
+        """
+        return ", ".join(
+            f"{name};dur={duration:.1f}" for name, duration in self.phases.items()
+        )
+
+
+# Timer of code that isn't timed.
+NULL_TIMER = PhaseTimer(enabled=False)
@@ -1,6 +1,6 @@
 import re
 from datetime import datetime
-from typing import Union, Optional, Dict
+from typing import Union, Optional, Dict, Iterable, List
 
 from dateutil import tz, parser
 from yarl import URL
@@ -20,10 +20,9 @@ valid_url_regex = re.compile(
 
 basic_url_regex = re.compile(r"[a-z0-9]{2,}\.[a-z0-9]{2,}", re.IGNORECASE)
 
-diegoperini_url_regex = re.compile(
-    r"^(?:(?:https?|ftp)://)(?:\S+(?::\S*)?@)?(?:(?!10(?:\.\d{1,3}){3})(?!127(?:\.\d{1,3}){3})(?!169\.254(?:\.\d{1,3}){2})(?!192\.168(?:\.\d{1,3}){2})(?!172\.(?:1[6-9]|2\d|3[0-1])(?:\.\d{1,3}){2})(?:[1-9]\d?|1\d\d|2[01]\d|22[0-3])(?:\.(?:1?\d{1,2}|2[0-4]\d|25[0-5])){2}(?:\.(?:[1-9]\d?|1\d\d|2[0-4]\d|25[0-4]))|(?:(?:[a-z\u00a1-\uffff0-9]+-?)*[a-z\u00a1-\uffff0-9]+)(?:\.(?:[a-z\u00a1-\uffff0-9]+-?)*[a-z\u00a1-\uffff0-9]+)*(?:\.(?:[a-z\u00a1-\uffff]{2,})))(?::\d{2,5})?(?:/[^\s]*)?\$_iuS",
-    re.IGNORECASE,
-)
+# Status codes that the crawler gives requests that received no response: timeouts, client errors such as
+# refused connections, and other errors.
+CRAWLER_FAILED_STATUS_CODES = (408, 499, 500)
 
 
 def force_utc(dt: datetime) -> datetime:
@@ -170,9 +169,75 @@ def validate_query(query: str) -> URL:
     return url
 
 
+def validate_fields(fields: str, allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Validates a comma separated list of field names, and returns the List of fields.
+    Raises a BadRequestError if any field is not allowed.
+
+    :param fields: comma separated field names
+    :param allowed: allowed field names
+    :return: List of field names, or None if no fields are given
+    """
+    if not fields:
+        return None
+
+    field_list = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    if not field_list:
+        return None
+
+    invalid = [field for field in field_list if field not in allowed]
+    if invalid:
+        raise BadRequestError(f"Invalid fields: {', '.join(invalid)}")
+
+    return field_list
+
+
+def validate_limit(limit: str, default: int, maximum: int) -> int:
+    """
+    Validates a page size query parameter, and returns it as an integer.
+    Raises a BadRequestError if the limit is not an integer between 1 and the maximum.
+
+    :param limit: limit query string
+    :param default: limit to use if no limit is given
+    :param maximum: maximum allowed limit
+    :return: limit
+    """
+    if not limit:
+        return default
+
+    try:
+        value = int(limit)
+    except ValueError:
+        raise BadRequestError(f"Invalid limit: '{limit}' is not an integer.")
+
+    if value < 1 or value > maximum:
+        raise BadRequestError(f"Invalid limit: must be between 1 and {maximum}.")
+
+    return value
+
+
+def connection_failed_crawl(stats: Optional[Dict]) -> bool:
+    """
+    Check that every request of a crawl failed without an HTTP response from the host, such as by timing out
+    or being refused a connection. HTTP error responses from the host, such as 404, are not failures.
+
+    :param stats: Crawl stats dictionary
+    :return: True if the crawl made requests and all of them failed to connect
+    """
+    if not stats or not isinstance(stats, Dict):
+        return False
+
+    status_codes = stats.get("status_codes", {})
+    if not status_codes or not isinstance(status_codes, Dict):
+        return False
+
+    return all(int(status) in CRAWLER_FAILED_STATUS_CODES for status in status_codes)
+
+
 def no_response_from_crawl(stats: Optional[Dict]) -> bool:
     """
-    Check that the stats dict has received an HTTP 200 response
+    Check that the stats dict has received an HTTP 200 response, or that the host wasn't crawled because
+    it failed to respond to a recent crawl.
 
     :param stats: Crawl stats dictionary
     :return: True if the dict exists and has no 200 response
@@ -180,6 +245,9 @@ def no_response_from_crawl(stats: Optional[Dict]) -> bool:
     if not stats or not isinstance(stats, Dict):
         return False
 
+    if stats.get("host_failed"):
+        return True
+
     status_codes = stats.get("status_codes", {})
     if not status_codes or not isinstance(status_codes, Dict):
         return False
@@ -0,0 +1,33 @@
+import logging
+from typing import Any, Callable, Dict
+
+from gateway.timing import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+
+def run_warm_up(
+    steps: Dict[str, Callable[[], Any]], timer: PhaseTimer
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the steps that prime a new process for its first request, timing each step. A step that fails is
+    logged and reported, and the remaining steps still run.
+
+    :param steps: Dict of step names to functions, run in order. Names must be valid Server-Timing metric names.
+    :param timer: Enabled PhaseTimer that records the duration of each step
+    :return: Dict of step names to the step's duration, whether it succeeded, and its result or error
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, step in steps.items():
+        try:
+            with timer.phase(name):
+                value = step()
+            result = {"ok": True}
+            if value is not None:
+                result["result"] = value
+        except Exception as e:
+            logger.warning("Warm up step %s failed: %r", name, e)
+            result = {"ok": False, "error": repr(e)}
+        result["duration_ms"] = round(timer.phases.get(name, 0.0), 1)
+        results[name] = result
+    return results
@@ -0,0 +1,54 @@
+import time
+from copy import deepcopy
+from pathlib import Path
+
+import click
+
+from gateway.schema.compiled_dump import compiled_dump
+from gateway.schema.external_feedinfo_schema import ExternalFeedInfoSchema
+from gateway.schema.external_site_schema import ExternalSiteSchema
+
+
+def time_dump(dump, feeds, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dump(feeds)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+@click.command()
+@click.option(
+    "--site_json",
+    default="tests/xkcd.com.json",
+    help="JSON file of a site and its feeds, as returned by the API",
+)
+@click.option("--copies", default=500, help="Number of copies of the site feeds")
+@click.option("--repeat", default=20, help="Number of times to dump the feeds")
+def benchmark(site_json, copies, repeat) -> None:
+    """
+    Compare the time to dump feeds with the marshmallow schema and the compiled dump.
+    """
+    site = ExternalSiteSchema().loads(Path(site_json).read_text())
+    feeds = [deepcopy(feed) for _ in range(copies) for feed in site["feeds"].values()]
+
+    variants = {
+        "all": {},
+        "no_favicon": {"exclude": ("favicon_data_uri",)},
+        "url_only": {"only": ("url",)},
+    }
+    for name, options in variants.items():
+        schema = ExternalFeedInfoSchema(many=True, **options)
+        compiled = compiled_dump(ExternalFeedInfoSchema, many=True, **options)
+        if compiled.dump(feeds) != schema.dump(feeds):
+            raise click.ClickException(f"Dump output differs for {name}")
+
+        schema_ms = time_dump(schema.dump, feeds, repeat)
+        compiled_ms = time_dump(compiled.dump, feeds, repeat)
+        click.echo(
+            f"{name}: feeds={len(feeds)} schema_ms={schema_ms:.2f} "
+            f"compiled_ms={compiled_ms:.2f} speedup={schema_ms / compiled_ms:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
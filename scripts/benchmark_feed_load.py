@@ -0,0 +1,79 @@
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import click
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from yarl import URL
+
+from gateway.dynamodb_client import DynamoDBClient
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.feed_loader import load_feed_items
+
+
+def create_items(feed_count: int):
+    """
+    Create DynamoDB feed items with realistic values, as returned by a DynamoDB query.
+    """
+    feeds = [
+        CustomFeedInfo(
+            url=URL(f"https://example.com/blog/{i}/feed.xml"),
+            host="example.com",
+            site_url=URL("https://example.com"),
+            self_url=URL(f"https://example.com/blog/{i}/feed.xml"),
+            favicon=URL("https://example.com/favicon.ico"),
+            title=f"Example Blog {i}",
+            site_name="Example",
+            description="The latest posts from the Example blog. " * 3,
+            content_type="application/rss+xml; charset=utf-8",
+            content_length=20000 + i,
+            hubs=["https://pubsubhubbub.appspot.com/"],
+            is_push=True,
+            item_count=20,
+            velocity=Decimal("0.25"),
+            version="rss20",
+            score=12,
+            last_updated=datetime(2020, 1, 27, tzinfo=timezone.utc),
+            last_seen=datetime(2020, 1, 29, 2, 53, 34, 932759, tzinfo=timezone.utc),
+        )
+        for i in range(feed_count)
+    ]
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+    return [
+        {
+            key: deserializer.deserialize(serializer.serialize(value))
+            for key, value in item.items()
+        }
+        for item in DynamoDbFeedInfoSchema(many=True).dump(feeds)
+    ]
+
+
+def time_load(load, items, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        load(items)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+@click.command()
+@click.option("--repeat", default=20, help="Number of times to load each site")
+def benchmark(repeat) -> None:
+    """
+    Compare the time to load sites of 10, 100, and 1000 feed items with the schema and the fast feed loader.
+    """
+    schema = DynamoDbFeedInfoSchema(many=True)
+    client = DynamoDBClient("benchmark")
+    for feed_count in (10, 100, 1000):
+        items = create_items(feed_count)
+        schema_ms = time_load(schema.load, items, repeat)
+        loader_ms = time_load(load_feed_items, items, repeat)
+        client_ms = time_load(client.load_feeds, items, repeat)
+        click.echo(
+            f"feeds={feed_count} schema_ms={schema_ms:.2f} loader_ms={loader_ms:.2f} "
+            f"client_ms={client_ms:.2f} speedup={schema_ms / loader_ms:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,79 @@
+import math
+import time
+from copy import deepcopy
+from pathlib import Path
+
+import click
+
+from gateway.dynamodb_client import dynamodb_item_size
+from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.external_site_schema import ExternalSiteSchema
+
+# Attributes that DynamoDbFeedInfoSchema stores compressed.
+COMPRESSED_FIELDS = ["description", "favicon_data_uri"]
+
+
+def read_units(size: int) -> float:
+    """
+    Read capacity units used by an eventually consistent read of items of the given total size.
+    """
+    return math.ceil(size / 4096) / 2
+
+
+def write_units(size: int) -> int:
+    """
+    Write capacity units used by writing an item of the given size.
+    """
+    return math.ceil(size / 1024)
+
+
+def load_feeds(path: str, copies: int):
+    site = ExternalSiteSchema().loads(Path(path).read_text())
+    feeds = list(site["feeds"].values())
+    for feed in feeds:
+        feed.host = site["host"]
+    return [deepcopy(feed) for _ in range(copies) for feed in feeds]
+
+
+@click.command()
+@click.option(
+    "--site_json",
+    default="tests/xkcd.com.json",
+    help="JSON file of a site and its feeds, as returned by the API",
+)
+@click.option("--copies", default=50, help="Number of copies of the site feeds")
+@click.option("--repeat", default=20, help="Number of times to load the items")
+def benchmark(site_json, copies, repeat) -> None:
+    """
+    Compare the size, capacity units, and load time of feed items with and without compression.
+    """
+    schema = DynamoDbFeedInfoSchema(many=True)
+    feeds = load_feeds(site_json, copies)
+    compressed = schema.dump(feeds)
+
+    # Items as they were stored before compression, with plain string values.
+    uncompressed = [dict(item) for item in compressed]
+    for item, feed in zip(uncompressed, feeds):
+        for field in COMPRESSED_FIELDS:
+            if field in item:
+                item[field] = getattr(feed, field)
+
+    for name, items in (("uncompressed", uncompressed), ("compressed", compressed)):
+        sizes = [dynamodb_item_size(item) for item in items]
+        start = time.perf_counter()
+        for _ in range(repeat):
+            schema.load(items)
+        load_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        click.echo(
+            f"{name}: items={len(items)} "
+            f"avg_item_bytes={sum(sizes) // len(sizes)} "
+            f"total_bytes={sum(sizes)} "
+            f"query_rcu={read_units(sum(sizes))} "
+            f"write_wcu={sum(write_units(size) for size in sizes)} "
+            f"load_ms={load_ms:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,137 @@
+import time
+from typing import Callable, List
+
+import click
+from feedsearch_crawler import FeedInfo
+from yarl import URL
+
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.scoring import FeedScorer
+
+PATHS = [
+    "feed",
+    "rss.xml",
+    "atom.xml",
+    "index.rdf",
+    "comments/feed/",
+    "blog/category/news/feed",
+    "feeds/posts/default?alt=rss",
+    "magazine/top-stories/rss",
+]
+
+
+def original_score_item(item: FeedInfo, query_host: str):
+    """
+    The per-item scoring implementation replaced by FeedScorer, kept as the baseline.
+    """
+    score = 0
+
+    url_str = str(item.url).lower()
+
+    if query_host and query_host not in item.url.host:
+        score -= 20
+
+    parts_len = len(item.url.parts)
+    if parts_len > 2:
+        score -= (parts_len - 2) * 2
+
+    if item.bozo:
+        score -= 20
+    if not item.description:
+        score -= 10
+    if "georss" in url_str:
+        score -= 10
+    if "alt" in url_str:
+        score -= 7
+    if "feedburner" in url_str:
+        score -= 10
+
+    if item.url.scheme == "https":
+        score += 10
+    if item.is_push:
+        score += 10
+    if "index" in url_str:
+        score += 30
+
+    if "comments" in url_str or "comments" in item.title.lower():
+        score -= 15
+    else:
+        score += int(item.velocity)
+
+    if any(map(url_str.count, ["/home", "/top", "/most", "/magazine"])):
+        score += 10
+
+    kw = ["atom", "rss", ".xml", "feed", "rdf"]
+    for p, t in zip(range(len(kw) * 2, 0, -2), kw):
+        if t in url_str:
+            score += p
+
+    item.score = score
+
+
+def create_feeds(feed_count: int) -> List[CustomFeedInfo]:
+    return [
+        CustomFeedInfo(
+            url=URL(f"https://example{i % 7}.com/{i}/{PATHS[i % len(PATHS)]}"),
+            title=f"Example Feed {i}",
+            description="Example description" if i % 3 else "",
+            is_push=i % 2 == 0,
+            velocity=i % 5 + 0.5,
+        )
+        for i in range(feed_count)
+    ]
+
+
+def time_scoring(score: Callable, feeds: List[CustomFeedInfo], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        score(feeds)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+@click.command()
+@click.option(
+    "--repeat", default=50, help="Number of times to score each list of feeds"
+)
+def benchmark(repeat) -> None:
+    """
+    Compare the throughput of the original per-item scoring with the batch FeedScorer, both without a URL
+    score cache, and with the cache warmed by a previous search of the same site.
+    """
+
+    def score_original(feeds):
+        for feed in feeds:
+            original_score_item(feed, "example1.com")
+
+    uncached = FeedScorer(cache_size=0)
+    cached = FeedScorer()
+
+    for feed_count in (10, 100, 1000):
+        feeds = create_feeds(feed_count)
+
+        original_ms = time_scoring(score_original, feeds, repeat)
+        original_scores = [feed.score for feed in feeds]
+
+        batch_ms = time_scoring(
+            lambda items: uncached.score_feeds(items, "example1.com", force=True),
+            feeds,
+            repeat,
+        )
+        assert [feed.score for feed in feeds] == original_scores
+
+        cached_ms = time_scoring(
+            lambda items: cached.score_feeds(items, "example1.com", force=True),
+            feeds,
+            repeat,
+        )
+        assert [feed.score for feed in feeds] == original_scores
+
+        click.echo(
+            f"feeds={feed_count} original_ms={original_ms:.3f} batch_ms={batch_ms:.3f} "
+            f"cached_ms={cached_ms:.3f} feeds_per_sec={feed_count / cached_ms * 1000:,.0f} "
+            f"speedup={original_ms / batch_ms:.1f}x cached_speedup={original_ms / cached_ms:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,449 @@
+"""
+Offline end-to-end benchmark of the /api/v1/search flow.
+
+Searches run through the Flask test client against an in-memory DynamoDB table, and crawl synthetic sites served
+by a local fixture server, which also serves a fake Feedly search API. Each synthetic site is served from its own
+loopback address, 127.0.0.2 upwards, so that each site has a different host.
+
+Usage:
+
+    python -m scripts.benchmark_search --feeds 1,10,100 --iterations 20 --output results.json
+    python -m scripts.benchmark_search --compare results.json
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import re
+import socket
+import subprocess
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List
+
+import click
+from aiohttp import web
+
+TABLE_NAME = "feedsearch-benchmark"
+FEEDLY_PATH = "/v3/search/feeds"
+DB_LOG_REGEX = re.compile(r"(DB_QUERY|DB_WRITE): query=(\w+) duration=(\d+)")
+PERCENTILES = (50, 95)
+
+
+class FixtureServer:
+    """
+    Serves synthetic sites with a configurable number of feeds, and a fake Feedly search API.
+    """
+
+    def __init__(self, feed_counts: List[int], items_per_feed: int = 10):
+        """
+        :param feed_counts: Number of feeds of each site
+        :param items_per_feed: Number of items in each feed
+        """
+        self.items_per_feed = items_per_feed
+        self.sites: Dict[str, int] = {
+            f"127.0.0.{index + 2}": count for index, count in enumerate(feed_counts)
+        }
+        self.port = self._free_port()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started = threading.Event()
+        self._runner: web.AppRunner = None
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def site_url(self, host: str) -> str:
+        return f"http://{host}:{self.port}/"
+
+    @property
+    def feedly_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}{FEEDLY_PATH}"
+
+    def start(self) -> None:
+        self._thread.start()
+        self._started.wait(10)
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        for address in ["127.0.0.1", *self.sites]:
+            site = web.TCPSite(self._runner, address, self.port)
+            self._loop.run_until_complete(site.start())
+        self._started.set()
+        self._loop.run_forever()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        host = request.url.host
+        if request.path == FEEDLY_PATH:
+            return self.feedly_search(request)
+
+        feed_count = self.sites.get(host)
+        if feed_count is None:
+            raise web.HTTPNotFound()
+
+        if request.path == "/":
+            return self.site_page(host, feed_count)
+        if request.path == "/feedly.xml":
+            return self.feed(host, "feedly")
+        match = re.match(r"^/feeds/(\d+)\.xml$", request.path)
+        if match and int(match.group(1)) < feed_count:
+            return self.feed(host, match.group(1))
+        raise web.HTTPNotFound()
+
+    def site_page(self, host: str, feed_count: int) -> web.Response:
+        links = "\n".join(
+            f'<link rel="alternate" type="application/rss+xml" title="Feed {i}" '
+            f'href="/feeds/{i}.xml">'
+            for i in range(feed_count)
+        )
+        body = (
+            f"<!DOCTYPE html><html><head><title>Site {host}</title>{links}</head>"
+            f"<body><h1>Site {host}</h1></body></html>"
+        )
+        return web.Response(text=body, content_type="text/html")
+
+    def feed(self, host: str, name: str) -> web.Response:
+        now = time.time()
+        items = "".join(
+            f"<item><title>Post {i}</title><link>http://{host}/posts/{name}/{i}</link>"
+            f"<description>Post {i} of feed {name}.</description>"
+            f"<pubDate>{format_datetime(datetime.fromtimestamp(now - i * 86400, timezone.utc))}</pubDate>"
+            f"</item>"
+            for i in range(self.items_per_feed)
+        )
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Feed {name} of {host}</title><link>http://{host}:{self.port}/</link>"
+            f"<description>Synthetic feed {name}</description>{items}</channel></rss>"
+        )
+        return web.Response(text=body, content_type="application/rss+xml")
+
+    def feedly_search(self, request: web.Request) -> web.Response:
+        query = request.query.get("query", "")
+        results = [
+            {
+                "feedId": f"feed/{self.site_url(host)}feedly.xml",
+                "lastUpdated": int(time.time() * 1000),
+            }
+            for host in self.sites
+            if host in query
+        ]
+        return web.json_response({"results": results})
+
+
+class DBTimings(logging.Handler):
+    """
+    Records the durations of DynamoDB queries and writes from the DynamoDB client logs.
+    """
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.timings: Dict[str, int] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        match = DB_LOG_REGEX.match(record.getMessage())
+        if not match:
+            return
+        kind, name, duration = match.groups()
+        key = "db_write_ms" if kind == "DB_WRITE" else f"db_{name}_ms"
+        self.timings[key] = self.timings.get(key, 0) + int(duration)
+
+
+def percentile(values: List[float], percent: int) -> float:
+    """
+    Nearest-rank percentile of the values.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    summary = {f"p{percent}": percentile(values, percent) for percent in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values), 2)
+    summary["n"] = len(values)
+    return summary
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def create_table() -> None:
+    import boto3
+
+    boto3.client("dynamodb").create_table(
+        TableName=TABLE_NAME,
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "InvertedIndex",
+                "KeySchema": [
+                    {"AttributeName": "SK", "KeyType": "HASH"},
+                    {"AttributeName": "PK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def save_site(host: str, feed_count: int = 2) -> None:
+    """
+    Save a site with its feeds and a path to the benchmark table, as a crawl of the site would.
+
+    :param host: Site host
+    :param feed_count: Number of feeds of the site
+    """
+    from yarl import URL
+
+    from gateway.dynamodb_client import DynamoDBClient
+    from gateway.schema.customfeedinfo import CustomFeedInfo
+    from gateway.schema.sitehost import SiteHost
+    from gateway.schema.sitepath import SitePath
+
+    last_seen = datetime.now(timezone.utc)
+    site = SiteHost(host=host, last_seen=last_seen)
+    feeds = [
+        CustomFeedInfo(
+            url=URL(f"https://{host}/feed{i}.xml"),
+            host=host,
+            title=f"Feed {i}",
+            last_seen=last_seen,
+            item_count=10,
+        )
+        for i in range(feed_count)
+    ]
+    site.load_feeds(feeds)
+    site_path = SitePath(host, "/", last_seen, [str(feed.url) for feed in feeds])
+    DynamoDBClient(TABLE_NAME).save_site_feeds(site, feeds, site_path)
+
+
+def import_app(feedly_url: str):
+    """
+    Import the Flask application configured for the benchmark.
+    """
+    os.environ.update(
+        {
+            "DYNAMODB_TABLE": TABLE_NAME,
+            "FEEDLY_SEARCH_URL": feedly_url,
+            "USER_AGENT": "Feedsearch Benchmark",
+        }
+    )
+    # The packed CSS is only read on import when assets aren't in debug mode. Import in debug mode if the assets
+    # haven't been built, then switch debug off so that responses are the same as in production.
+    static_dir = os.path.join(os.path.dirname(__file__), "..", "gateway", "static")
+    if not any(name.startswith("packed.min") for name in os.listdir(static_dir)):
+        os.environ["FLASK_DEBUG"] = "1"
+
+    from gateway import application
+
+    application.app.debug = False
+    return application
+
+
+def run_search(client, db_timings: DBTimings, url: str, params: Dict) -> Dict:
+    """
+    Run a search through the test client, and return the durations of each phase in milliseconds.
+    """
+    db_timings.timings = {}
+    start = time.perf_counter()
+    response = client.get(
+        "/api/v1/search", query_string={"url": url, "stats": "true", **params}
+    )
+    total = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise click.ClickException(
+            f"Search of {url} failed: {response.status_code} {response.data[:200]}"
+        )
+
+    result = response.get_json()
+    stats = result.get("crawl_stats", {})
+    phases = {
+        "total_ms": round(total, 2),
+        "search_ms": result.get("search_time_ms", 0),
+        "dump_ms": stats.get("dump_time", 0),
+        **db_timings.timings,
+    }
+    if "total_duration" in stats:
+        phases["crawl_ms"] = stats["total_duration"]
+    phases["feeds"] = len(result.get("feeds", []))
+    return phases
+
+
+def measure_allocations(search) -> Dict[str, float]:
+    """
+    Measure the peak and retained memory allocated by a search.
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        search()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((after - before) / 1024, 1),
+    }
+
+
+def compare_results(previous: Dict, current: Dict) -> None:
+    """
+    Print the change in p50 and p95 total latency between two benchmark results.
+    """
+    click.echo(
+        f"\nCompared with {previous['metadata'].get('git_commit') or 'previous run'}:"
+    )
+    for scenario, result in current["results"].items():
+        old = previous["results"].get(scenario)
+        if not old:
+            continue
+        changes = []
+        for key in (f"p{percent}" for percent in PERCENTILES):
+            new_value = result["phases"]["total_ms"][key]
+            old_value = old["phases"]["total_ms"][key]
+            change = (new_value - old_value) / old_value * 100 if old_value else 0
+            changes.append(f"{key}={old_value}->{new_value}ms ({change:+.1f}%)")
+        click.echo(f"{scenario}: {' '.join(changes)}")
+
+
+@click.command()
+@click.option("--feeds", default="1,10,100", help="Comma separated feed counts")
+@click.option("--iterations", default=10, help="Measured searches per scenario")
+@click.option("--warmup", default=2, help="Unmeasured searches per scenario")
+@click.option("--output", default=None, help="File to save the JSON results to")
+@click.option("--compare", default=None, help="Previous JSON results to compare to")
+def benchmark(feeds, iterations, warmup, output, compare) -> None:
+    """
+    Benchmark the search API end to end, with a local DynamoDB, Feedly, and crawled sites.
+    """
+    from moto import mock_aws
+
+    feed_counts = [int(count) for count in feeds.split(",") if count.strip()]
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    # Configure logging before importing the app, so that it doesn't log every request at debug level.
+    logging.basicConfig(level=logging.WARNING)
+    db_timings = DBTimings()
+    db_logger = logging.getLogger("gateway.dynamodb_client")
+    db_logger.setLevel(logging.DEBUG)
+    db_logger.propagate = False
+    db_logger.addHandler(db_timings)
+
+    server = FixtureServer(feed_counts)
+    server.start()
+
+    results = {}
+    try:
+        with mock_aws():
+            create_table()
+            application = import_app(server.feedly_url)
+            client = application.app.test_client()
+
+            scenarios = {
+                # Crawl the site and query Feedly on every search, and save the results.
+                "crawl": ({"force": "true"}, False),
+                # Return recently crawled feeds from the in-process site cache.
+                "cached": ({}, False),
+                # Return recently crawled feeds from DynamoDB.
+                "db": ({}, True),
+            }
+
+            for host, feed_count in server.sites.items():
+                url = server.site_url(host)
+                for name, (params, clear_cache) in scenarios.items():
+
+                    def search():
+                        if clear_cache:
+                            application.site_cache.clear()
+                        return run_search(client, db_timings, url, params)
+
+                    for _ in range(warmup):
+                        search()
+                    samples = [search() for _ in range(iterations)]
+
+                    phases = sorted({key for sample in samples for key in sample})
+                    scenario = f"{name}/feeds={feed_count}"
+                    results[scenario] = {
+                        "phases": {
+                            phase: summarize(
+                                [sample[phase] for sample in samples if phase in sample]
+                            )
+                            for phase in phases
+                            if phase != "feeds"
+                        },
+                        "feeds_returned": samples[-1]["feeds"],
+                        "allocations": measure_allocations(search),
+                    }
+
+                    total = results[scenario]["phases"]["total_ms"]
+                    click.echo(
+                        f"{scenario}: p50={total['p50']}ms p95={total['p95']}ms "
+                        f"feeds={samples[-1]['feeds']} "
+                        f"peak_kb={results[scenario]['allocations']['peak_kb']}"
+                    )
+    finally:
+        server.stop()
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "feed_counts": feed_counts,
+            "iterations": iterations,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        click.echo(f"Saved results to {output}")
+
+    if compare:
+        with open(compare) as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    benchmark()
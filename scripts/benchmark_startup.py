@@ -0,0 +1,144 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import click
+
+from scripts.benchmark_search import TABLE_NAME
+
+# Run in a fresh interpreter, so that every run is a cold start. The table is created and the site saved after
+# the app is imported, with a separate client, so neither the import nor the app's clients are warmed by them.
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from gateway.application import app
+imported = time.perf_counter()
+
+from moto import mock_aws
+from scripts.benchmark_search import create_table, save_site
+
+with mock_aws():
+    create_table()
+    save_site(sys.argv[2])
+    prepared = time.perf_counter()
+    response = app.test_client().get(sys.argv[1])
+    responded = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (imported - start) * 1000,
+    "first_response_ms": (responded - prepared) * 1000,
+}))
+"""
+
+SAVED_HOST = "benchmark.com"
+SEARCH_PATH = f"/api/v1/search?url={SAVED_HOST}&skip_crawl=true&feedly=false"
+
+
+def child_env(debug: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    # Production config by default. In debug mode the static assets aren't packed, so pages can be served before
+    # the CSS has been built.
+    env["FLASK_DEBUG"] = "1" if debug else "0"
+    env["DYNAMODB_TABLE"] = TABLE_NAME
+    env.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    env.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    return env
+
+
+def run_cold_start(path: str, debug: bool) -> Dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, path, SAVED_HOST],
+        env=child_env(debug),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_times(module: str, debug: bool) -> List[Tuple[str, int, int]]:
+    """
+    :return: List of (module, self microseconds, cumulative microseconds) reported by -X importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=child_env(debug),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+@click.command()
+@click.option(
+    "--path",
+    default=SEARCH_PATH,
+    help=f"Path of the first request. Defaults to a search for {SAVED_HOST}, which is saved in the table.",
+)
+@click.option("--debug", is_flag=True, help="Run the app in debug mode")
+@click.option("--repeat", default=5, help="Number of cold starts to time")
+@click.option("--top", default=15, help="Number of slowest imports to list")
+@click.option(
+    "--max-import-ms",
+    default=0.0,
+    help="Fail if the median import time is slower than this. Not checked if 0.",
+)
+@click.option(
+    "--max-first-response-ms",
+    default=0.0,
+    help="Fail if the median time to the first response is slower than this. Not checked if 0.",
+)
+def benchmark(path, debug, repeat, top, max_import_ms, max_first_response_ms) -> None:
+    """
+    Time the cold start of the app: importing gateway.application, and serving the first request from an
+    in-memory DynamoDB table.
+    """
+    times = import_times("gateway.application", debug)
+    total_us = next(c for name, _, c in times if name == "gateway.application")
+    click.echo(f"Slowest imports (cumulative ms, total {total_us / 1000:.1f}ms):")
+    # Only top level packages, as the cumulative time of a package includes its submodules. The gateway
+    # package is the total.
+    packages = {}
+    for name, _, cumulative_us in times:
+        package = name.split(".")[0]
+        if package == "gateway":
+            continue
+        packages[package] = max(packages.get(package, 0), cumulative_us)
+    for package, cumulative_us in sorted(packages.items(), key=lambda p: -p[1])[:top]:
+        click.echo(f"  {package}: {cumulative_us / 1000:.1f}")
+
+    runs = [run_cold_start(path, debug) for _ in range(repeat)]
+    errors = {run["status"] for run in runs if run["status"] >= 500}
+    if errors:
+        raise click.ClickException(f"First request to {path} returned {errors}")
+
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    first_response_ms = statistics.median(run["first_response_ms"] for run in runs)
+    click.echo(
+        f"path={path} runs={repeat} import_ms={import_ms:.1f} "
+        f"first_response_ms={first_response_ms:.1f} total_ms={import_ms + first_response_ms:.1f}"
+    )
+
+    if max_import_ms and import_ms > max_import_ms:
+        raise click.ClickException(
+            f"Import time {import_ms:.1f}ms is slower than {max_import_ms:.1f}ms"
+        )
+    if max_first_response_ms and first_response_ms > max_first_response_ms:
+        raise click.ClickException(
+            f"First response time {first_response_ms:.1f}ms is slower than {max_first_response_ms:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
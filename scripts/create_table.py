@@ -28,6 +28,14 @@ try:
         BillingMode="PAY_PER_REQUEST",
     )
     print(f"Table {table_name} created successfully.")
+
+    # Failure records of unreachable hosts are deleted when they expire.
+    dynamodb.get_waiter("table_exists").wait(TableName=table_name)
+    dynamodb.update_time_to_live(
+        TableName=table_name,
+        TimeToLiveSpecification={"Enabled": True, "AttributeName": "expires"},
+    )
+    print(f"Time to Live enabled on {table_name}.")
 except Exception as e:
     print("Could not create table. Error:")
     print(e)
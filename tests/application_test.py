@@ -0,0 +1,151 @@
+import json
+from typing import Dict, List
+
+import pytest
+
+from gateway import application
+from gateway.application import app
+from gateway.recrawl import RecrawlQueue
+from tests.dynamodb_client_test import create_site
+
+
+@pytest.fixture
+def client(dynamodb_table, monkeypatch):
+    monkeypatch.setattr(application.db_client, "table_name", dynamodb_table)
+    application.site_cache.clear()
+    application.db_client.save_site_feeds(*create_site("test.com"))
+    yield app.test_client()
+    application.site_cache.clear()
+
+
+def search(client, **args):
+    args = {"url": "test.com", "skip_crawl": "true", "feedly": "false", **args}
+    return client.get("/api/v1/search", query_string=args)
+
+
+def test_search_server_timing(client, monkeypatch):
+    monkeypatch.setitem(app.config, "SERVER_TIMING", True)
+    response = search(client)
+    assert response.status_code == 200
+    assert len(response.json) == 2
+    phases = [
+        phase.split(";")[0] for phase in response.headers["Server-Timing"].split(", ")
+    ]
+    assert {"validate", "db", "search", "dump"} <= set(phases)
+
+
+def test_search_server_timing_disabled(client, monkeypatch):
+    monkeypatch.setitem(app.config, "SERVER_TIMING", False)
+    response = search(client)
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+    # Phases are still timed for stats.
+    response = search(client, stats="true")
+    assert "search" in response.json["timings"]
+    assert "Server-Timing" in response.headers
+
+
+def test_search_caches_projected_site(client, monkeypatch):
+    application.site_cache.clear()
+    queries = []
+    paginate_query = application.db_client._paginate_query
+
+    def recording_query(query_name, **kwargs):
+        queries.append(query_name)
+        return paginate_query(query_name, **kwargs)
+
+    monkeypatch.setattr(application.db_client, "_paginate_query", recording_query)
+    # Searches without favicons only read a projection of the feeds.
+    assert len(search(client).json) == 2
+    assert queries == ["SiteHost"]
+
+    queries.clear()
+    response = search(client, info="false")
+    assert len(response.json) == 2
+    assert queries == []
+
+
+def test_stale_search_crawls_without_recrawl_queue(client, monkeypatch):
+    crawled = []
+
+    async def fake_crawl(urls, checkall, url_sources=None, params=None):
+        crawled.append(urls)
+        return [], {"status_codes": {200: 1}}
+
+    monkeypatch.setattr("gateway.search.crawl", fake_crawl)
+    # Outside debug mode, background crawls need a queue, so stale feeds aren't returned.
+    assert application.recrawl_queue is None
+    response = search(client, skip_crawl="false", stale="true")
+    assert response.status_code == 200
+    assert crawled
+    assert "Warning" not in response.headers
+
+
+def test_stale_search_not_modified(client, monkeypatch):
+    class RecordingQueue(RecrawlQueue):
+        def enqueue(self, request):
+            return True
+
+    monkeypatch.setattr(application, "recrawl_queue", RecordingQueue())
+    response = search(client, skip_crawl="false", stale="true")
+    assert response.status_code == 200
+    assert response.headers["Warning"] == application.STALE_WARNING
+
+    # Revalidated stale results are still marked as stale.
+    response = client.get(
+        "/api/v1/search",
+        query_string={"url": "test.com", "feedly": "false", "stale": "true"},
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    assert response.headers["Warning"] == application.STALE_WARNING
+
+
+def emitted_metrics(capsys) -> List[Dict]:
+    return [
+        json.loads(line)
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("{")
+    ]
+
+
+def test_search_metrics_without_server_timing(client, monkeypatch, capsys):
+    monkeypatch.setitem(app.config, "SERVER_TIMING", False)
+    monkeypatch.setitem(app.config, "METRICS_NAMESPACE", "Test")
+    capsys.readouterr()
+    response = search(client)
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+    (metrics,) = emitted_metrics(capsys)
+    assert metrics["Endpoint"] == "search"
+    assert "SearchTime" in metrics
+
+
+def test_sites_list_metrics(client, monkeypatch, capsys):
+    monkeypatch.setitem(app.config, "METRICS_NAMESPACE", "Test")
+    capsys.readouterr()
+    response = client.get("/api/v1/sites", query_string={"limit": 10})
+    assert response.json["sites"]
+
+    (metrics,) = emitted_metrics(capsys)
+    assert metrics["Endpoint"] == "sites_list"
+    assert metrics["DynamoDBCalls"] == 1
+
+
+def test_batch_metrics_emitted_when_stream_closed(client, monkeypatch, capsys):
+    monkeypatch.setitem(app.config, "METRICS_NAMESPACE", "Test")
+    capsys.readouterr()
+    response = client.post(
+        "/api/v1/search/batch",
+        json={"urls": ["", "test.com"], "skip_crawl": True, "feedly": False},
+        buffered=False,
+    )
+    # The client disconnects after the first result.
+    assert json.loads(next(response.response))["url"] == ""
+    response.close()
+
+    (metrics,) = emitted_metrics(capsys)
+    assert metrics["Endpoint"] == "batch"
+    assert metrics["BatchUrls"] == 2
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime
+
+from dateutil.tz import tzutc
+from flask import Flask
+from yarl import URL
+
+from gateway.batch_search import BatchSearch, batch_key
+from gateway.dynamodb_client import AsyncDynamoDBClient, DynamoDBClient
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.sitehost import SiteHost
+from gateway.schema.sitepath import SitePath
+
+
+def save_site(db_client: DynamoDBClient, host: str) -> None:
+    now = datetime.now(tzutc())
+    site = SiteHost(host=host, last_seen=now)
+    feeds = [
+        CustomFeedInfo(url=URL(f"https://{host}/rss.xml"), host=host, last_seen=now)
+    ]
+    site.load_feeds(feeds)
+    db_client.save_site_feeds(site, feeds, SitePath(host, "/"))
+
+
+def test_batch_key():
+    assert batch_key(URL("http://www.test.com")) == batch_key(URL("https://test.com"))
+    assert batch_key(URL("https://test.com/blog")) != batch_key(URL("https://test.com"))
+
+
+def test_batch_search(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    save_site(db_client, "test1.com")
+    save_site(db_client, "test2.com")
+
+    results = {}
+
+    def on_result(key, feeds, error):
+        results[key] = feeds, error
+
+    batch = BatchSearch(
+        AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=True,
+    )
+    urls = [
+        URL("http://test1.com"),
+        URL("https://www.test1.com"),
+        URL("http://test2.com"),
+        URL("http://missing.com"),
+    ]
+    stats = asyncio.run(batch.run(urls, on_result))
+
+    assert stats["searches"] == 3
+    assert stats["timed_out"] == 0
+    feeds, error = results[("test1.com", "/")]
+    assert error is None
+    assert [str(feed.url) for feed in feeds] == ["https://test1.com/rss.xml"]
+    assert results[("missing.com", "/")] == ([], None)
+
+
+def test_batch_search_timeout(dynamodb_table, monkeypatch):
+    db_client = DynamoDBClient(dynamodb_table)
+    results = {}
+
+    async def slow_search(self, query_url):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr("gateway.search.SearchRunner.run_search_async", slow_search)
+    batch = BatchSearch(AsyncDynamoDBClient(db_client), timeout=0.1)
+    stats = asyncio.run(
+        batch.run(
+            [URL("http://test.com")],
+            lambda key, feeds, error: results.setdefault(key, error),
+        )
+    )
+    assert stats["timed_out"] == 1
+    assert isinstance(results[("test.com", "/")], asyncio.TimeoutError)
+
+
+def test_batch_search_shares_crawl_requests(dynamodb_table, monkeypatch):
+    concurrencies = []
+
+    async def fake_crawl(urls, checkall, url_sources=None, params=None):
+        concurrencies.append(params.concurrency)
+        return [], {"status_codes": {200: 1}}
+
+    monkeypatch.setattr("gateway.search.crawl", fake_crawl)
+    batch = BatchSearch(
+        AsyncDynamoDBClient(DynamoDBClient(dynamodb_table)),
+        concurrency=4,
+        max_requests=20,
+        check_feedly=False,
+        force_crawl=True,
+    )
+    with Flask(__name__).app_context():
+        asyncio.run(
+            batch.run(
+                [URL("http://test1.com"), URL("http://test2.com")],
+                lambda *result: None,
+            )
+        )
+    assert concurrencies == [5, 5]
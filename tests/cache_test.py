@@ -0,0 +1,73 @@
+from gateway.cache import TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_get_set():
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert "a" in cache
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_expires_entries():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=60, timer=timer)
+    cache.set("a", 1)
+    timer.now = 59
+    assert cache.get("a") == 1
+    timer.now = 60
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_evicts_by_size():
+    cache = TTLCache(maxsize=10, ttl=60, max_bytes=100)
+    cache.set("a", 1, size=40)
+    cache.set("b", 2, size=40)
+    cache.set("c", 3, size=40)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 80
+
+    # Values larger than the cache are not stored, and replace any existing value.
+    cache.set("b", 4, size=200)
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 40
+
+
+def test_cache_invalidate():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, size=10)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_cache_disabled():
+    cache = TTLCache(maxsize=0)
+    assert not cache.enabled
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+from marshmallow import ValidationError
+from yarl import URL
+
+from gateway.schema.compiled_dump import CompiledDump, compiled_dump
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.external_feedinfo_schema import ExternalFeedInfoSchema
+
+
+def create_feeds(sitefeed_schema, sitefeed_json):
+    feeds = list(sitefeed_schema.loads(sitefeed_json)["feeds"].values())
+    feeds.append(
+        CustomFeedInfo(
+            url=URL("https://test.com/feed.xml"),
+            host="test.com",
+            title="  ",
+            description="",
+            site_url="",
+            favicon=None,
+            hubs=["https://pubsubhubbub.com", None, " "],
+            is_push=1,
+            is_podcast=None,
+            item_count="12",
+            velocity=0.25,
+            last_updated=datetime(2020, 1, 2, 3, 4, 5, tzinfo=tz.tzutc()),
+            last_seen=datetime(2020, 1, 2),
+        )
+    )
+    feeds.append(CustomFeedInfo(url="https://test.com/minimal.xml", hubs=None))
+    return feeds
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"only": ("url",)},
+        {"exclude": ("favicon_data_uri",)},
+        {"only": ("url", "title", "hubs", "last_updated", "score")},
+        {"only": ("url", "favicon_data_uri"), "exclude": ("favicon_data_uri",)},
+    ],
+)
+def test_compiled_dump_matches_schema(sitefeed_schema, sitefeed_json, options):
+    feeds = create_feeds(sitefeed_schema, sitefeed_json)
+    schema = ExternalFeedInfoSchema(many=True, **options)
+    compiled = compiled_dump(ExternalFeedInfoSchema, many=True, **options)
+
+    assert compiled.dump(feeds) == schema.dump(feeds)
+    assert compiled.dump(feeds[0], many=False) == schema.dump(feeds[0], many=False)
+
+
+def test_compiled_dump_raises_validation_errors():
+    feed = CustomFeedInfo(url=URL("https://test.com/feed.xml"), title=123)
+    with pytest.raises(ValidationError):
+        ExternalFeedInfoSchema().dump(feed)
+    with pytest.raises(ValidationError):
+        compiled_dump(ExternalFeedInfoSchema).dump(feed)
+
+
+def test_compiled_dump_uses_schema_for_hooks_and_dicts():
+    feed = CustomFeedInfo(
+        url=URL("https://test.com/feed.xml"), host="test.com", velocity=1
+    )
+    compiled = CompiledDump(DynamoDbFeedInfoSchema())
+    assert compiled.dump(feed) == DynamoDbFeedInfoSchema().dump(feed)
+
+    data = {"url": "https://test.com/feed.xml", "title": "Test"}
+    assert compiled_dump(ExternalFeedInfoSchema).dump(
+        data
+    ) == ExternalFeedInfoSchema().dump(data)
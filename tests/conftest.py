@@ -26,3 +26,42 @@ def sitefeed_json():
     with open(BASE_DIR + "/xkcd.com.json") as f:
         json_data = f.read()
     return json_data
+
+
+@pytest.fixture
+def dynamodb_table(monkeypatch):
+    """
+    Create the Feedsearch table in an in-memory DynamoDB.
+    """
+    from moto import mock_aws
+    import boto3
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-west-2")
+
+    with mock_aws():
+        client = boto3.client("dynamodb")
+        client.create_table(
+            TableName="feedsearch-test",
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+            ],
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "InvertedIndex",
+                    "KeySchema": [
+                        {"AttributeName": "SK", "KeyType": "HASH"},
+                        {"AttributeName": "PK", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield "feedsearch-test"
@@ -0,0 +1,69 @@
+import contextvars
+
+import pytest
+from aiohttp import web
+
+from gateway.connections import ConnectionManager
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_connection_manager_runs_coroutines_in_caller_context():
+    manager = ConnectionManager()
+
+    async def get_request_id():
+        return request_id.get()
+
+    try:
+        request_id.set("abc")
+        assert manager.run(get_request_id()) == "abc"
+    finally:
+        manager.close()
+
+
+def test_connection_manager_raises_coroutine_exceptions():
+    manager = ConnectionManager()
+
+    async def fail():
+        raise ValueError("failed")
+
+    try:
+        with pytest.raises(ValueError):
+            manager.run(fail())
+    finally:
+        manager.close()
+
+
+def test_connection_manager_stats():
+    manager = ConnectionManager()
+    stats = manager.stats()
+    assert stats["connections_created"] == 0
+    assert stats["connection_reuse_ratio"] == 0
+
+
+def test_connection_manager_preconnect():
+    manager = ConnectionManager()
+
+    async def index(request):
+        return web.Response(text="OK")
+
+    async def start_server() -> web.AppRunner:
+        app = web.Application()
+        app.router.add_get("/", index)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner
+
+    try:
+        runner = manager.run(start_server())
+        port = runner.addresses[0][1]
+        assert (
+            manager.preconnect([f"http://127.0.0.1:{port}/", "http://127.0.0.1:1/"])
+            == 1
+        )
+        assert manager.stats()["connections_created"] == 1
+        manager.run(runner.cleanup())
+    finally:
+        manager.close()
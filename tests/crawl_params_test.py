@@ -0,0 +1,90 @@
+from gateway.crawl_params import (
+    CrawlParams,
+    DEFAULT_CRAWL_PARAMS,
+    adaptive_crawl_params,
+    summarize_crawl_stats,
+)
+
+CRAWLER_STATS = {
+    "requests_queued": 8,
+    "requests_failed": 1,
+    "urls_seen": 30,
+    "requests_duration_med": 180,
+    "requests_duration_max": 640,
+    "total_duration": 1400,
+    "status_codes": {200: 6, 301: 1, 404: 1},
+    "content_length_total": 123456,
+}
+
+
+def test_summarize_crawl_stats():
+    summary = summarize_crawl_stats(CRAWLER_STATS, 3)
+    assert summary == {
+        "requests": 8,
+        "failed": 1,
+        "urls_seen": 30,
+        "duration_med": 180,
+        "duration_max": 640,
+        "total_duration": 1400,
+        "ok": 6,
+        "feeds": 3,
+        "crawls": 1,
+        "concurrency": 20,
+        "total_timeout": 10000,
+    }
+    assert summarize_crawl_stats(CRAWLER_STATS, 3, summary)["crawls"] == 2
+
+
+def test_adaptive_crawl_params_without_summary():
+    assert adaptive_crawl_params(None) is DEFAULT_CRAWL_PARAMS
+    assert adaptive_crawl_params({"requests": 0}) is DEFAULT_CRAWL_PARAMS
+
+
+def test_adaptive_crawl_params_small_fast_site():
+    params = adaptive_crawl_params(summarize_crawl_stats(CRAWLER_STATS, 3))
+    assert params.adaptive
+    assert params.concurrency == 8
+    assert params.request_timeout == 1.5
+    assert params.total_timeout == 4
+    assert params.max_depth == DEFAULT_CRAWL_PARAMS.max_depth
+
+
+def test_adaptive_crawl_params_slow_site():
+    summary = {
+        "requests": 60,
+        "failed": 40,
+        "duration_max": 4000,
+        "total_duration": 10000,
+    }
+    params = adaptive_crawl_params(summary)
+    assert params.concurrency == 10
+    assert params.request_timeout == DEFAULT_CRAWL_PARAMS.request_timeout
+    assert params.total_timeout == DEFAULT_CRAWL_PARAMS.total_timeout
+    assert params.max_depth == 3
+
+
+def test_adaptive_crawl_params_within_defaults():
+    summary = {"requests": 2, "duration_max": 3000, "total_duration": 7000}
+    params = adaptive_crawl_params(summary)
+    assert params.concurrency == 5
+    assert params.request_timeout == 4
+    assert params.total_timeout == 10
+
+
+def test_crawl_params_copy():
+    params = DEFAULT_CRAWL_PARAMS.copy(concurrency=5)
+    assert params.concurrency == 5
+    assert params.total_timeout == DEFAULT_CRAWL_PARAMS.total_timeout
+    assert DEFAULT_CRAWL_PARAMS.concurrency == 20
+
+
+def test_adaptive_crawl_params_compares_last_timeout():
+    # The last crawl used all of its reduced timeout, so it's given the default timeout and fewer links.
+    last_params = CrawlParams(concurrency=8, request_timeout=1.5, total_timeout=4)
+    summary = summarize_crawl_stats(
+        {**CRAWLER_STATS, "total_duration": 3900}, 3, params=last_params
+    )
+    assert summary["total_timeout"] == 4000
+    params = adaptive_crawl_params(summary)
+    assert params.total_timeout == DEFAULT_CRAWL_PARAMS.total_timeout
+    assert params.max_depth == DEFAULT_CRAWL_PARAMS.max_depth - 2
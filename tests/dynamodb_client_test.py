@@ -0,0 +1,266 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+from yarl import URL
+
+from gateway.cache import TTLCache
+from gateway.dynamodb_client import (
+    AsyncDynamoDBClient,
+    DynamoDBClient,
+    decode_cursor,
+    dynamodb_item_hash,
+    encode_cursor,
+    dynamodb_item_size,
+)
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.sitehost import SiteHost
+from gateway.schema.sitepath import SitePath
+
+last_seen = datetime(2019, 11, 3, 8, 50, 43, tzinfo=tz.tzutc())
+
+
+def create_site(host: str = "test.com", feed_count: int = 2):
+    site = SiteHost(host=host, last_seen=last_seen)
+    feeds = [
+        CustomFeedInfo(
+            url=URL(f"https://{host}/feed{i}.xml"),
+            host=host,
+            title=f"Feed {i}",
+            last_seen=last_seen,
+            velocity=1.5,
+            item_count=10,
+        )
+        for i in range(feed_count)
+    ]
+    site.load_feeds(feeds)
+    site_path = SitePath(host, "/blog", last_seen, [str(feeds[0].url)])
+    return site, feeds, site_path
+
+
+def test_save_and_query_site_feeds(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    site, feeds, site_path = create_site()
+    db_client.save_site_feeds(site, feeds, site_path)
+
+    loaded_site = db_client.query_site_feeds("test.com")
+    assert loaded_site.host == "test.com"
+    assert loaded_site.last_seen == last_seen
+    assert set(loaded_site.feeds.keys()) == {str(feed.url) for feed in feeds}
+    assert loaded_site.feeds["https://test.com/feed0.xml"].title == "Feed 0"
+
+    loaded_path = db_client.query_site_path(SitePath("test.com", "/blog"))
+    assert loaded_path.last_seen == last_seen
+    assert loaded_path.feeds == ["https://test.com/feed0.xml"]
+
+    assert db_client.query_sites_list() == [
+        {"host": "test.com", "last_seen": "2019-11-03T08:50:43+00:00"}
+    ]
+
+
+def test_query_missing_site(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    site = db_client.query_site_feeds("missing.com")
+    assert site.host == "missing.com"
+    assert not site.feeds
+    site_path = db_client.query_site_path(SitePath("missing.com", "/path"))
+    assert not site_path.last_seen
+
+
+def test_cached_site_feeds(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table, cache=TTLCache(maxsize=10, ttl=60))
+    site, feeds, site_path = create_site()
+    db_client.save_site_feeds(site, feeds, site_path)
+
+    # Saving updates the cache, so the query doesn't read DynamoDB.
+    cached_site = db_client.query_site_feeds("test.com")
+    assert db_client.cache_stats()["hits"] == 1
+    assert set(cached_site.feeds.keys()) == set(site.feeds.keys())
+
+    # Changes to the returned site don't change the cached site.
+    cached_site.feeds["https://test.com/feed0.xml"].title = "Changed"
+    cached_site.feeds.pop("https://test.com/feed1.xml")
+    cached_again = db_client.query_site_feeds("test.com")
+    assert cached_again.feeds["https://test.com/feed0.xml"].title == "Feed 0"
+    assert len(cached_again.feeds) == 2
+
+
+def test_async_client(dynamodb_table):
+    db_client = AsyncDynamoDBClient(DynamoDBClient(dynamodb_table))
+    site, feeds, site_path = create_site()
+
+    async def run():
+        await db_client.save_site_feeds(site, feeds, site_path)
+        return await asyncio.gather(
+            db_client.query_site_feeds("test.com"),
+            db_client.query_site_path(SitePath("test.com", "/blog")),
+        )
+
+    loaded_site, loaded_path = asyncio.run(run())
+    assert len(loaded_site.feeds) == 2
+    assert loaded_path.feeds == ["https://test.com/feed0.xml"]
+
+
+def test_dynamodb_item_size():
+    assert dynamodb_item_size("abc") == 3
+    assert dynamodb_item_size({"PK": "SITE#a.com"}) == 3 + 2 + 10
+    assert dynamodb_item_size([1, True]) == 3 + 2 + 2
+
+
+def test_query_site_with_path(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    site, feeds, site_path = create_site()
+    db_client.save_site_feeds(site, feeds, site_path)
+
+    async_client = AsyncDynamoDBClient(db_client)
+    loaded_site, loaded_path = asyncio.run(
+        async_client.query_site_with_path("test.com", SitePath("test.com", "/blog"))
+    )
+    assert len(loaded_site.feeds) == 2
+    assert loaded_path.feeds == ["https://test.com/feed0.xml"]
+
+    missing_site, missing_path = asyncio.run(
+        async_client.query_site_with_path("test.com", SitePath("test.com", "/missing"))
+    )
+    assert len(missing_site.feeds) == 2
+    assert not missing_path.last_seen
+
+
+def test_loaded_items_match_dumped_items(dynamodb_table):
+    DynamoDBClient(dynamodb_table).save_site_feeds(*create_site())
+
+    db_client = DynamoDBClient(dynamodb_table)
+    loaded_site = db_client.query_site_feeds("test.com")
+    loaded_path = db_client.query_site_path(SitePath("test.com", "/blog"))
+    assert loaded_site.stored_hash == dynamodb_item_hash(
+        db_client.db_site_schema.dump(loaded_site)
+    )
+    assert loaded_path.stored_hash == dynamodb_item_hash(
+        db_client.db_path_schema.dump(loaded_path)
+    )
+    for feed in loaded_site.feeds.values():
+        assert feed.stored_hash
+        assert feed.stored_hash == dynamodb_item_hash(
+            db_client.db_feed_schema.dump([feed])[0]
+        )
+
+
+def test_save_only_changed_items(dynamodb_table, caplog):
+    caplog.set_level(logging.DEBUG, logger="gateway.dynamodb_client")
+    DynamoDBClient(dynamodb_table).save_site_feeds(*create_site(feed_count=3))
+
+    db_client = DynamoDBClient(dynamodb_table)
+    site = db_client.query_site_feeds("test.com")
+    site_path = db_client.query_site_path(SitePath("test.com", "/blog"))
+    changed_feed = site.feeds["https://test.com/feed1.xml"]
+    changed_feed.last_seen = datetime(2020, 1, 1, tzinfo=tz.tzutc())
+
+    caplog.clear()
+    db_client.save_site_feeds(site, list(site.feeds.values()), site_path)
+    assert "written=1" in caplog.text
+    assert "skipped=4" in caplog.text
+
+    loaded_site = DynamoDBClient(dynamodb_table).query_site_feeds("test.com")
+    assert loaded_site.feeds["https://test.com/feed1.xml"].last_seen == datetime(
+        2020, 1, 1, tzinfo=tz.tzutc()
+    )
+
+    # Saved items are recorded as stored, so saving again writes nothing.
+    caplog.clear()
+    db_client.save_site_feeds(site, list(site.feeds.values()), site_path)
+    assert "written=0" in caplog.text
+
+
+def test_query_site_feeds_projection(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    site, feeds, site_path = create_site()
+    for feed in feeds:
+        feed.favicon_data_uri = "data:image/png;base64,iVBORw0KGgo="
+        feed.content_type = "application/rss+xml"
+    db_client.save_site_feeds(site, feeds, site_path)
+
+    projected = db_client.query_site_feeds("test.com", ["url", "item_count"])
+    assert projected.partial
+    assert projected.last_seen == last_seen
+    feed = projected.feeds["https://test.com/feed0.xml"]
+    assert feed.item_count == 10
+    assert feed.title == "Feed 0"
+    assert feed.velocity == 1.5
+    assert not feed.favicon_data_uri
+    assert not feed.content_type
+
+    # Partial sites can't be saved.
+    feed.title = "Changed"
+    db_client.save_site_feeds(projected, list(projected.feeds.values()), site_path)
+    loaded_site = db_client.query_site_feeds("test.com")
+    assert not loaded_site.partial
+    assert loaded_site.feeds["https://test.com/feed0.xml"].title == "Feed 0"
+    assert loaded_site.feeds["https://test.com/feed0.xml"].favicon_data_uri
+
+
+def test_query_site_feeds_projection_cached(dynamodb_table):
+    cache = TTLCache(maxsize=10, ttl=60)
+    db_client = DynamoDBClient(dynamodb_table, cache=cache)
+    site, feeds, site_path = create_site()
+    for feed in feeds:
+        feed.content_type = "application/rss+xml"
+    db_client.save_site_feeds(site, feeds, site_path)
+    cache.clear()
+
+    # With the cache enabled, the complete site is read and cached, and returned for any projection.
+    loaded_site = db_client.query_site_feeds("test.com", ["url"])
+    assert not loaded_site.partial
+    assert loaded_site.feeds["https://test.com/feed0.xml"].content_type
+    assert len(cache) == 1
+
+    cached_site = db_client.query_site_feeds("test.com", ["url", "item_count"])
+    assert not cached_site.partial
+    assert cached_site.feeds["https://test.com/feed0.xml"].content_type
+    assert cache.stats()["hits"] == 1
+
+
+def test_projection_kwargs():
+    assert DynamoDBClient.projection_kwargs(None) == {}
+    kwargs = DynamoDBClient.projection_kwargs(["url", "favicon"])
+    names = kwargs["ExpressionAttributeNames"]
+    assert kwargs["ProjectionExpression"] == ", ".join(names)
+    assert list(names.values()).count("url") == 1
+    assert {"PK", "SK", "favicon", "last_seen"} <= set(names.values())
+
+
+def test_query_sites_pages(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    for i in range(5):
+        site, feeds, site_path = create_site(f"test{i}.com", feed_count=1)
+        db_client.save_site_feeds(site, feeds, site_path)
+
+    sites, cursor = db_client.query_sites_page(limit=2)
+    assert len(sites) == 2
+    assert cursor
+
+    hosts = [site["host"] for site in sites]
+    while cursor:
+        sites, cursor = db_client.query_sites_page(limit=2, cursor=cursor)
+        hosts.extend(site["host"] for site in sites)
+    assert sorted(hosts) == [f"test{i}.com" for i in range(5)]
+
+    pages = list(db_client.iter_sites_pages(page_size=2))
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [site for page in pages for site in page] == db_client.query_sites_list()
+
+
+def test_cursor_tokens():
+    key = {"PK": "SITE#test.com", "SK": "#METADATA#"}
+    assert decode_cursor(encode_cursor(key)) == key
+
+    for token in ["", "not a token", encode_cursor({"PK": 1, "SK": "#METADATA#"})]:
+        with pytest.raises(ValueError):
+            decode_cursor(token)
+
+
+def test_warm_up(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table, max_workers=2)
+    assert db_client.warm_up() == 1
+    assert 2 <= db_client.warm_up(threads=4) <= 3
@@ -0,0 +1,103 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from dateutil import tz
+from yarl import URL
+
+from gateway.dynamodb_client import DynamoDBClient
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.feed_loader import FeedLoadError, load_feed_items
+
+
+def to_dynamodb_item(item):
+    """
+    Convert a dumped item to the value types returned by a DynamoDB query.
+    """
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+
+    def decimals(value):
+        if isinstance(value, float):
+            return Decimal(str(value))
+        return value
+
+    return {
+        key: deserializer.deserialize(serializer.serialize(decimals(value)))
+        for key, value in item.items()
+    }
+
+
+def create_items(sitefeed_schema, sitefeed_json):
+    feeds = list(sitefeed_schema.loads(sitefeed_json)["feeds"].values())
+    feeds.append(
+        CustomFeedInfo(
+            url=URL("https://test.com/feed.xml"),
+            title="Test",
+            description="Long description " * 20,
+            hubs=["https://pubsubhubbub.com"],
+            is_push=True,
+            velocity=0.25,
+            last_seen=datetime(2020, 1, 2, 3, 4, 5, 6, tzinfo=tz.tzoffset(None, -3600)),
+        )
+    )
+    for feed in feeds:
+        feed.host = "test.com"
+    return [
+        to_dynamodb_item(item) for item in DynamoDbFeedInfoSchema(many=True).dump(feeds)
+    ]
+
+
+def assert_feeds_equal(loaded, expected):
+    assert len(loaded) == len(expected)
+    for feed, expected_feed in zip(loaded, expected):
+        assert type(feed) is type(expected_feed)
+        assert vars(feed) == vars(expected_feed)
+        for name in ["last_seen", "last_updated"]:
+            value, expected_value = getattr(feed, name), getattr(expected_feed, name)
+            if value:
+                assert value.tzname() == expected_value.tzname()
+
+
+def test_load_feed_items_matches_schema(sitefeed_schema, sitefeed_json):
+    items = create_items(sitefeed_schema, sitefeed_json)
+    assert_feeds_equal(
+        load_feed_items(items), DynamoDbFeedInfoSchema(many=True).load(items)
+    )
+
+
+def test_load_feed_items_only(sitefeed_schema, sitefeed_json):
+    items = create_items(sitefeed_schema, sitefeed_json)
+    only = ["url", "title", "last_seen"]
+    assert_feeds_equal(
+        load_feed_items(items, only),
+        DynamoDbFeedInfoSchema(many=True, only=only).load(items),
+    )
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {"title": 10},
+        {"url": None},
+        {"last_seen": "2020-01-02T03:04:05Z"},
+        {"is_push": "true"},
+        {"item_count": "10"},
+        {"hubs": ["https://pubsubhubbub.com", None]},
+    ],
+)
+def test_load_feed_items_falls_back_to_schema(values):
+    item = {"url": "https://test.com/feed.xml", "host": "test.com", **values}
+    with pytest.raises(FeedLoadError):
+        load_feed_items([item])
+
+    client = DynamoDBClient("feedsearch-test")
+    schema = DynamoDbFeedInfoSchema(many=True)
+    try:
+        expected = schema.load([item])
+    except Exception as e:
+        with pytest.raises(type(e)):
+            client.load_feeds([item])
+    else:
+        assert_feeds_equal(client.load_feeds([item]), expected)
@@ -1,8 +1,80 @@
-from gateway.feedly import is_stale_feed
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+from flask import Flask
+
+from gateway.dynamodb_client import AsyncDynamoDBClient, DynamoDBClient
+from gateway.feedly import FeedlyError, fetch_feedly_feeds, is_stale_feed
+from gateway.schema.feedlyresult import FeedlyResult
 
 
 def test_is_stale_feed():
     assert not is_stale_feed(1567207200000, datetime(2019, 7, 31))
     assert is_stale_feed(1564444800, datetime(2019, 7, 31))
     assert is_stale_feed(0, datetime(2019, 7, 31))
+
+
+def test_fetch_feedly_feeds_stores_results(dynamodb_table, monkeypatch):
+    db_client = AsyncDynamoDBClient(DynamoDBClient(dynamodb_table))
+    queries = []
+    results = {
+        "https://example-site.com": ["https://example-site.com/feed"],
+        "https://empty-site.com": [],
+    }
+
+    async def fake_fetch_feedly(query):
+        queries.append(query)
+        if query not in results:
+            raise FeedlyError("Feedly returned status 429")
+        return results[query]
+
+    monkeypatch.setattr("gateway.feedly.fetch_feedly", fake_fetch_feedly)
+
+    def fetch(query, ttl=3600):
+        return asyncio.run(fetch_feedly_feeds(query, db_client, ttl))
+
+    with Flask(__name__).app_context():
+        assert fetch("https://example-site.com") == ["https://example-site.com/feed"]
+        # Queries of the same root host return the stored results.
+        assert fetch("https://www.example-site.com/blog") == [
+            "https://example-site.com/feed"
+        ]
+        assert fetch("https://empty-site.com") == []
+        assert fetch("https://empty-site.com") == []
+        assert queries == ["https://example-site.com", "https://empty-site.com"]
+
+        # Failed calls aren't stored.
+        assert fetch("https://limited-site.com") == []
+        assert fetch("https://limited-site.com") == []
+        assert queries[-2:] == ["https://limited-site.com"] * 2
+
+        # Results aren't stored without a TTL.
+        assert fetch("https://example-site.com", ttl=0) == [
+            "https://example-site.com/feed"
+        ]
+        assert len(queries) == 5
+
+
+def test_expired_feedly_result(dynamodb_table, monkeypatch):
+    client = DynamoDBClient(dynamodb_table)
+    now = datetime.now(tzutc())
+    client.save_feedly_result(
+        FeedlyResult("example-site.com", ["https://example-site.com/old"], now, now)
+    )
+    stored = client.query_feedly_result("example-site.com")
+    assert stored.urls == ["https://example-site.com/old"]
+    assert not stored.is_fresh(now + timedelta(seconds=1))
+
+    async def fake_fetch_feedly(query):
+        return ["https://example-site.com/new"]
+
+    monkeypatch.setattr("gateway.feedly.fetch_feedly", fake_fetch_feedly)
+    with Flask(__name__).app_context():
+        urls = asyncio.run(
+            fetch_feedly_feeds(
+                "https://example-site.com", AsyncDynamoDBClient(client), 3600
+            )
+        )
+    assert urls == ["https://example-site.com/new"]
+    assert client.query_feedly_result("example-site.com").urls == urls
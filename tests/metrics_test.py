@@ -0,0 +1,79 @@
+import io
+import json
+
+from gateway.dynamodb_client import DynamoDBClient
+from gateway.metrics import (
+    Metrics,
+    current_metrics,
+    metrics_context,
+    put_consumed_capacity,
+    put_metric,
+    use_metrics,
+)
+from gateway.schema.sitepath import SitePath
+from gateway.timing import PhaseTimer
+from tests.dynamodb_client_test import create_site
+
+
+def test_metrics_emf():
+    metrics = Metrics("Feedsearch", {"Endpoint": "search"})
+    metrics.put("DynamoDBCalls", 1)
+    metrics.put("DynamoDBCalls", 2)
+    metrics.put("CrawlTime", 12.5, "Milliseconds")
+    metrics.set_property("host", "example.com")
+
+    stream = io.StringIO()
+    metrics.emit(stream)
+    line = json.loads(stream.getvalue())
+    assert line["Endpoint"] == "search"
+    assert line["host"] == "example.com"
+    assert line["DynamoDBCalls"] == 3
+    assert line["CrawlTime"] == 12.5
+    directive = line["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == "Feedsearch"
+    assert directive["Dimensions"] == [["Endpoint"]]
+    assert directive["Metrics"] == [
+        {"Name": "DynamoDBCalls", "Unit": "Count"},
+        {"Name": "CrawlTime", "Unit": "Milliseconds"},
+    ]
+
+
+def test_metrics_context(capsys):
+    with metrics_context("", "search") as metrics:
+        assert metrics is None
+        put_metric("Crawls", 1)
+    assert capsys.readouterr().out == ""
+
+    with metrics_context("Feedsearch", "search") as metrics:
+        assert current_metrics() is metrics
+        put_metric("Crawls", 1)
+        put_consumed_capacity([{"CapacityUnits": 0.5}, {"CapacityUnits": 1}], "Read")
+        with PhaseTimer().phase("crawl"):
+            pass
+    assert current_metrics() is None
+
+    line = json.loads(capsys.readouterr().out)
+    assert line["Crawls"] == 1
+    assert line["DynamoDBReadCapacityUnits"] == 1.5
+    assert "CrawlTime" in line
+
+
+def test_dynamodb_metrics(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    site, feeds, site_path = create_site()
+
+    metrics = Metrics("Feedsearch", {"Endpoint": "search"})
+    with use_metrics(metrics):
+        db_client.save_site_feeds(site, feeds, site_path)
+    assert metrics.values["DynamoDBCalls"] == 1
+    assert metrics.values["DynamoDBItemsWritten"] == 4
+    assert metrics.values["DynamoDBBytesWritten"] > 0
+    assert metrics.values["DynamoDBWriteCapacityUnits"] > 0
+
+    metrics = Metrics("Feedsearch", {"Endpoint": "search"})
+    with use_metrics(metrics):
+        db_client.query_site_feeds("test.com")
+        db_client.query_site_path(SitePath("test.com", "/blog"))
+    assert metrics.values["DynamoDBCalls"] == 2
+    assert metrics.values["DynamoDBItemsRead"] == 4
+    assert metrics.values["DynamoDBReadCapacityUnits"] > 0
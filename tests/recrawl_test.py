@@ -0,0 +1,78 @@
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from gateway.recrawl import (
+    LocalRecrawlQueue,
+    RecrawlRequest,
+    SQSRecrawlQueue,
+    sqs_event_requests,
+)
+
+
+def test_recrawl_request_json():
+    request = RecrawlRequest("https://test.com", check_feedly=False, check_all=True)
+    loaded = RecrawlRequest.from_json(request.to_json())
+    assert loaded.key == ("https://test.com", False, True)
+
+    for data in ["", "[]", '{"check_all": true}']:
+        with pytest.raises(ValueError):
+            RecrawlRequest.from_json(data)
+
+
+def test_local_queue_runs_requests_once():
+    release = threading.Event()
+    handled = []
+
+    def handler(request):
+        release.wait(5)
+        handled.append(request.url)
+
+    recrawl_queue = LocalRecrawlQueue(handler)
+    assert recrawl_queue.enqueue(RecrawlRequest("https://a.com"))
+    assert recrawl_queue.enqueue(RecrawlRequest("https://b.com"))
+    # Requests that are already waiting are dropped.
+    assert not recrawl_queue.enqueue(RecrawlRequest("https://b.com"))
+    release.set()
+    recrawl_queue.join()
+    assert handled == ["https://a.com", "https://b.com"]
+
+    # Finished requests can be queued again.
+    assert recrawl_queue.enqueue(RecrawlRequest("https://a.com"))
+    recrawl_queue.join()
+    assert handled[-1] == "https://a.com"
+
+
+def test_local_queue_survives_handler_errors():
+    def handler(request):
+        raise RuntimeError(request.url)
+
+    recrawl_queue = LocalRecrawlQueue(handler)
+    recrawl_queue.enqueue(RecrawlRequest("https://a.com"))
+    recrawl_queue.join()
+    assert recrawl_queue.enqueue(RecrawlRequest("https://a.com"))
+    recrawl_queue.join()
+
+
+def test_sqs_queue(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-west-2")
+
+    with mock_aws():
+        client = boto3.client("sqs")
+        queue_url = client.create_queue(QueueName="recrawl")["QueueUrl"]
+        recrawl_queue = SQSRecrawlQueue(queue_url, client)
+        assert recrawl_queue.enqueue(RecrawlRequest("https://test.com"))
+
+        messages = client.receive_message(QueueUrl=queue_url)["Messages"]
+        event = {"Records": [{"body": message["Body"]} for message in messages]}
+        event["Records"].append({"body": "invalid"})
+        requests = sqs_event_requests(event)
+        assert [request.url for request in requests] == ["https://test.com"]
+
+        assert not SQSRecrawlQueue(queue_url + "-missing", client).enqueue(
+            RecrawlRequest("https://test.com")
+        )
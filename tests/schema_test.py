@@ -1,13 +1,18 @@
+import json
 from datetime import datetime
 from decimal import Decimal
 
+from boto3.dynamodb.types import Binary
 from dateutil import tz
 from yarl import URL
 
 from gateway.schema.customfeedinfo import CustomFeedInfo
 from gateway.schema.dynamodb_feedinfo_schema import DynamoDbFeedInfoSchema
+from gateway.schema.dynamodb_hostfailure_schema import DynamoDbHostFailureSchema
 from gateway.schema.dynamodb_site_schema import DynamoDbSiteSchema
 from gateway.schema.dynamodb_sitepath_schema import DynamoDbSitePathSchema
+from gateway.schema.fields import compress_string, decompress_string
+from gateway.schema.hostfailure import HostFailure
 from gateway.schema.sitehost import SiteHost
 from gateway.schema.sitepath import SitePath
 
@@ -107,6 +112,23 @@ def test_dynamodb_site_schema_dump():
     assert dump == site_schema_dict
 
 
+def test_dynamodb_site_schema_crawl_stats():
+    schema = DynamoDbSiteSchema()
+    site = SiteHost(
+        host="en.wikipedia.org",
+        last_seen=datetime(2019, 11, 3, 8, 50, 43, tzinfo=tz.tzutc()),
+        crawl_stats={"requests": 12, "total_duration": 2300},
+    )
+    dump = schema.dump(site)
+    assert dump["crawl_stats"] == {"requests": 12, "total_duration": 2300}
+
+    # DynamoDB returns numbers as Decimals.
+    dump["crawl_stats"] = {"requests": Decimal("12"), "total_duration": Decimal("2300")}
+    loaded = schema.load(dump)
+    assert loaded.crawl_stats == {"requests": 12, "total_duration": 2300}
+    assert isinstance(loaded.crawl_stats["requests"], int)
+
+
 def test_sitepath_schema():
     schema = DynamoDbSitePathSchema()
 
@@ -126,3 +148,91 @@ def test_sitepath_schema():
     assert deserialized.host == "test.com"
     assert deserialized.path == "/testing"
     assert deserialized.feeds == feeds
+
+
+def test_sitehost_copy():
+    feed = CustomFeedInfo(url=URL("https://test.com/rss.xml"), host="test.com")
+    site = SiteHost(host="test.com", last_seen=datetime(2019, 1, 1))
+    site.load_feeds([feed])
+
+    copied = site.copy()
+    copied.last_seen = datetime(2020, 1, 1)
+    copied.feeds["https://test.com/rss.xml"].score = 10
+    copied.feeds["https://test.com/atom.xml"] = CustomFeedInfo(
+        url=URL("https://test.com/atom.xml")
+    )
+
+    assert copied == site
+    assert site.last_seen == datetime(2019, 1, 1)
+    assert feed.score == 0
+    assert len(site.feeds) == 1
+
+
+def test_dynamodb_feedinfo_schema_compresses_large_values(sitefeed_json):
+    favicon_data_uri = json.loads(sitefeed_json)["feeds"]["https://xkcd.com/rss.xml"][
+        "favicon_data_uri"
+    ]
+    description = "A webcomic of romance, sarcasm, math, and language. " * 10
+    schema = DynamoDbFeedInfoSchema()
+    feed = CustomFeedInfo(
+        host="xkcd.com",
+        url=URL("https://xkcd.com/rss.xml"),
+        description=description,
+        favicon_data_uri=favicon_data_uri,
+    )
+
+    dump = schema.dump(feed)
+    assert isinstance(dump["favicon_data_uri"], bytes)
+    assert isinstance(dump["description"], bytes)
+    assert len(dump["favicon_data_uri"]) < len(favicon_data_uri)
+    assert len(dump["description"]) < len(description)
+
+    loaded = schema.load(dump)
+    assert loaded.favicon_data_uri == favicon_data_uri
+    assert loaded.description == description
+
+    # Boto3 returns binary attributes wrapped in Binary objects
+    dump["favicon_data_uri"] = Binary(dump["favicon_data_uri"])
+    assert schema.load(dump).favicon_data_uri == favicon_data_uri
+
+
+def test_dynamodb_feedinfo_schema_loads_uncompressed_values():
+    schema = DynamoDbFeedInfoSchema()
+    feed = CustomFeedInfo(
+        host="test.com", url=URL("https://test.com/rss.xml"), description="Short"
+    )
+    dump = schema.dump(feed)
+    assert dump["description"] == "Short"
+
+    legacy = dict(feedinfo_schema_dict, description="Legacy " * 50)
+    assert schema.load(legacy).description == "Legacy " * 50
+
+
+def test_compress_string_round_trip():
+    values = [
+        "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk",
+        "data:image/png;base64,not valid base64!",
+        "data:text/plain,Hello",
+        "Plain text with unicode ✓",
+    ]
+    for value in values:
+        assert decompress_string(compress_string(value)) == value
+
+
+def test_host_failure_schema():
+    schema = DynamoDbHostFailureSchema()
+    failure = HostFailure("test.com")
+    failure.add_failure(datetime(2020, 1, 1, tzinfo=tz.tzutc()), 300, 86400)
+
+    dump = schema.dump(failure)
+    assert dump["PK"] == "SITE#test.com"
+    assert dump["SK"] == "#FAILED#"
+    assert dump["failures"] == 1
+    assert dump["retry_after"] == "2020-01-01T00:05:00+00:00"
+    # Expires a day after the backoff window, as seconds since the epoch.
+    assert dump["expires"] == 1577837100 + 86400
+
+    loaded = schema.load(dump)
+    assert isinstance(loaded, HostFailure)
+    assert loaded.failures == 1
+    assert loaded.retry_after == failure.retry_after
@@ -0,0 +1,145 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from dateutil import tz
+from yarl import URL
+
+from gateway.schema.customfeedinfo import CustomFeedInfo, score_item
+from gateway.scoring import FeedScorer, score_feeds
+
+# Feed attributes that affect the score, applied to each URL in GOLDEN_SCORES.
+VARIANTS = [
+    {},
+    {
+        "bozo": 1,
+        "description": "Desc",
+        "is_push": True,
+        "velocity": 2.7,
+        "title": "News",
+    },
+    {"description": "Desc", "velocity": Decimal("13.2"), "title": "Latest Comments"},
+    {"is_push": True, "velocity": 0.4, "title": "Feed"},
+]
+
+# Scores for each variant, as calculated by the original per-item score_item implementation.
+GOLDEN_SCORES = {
+    "https://xkcd.com/rss.xml": (-6, -4, -11, 4),
+    "https://xkcd.com/atom.xml": (-4, -2, -9, 6),
+    "http://example.com/feed": (-6, -4, -11, 4),
+    "https://example.com/feeds/posts/default": (0, 2, -5, 10),
+    "https://feeds.feedburner.com/Example": (-26, -24, -31, -16),
+    "http://example.com/georss.xml": (-6, -4, -11, 4),
+    "https://example.com/alternate/rss": (-1, 1, -6, 9),
+    "https://example.com/index.rdf": (32, 34, 27, 42),
+    "https://example.com/comments/feed/": (-15, -15, -5, -5),
+    "https://blog.example.com/home/feed.xml": (18, 20, 13, 28),
+    "https://example.com/top/stories.rss": (16, 18, 11, 26),
+    "https://example.com/most-popular/atom": (18, 20, 13, 28),
+    "https://example.com/magazine/rdfeed": (14, 16, 9, 24),
+    "https://other.com/feed.xml": (-10, -8, -15, 0),
+    "https://example.com/a/b/c/d/e/rss": (-2, 0, -7, 8),
+    "http://EXAMPLE.com/Feed.XML": (0, 2, -5, 10),
+    "https://example.com/?feed=rss2": (12, 14, 7, 22),
+    "https://example.com/feedburner/georss/alt/index/comments/home/top/most/magazine/atom/rss.xml/feed/rdf": (
+        4,
+        4,
+        14,
+        14,
+    ),
+    "https://example.com/rdfeed": (6, 8, 1, 16),
+    "https://example.com/rssfeed.xml": (18, 20, 13, 28),
+    "https://example.com/atomfeed": (14, 16, 9, 24),
+    "https://example.com/": (0, 2, -5, 10),
+}
+
+
+def create_feeds():
+    return [
+        CustomFeedInfo(url=URL(url), **variant)
+        for url in GOLDEN_SCORES
+        for variant in VARIANTS
+    ]
+
+
+def expected_scores():
+    return [score for scores in GOLDEN_SCORES.values() for score in scores]
+
+
+@pytest.mark.parametrize("url", GOLDEN_SCORES)
+def test_score_item_golden(url):
+    for variant, expected in zip(VARIANTS, GOLDEN_SCORES[url]):
+        feed = CustomFeedInfo(url=URL(url), **variant)
+        score_item(feed, "example.com")
+        assert feed.score == expected, variant
+
+
+def test_score_feeds_golden():
+    feeds = create_feeds()
+    score_feeds(feeds, "example.com")
+    assert [feed.score for feed in feeds] == expected_scores()
+    assert all(feed.host == "example.com" for feed in feeds)
+
+    # Scores are the same when URL scores are cached.
+    scorer = FeedScorer(cache_size=4)
+    for _ in range(2):
+        feeds = create_feeds()
+        scorer.score_feeds(feeds, "example.com")
+        assert [feed.score for feed in feeds] == expected_scores()
+
+
+def test_score_feeds_query_host():
+    feed = CustomFeedInfo(url=URL("https://other.com/feed.xml"))
+    scorer = FeedScorer()
+    scorer.score_feeds([feed], "other.com")
+    assert feed.score == 10
+    scorer.score_feeds([feed], "example.com")
+    assert feed.score == -10
+    scorer.score_feeds([feed], "")
+    assert feed.score == 10
+
+
+def test_score_feeds_last_updated():
+    feeds = [
+        CustomFeedInfo(url=URL("https://example.com/feed"), last_updated=last_updated)
+        for last_updated in [
+            datetime(2020, 1, 1, 1, tzinfo=tz.gettz("CET")),
+            datetime(2020, 1, 1),
+            datetime(2020, 1, 1, tzinfo=tz.tzutc()),
+            None,
+        ]
+    ]
+    score_feeds(feeds, "example.com")
+    assert [feed.last_updated for feed in feeds] == [
+        datetime(2020, 1, 1, tzinfo=tz.tzutc()),
+        datetime(2020, 1, 1, tzinfo=tz.tzutc()),
+        datetime(2020, 1, 1, tzinfo=tz.tzutc()),
+        None,
+    ]
+
+
+def test_score_feeds_skips_current_scores():
+    scorer = FeedScorer(version=2)
+    current = CustomFeedInfo(
+        url=URL("https://example.com/feed"),
+        host="example.com",
+        score=99,
+        score_version=2,
+    )
+    stale = CustomFeedInfo(
+        url=URL("https://example.com/feed"),
+        host="example.com",
+        score=99,
+        score_version=1,
+    )
+    other_host = CustomFeedInfo(
+        url=URL("https://example.com/feed"), host="other.com", score=99, score_version=2
+    )
+    assert scorer.score_feeds([current, stale, other_host], "example.com") == 2
+    assert current.score == 99
+    assert stale.score == other_host.score == 4
+    assert stale.score_version == 2
+
+    assert scorer.score_feeds([current, stale, other_host], "example.com") == 0
+    assert scorer.score_feeds([current], "example.com", force=True) == 1
+    assert current.score == 4
@@ -1,4 +1,20 @@
-from gateway.search import should_run_crawl
+import asyncio
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+from flask import Flask
+from yarl import URL
+
+from gateway.cache import TTLCache
+from gateway.dynamodb_client import AsyncDynamoDBClient, DynamoDBClient
+from gateway.recrawl import RecrawlQueue
+from gateway.schema.customfeedinfo import CustomFeedInfo
+from gateway.schema.hostfailure import HostFailure
+from gateway.schema.sitehost import SiteHost
+from gateway.schema.sitepath import SitePath
+from gateway.scoring import SCORE_VERSION
+from gateway.search import SearchRunner, should_run_crawl
+from gateway.utils import no_response_from_crawl
 
 
 def test_should_run_crawl():
@@ -71,3 +87,271 @@ def test_should_run_crawl():
         )
         == False
     )
+
+
+def save_test_site(db_client: DynamoDBClient, last_seen: datetime) -> None:
+    site = SiteHost(host="test.com", last_seen=last_seen)
+    feeds = [
+        CustomFeedInfo(
+            url=URL(f"https://test.com/{name}.xml"),
+            host="test.com",
+            title=name,
+            last_seen=last_seen,
+        )
+        for name in ["rss", "atom"]
+    ]
+    site.load_feeds(feeds)
+    site_path = SitePath("test.com", "/blog", last_seen, ["https://test.com/atom.xml"])
+    db_client.save_site_feeds(site, feeds, site_path)
+
+
+def test_search_runner_returns_saved_feeds(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    save_test_site(db_client, datetime.now(tzutc()))
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=True,
+    )
+    feeds = runner.run_search(URL("https://www.test.com"))
+    assert {str(feed.url) for feed in feeds} == {
+        "https://test.com/rss.xml",
+        "https://test.com/atom.xml",
+    }
+    assert not runner.crawled
+
+
+def test_search_runner_returns_saved_path_feeds(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    save_test_site(db_client, datetime.now(tzutc()))
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=False,
+    )
+    feeds = runner.run_search(URL("https://test.com/blog"))
+    assert [str(feed.url) for feed in feeds] == ["https://test.com/atom.xml"]
+    assert not runner.crawled
+
+
+def test_search_runner_loads_projected_feeds(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    save_test_site(db_client, datetime.now(tzutc()))
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=True,
+        fields=["url"],
+    )
+    feeds = runner.run_search(URL("https://test.com"))
+    assert {str(feed.url) for feed in feeds} == {
+        "https://test.com/rss.xml",
+        "https://test.com/atom.xml",
+    }
+    assert runner.site.partial
+    assert runner.search_key(URL("https://test.com"))[-1] == ("url",)
+
+
+def test_search_runner_keeps_current_stored_scores(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    now = datetime.now(tzutc())
+    site = SiteHost(host="test.com", last_seen=now)
+    feeds = [
+        CustomFeedInfo(
+            url=URL("https://test.com/current.xml"),
+            host="test.com",
+            last_seen=now,
+            score=99,
+            score_version=SCORE_VERSION,
+        ),
+        CustomFeedInfo(
+            url=URL("https://test.com/stale.xml"),
+            host="test.com",
+            last_seen=now,
+            score=99,
+            score_version=SCORE_VERSION - 1,
+        ),
+    ]
+    site.load_feeds(feeds)
+    db_client.save_site_feeds(site, feeds, SitePath("test.com", "/"))
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=True,
+    )
+    feeds = {str(feed.url): feed for feed in runner.run_search(URL("https://test.com"))}
+    assert feeds["https://test.com/current.xml"].score == 99
+    assert feeds["https://test.com/stale.xml"].score == 6
+    assert feeds["https://test.com/stale.xml"].score_version == SCORE_VERSION
+
+
+def test_search_runner_last_modified(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    last_seen = datetime(2020, 1, 2, 3, 4, 5, tzinfo=tzutc())
+    save_test_site(db_client, last_seen)
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=True,
+    )
+    runner.run_search(URL("https://test.com"))
+    # The site isn't saved without a crawl, so the results are unchanged since the last crawl.
+    assert runner.last_modified == last_seen
+
+
+def test_search_runner_returns_stale_feeds(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    last_seen = datetime(2020, 1, 2, tzinfo=tzutc())
+    save_test_site(db_client, last_seen)
+    recrawl_requests = []
+
+    class RecordingQueue(RecrawlQueue):
+        def enqueue(self, request):
+            recrawl_requests.append(request)
+            return True
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=False,
+        stale_while_revalidate=True,
+        recrawl_queue=RecordingQueue(),
+    )
+    feeds = runner.run_search(URL("https://test.com"))
+    assert len(feeds) == 2
+    assert not runner.crawled
+    assert runner.crawl_stats == {"stale": True, "recrawl_queued": True}
+    assert runner.last_modified == last_seen
+    assert [request.url for request in recrawl_requests] == ["https://test.com"]
+
+
+def test_search_runner_skips_failed_host(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    failure = HostFailure("dead-host.com")
+    failure.add_failure(datetime.now(tzutc()), 300, 86400)
+    db_client.save_host_failure(failure)
+
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        check_feedly=False,
+        force_crawl=False,
+        skip_crawl=False,
+        failure_backoff=300,
+    )
+    feeds = runner.run_search(URL("https://dead-host.com"))
+    assert feeds == []
+    assert not runner.crawled
+    assert runner.crawl_stats["host_failed"]
+    assert runner.crawl_stats["failures"] == 1
+    assert no_response_from_crawl(runner.crawl_stats)
+
+    # Forced searches crawl failed hosts.
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        force_crawl=True,
+        failure_backoff=300,
+    )
+    runner.host_failure = failure
+    assert not runner.should_skip_failed_host()
+
+
+def test_search_runner_updates_host_failure(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table, cache=TTLCache(maxsize=10))
+    runner = SearchRunner(
+        db_client=AsyncDynamoDBClient(db_client),
+        failure_backoff=300,
+        max_failure_backoff=1000,
+    )
+    runner.query_url = URL("https://dead-host.com")
+    runner.crawl_stats = {"status_codes": {408: 2, 499: 1}}
+
+    asyncio.run(runner.update_host_failure())
+    asyncio.run(runner.update_host_failure())
+    asyncio.run(runner.update_host_failure())
+    failure = DynamoDBClient(dynamodb_table).query_host_failure("dead-host.com")
+    assert failure.failures == 3
+    # The window doubles with each failure, up to the maximum.
+    assert failure.retry_after - failure.last_failed == timedelta(seconds=1000)
+
+    runner.crawl_stats = {"status_codes": {200: 1}}
+    asyncio.run(runner.update_host_failure())
+    assert runner.host_failure is None
+    assert db_client.query_host_failure("dead-host.com") is None
+    assert DynamoDBClient(dynamodb_table).query_host_failure("dead-host.com") is None
+
+
+def test_search_runner_only_summarizes_root_crawls(dynamodb_table, monkeypatch):
+    requests = iter([12, 1])
+
+    async def fake_crawl(urls, checkall, url_sources=None, params=None):
+        return [], {"status_codes": {200: 1}, "requests_queued": next(requests)}
+
+    monkeypatch.setattr("gateway.search.crawl", fake_crawl)
+    db_client = DynamoDBClient(dynamodb_table)
+    with Flask(__name__).app_context():
+        for url in ["https://test.com", "https://test.com/blog/post"]:
+            runner = SearchRunner(AsyncDynamoDBClient(db_client), check_feedly=False)
+            runner.run_search(URL(url))
+            assert runner.crawled
+
+    site = DynamoDBClient(dynamodb_table).query_site_feeds("test.com")
+    assert site.crawl_stats["requests"] == 12
+    assert site.crawl_stats["crawls"] == 1
+
+
+def test_search_runner_ignores_responding_host_failures(dynamodb_table):
+    db_client = DynamoDBClient(dynamodb_table)
+    runner = SearchRunner(db_client=AsyncDynamoDBClient(db_client), failure_backoff=300)
+
+    # The host responded, if only with errors.
+    runner.query_url = URL("https://test.com")
+    runner.crawl_stats = {"status_codes": {404: 1, 500: 1}}
+    asyncio.run(runner.update_host_failure())
+    assert db_client.query_host_failure("test.com") is None
+
+    # Crawls of a path that fail to connect aren't recorded.
+    runner.query_url = URL("https://test.com/missing-page")
+    runner.searching_path = True
+    runner.crawl_stats = {"status_codes": {408: 1}}
+    asyncio.run(runner.update_host_failure())
+    assert db_client.query_host_failure("test.com") is None
+
+
+def test_search_runner_records_subdomain_failure(dynamodb_table, monkeypatch):
+    async def fake_crawl(urls, checkall, url_sources=None, params=None):
+        status = 408 if urls[0].host == "blog.test.com" else 200
+        return [], {"status_codes": {status: 1}}
+
+    monkeypatch.setattr("gateway.search.crawl", fake_crawl)
+    db_client = DynamoDBClient(dynamodb_table)
+
+    def search(url: str) -> SearchRunner:
+        runner = SearchRunner(
+            AsyncDynamoDBClient(db_client),
+            check_feedly=False,
+            force_crawl=False,
+            skip_crawl=False,
+            failure_backoff=300,
+        )
+        runner.run_search(URL(url))
+        return runner
+
+    with Flask(__name__).app_context():
+        assert search("https://blog.test.com").crawled
+        assert db_client.query_host_failure("blog.test.com").failures == 1
+        assert db_client.query_host_failure("test.com") is None
+
+        # The failed subdomain isn't crawled again, but the root host still is.
+        assert search("https://blog.test.com").crawl_stats["host_failed"]
+        assert search("https://www.test.com").crawled
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from gateway.singleflight import SingleFlight
+
+
+def test_single_flight_returns_result():
+    flight = SingleFlight()
+    result, shared = flight.do("key", lambda x: x * 2, 2)
+    assert result == 4
+    assert shared is False
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow_search():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "feeds"
+
+    def run():
+        results.append(flight.do("test.com", slow_search))
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    started.wait(5)
+
+    followers = [threading.Thread(target=run) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    # Give the followers time to block on the in-flight call before releasing it.
+    time.sleep(0.1)
+    release.set()
+
+    leader.join(5)
+    for follower in followers:
+        follower.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result == "feeds" for result, _ in results)
+    assert sum(1 for _, shared in results if not shared) == 1
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_shares_exceptions():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing_search():
+        started.set()
+        release.wait(5)
+        raise ValueError("crawl failed")
+
+    def run():
+        try:
+            flight.do("test.com", failing_search)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=run)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2
+    assert flight.in_flight() == 0
+
+    with pytest.raises(ValueError):
+        flight.do("other.com", failing_search)
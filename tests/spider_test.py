@@ -0,0 +1,136 @@
+import asyncio
+
+from aiohttp import web
+from yarl import URL
+
+from gateway.connections import connection_manager
+from gateway.spider import GatewaySpider
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>Late Feed</title>
+<link>http://127.0.0.1/</link>
+<description>A feed that is only found by a URL source</description>
+<item><title>Item</title><link>http://127.0.0.1/item</link></item>
+</channel>
+</rss>"""
+
+
+async def start_server(requested: list = None) -> web.AppRunner:
+    @web.middleware
+    async def record_request(request, handler):
+        if requested is not None:
+            requested.append((request.url.host, request.path))
+        return await handler(request)
+
+    async def index(request):
+        return web.Response(
+            text="<html><body>No links</body></html>", content_type="text/html"
+        )
+
+    async def feed(request):
+        return web.Response(text=RSS, content_type="application/rss+xml")
+
+    app = web.Application(middlewares=[record_request])
+    app.router.add_get("/", index)
+    app.router.add_get("/hidden/feed.xml", feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+
+async def crawl_with_source(base_url: URL, source_delay: float) -> GatewaySpider:
+    async def late_source():
+        await asyncio.sleep(source_delay)
+        return [base_url.with_path("/hidden/feed.xml")]
+
+    spider = GatewaySpider(
+        start_urls=[base_url],
+        concurrency=2,
+        request_timeout=2,
+        total_timeout=5,
+        max_retries=0,
+        delay=0,
+        favicon_data_uri=False,
+    )
+    await spider.crawl(url_sources=[late_source])
+    return spider
+
+
+def test_spider_crawls_urls_from_running_source():
+    runner = connection_manager.run(start_server())
+    base_url = URL(f"http://127.0.0.1:{runner.addresses[0][1]}/")
+    try:
+        # The source returns after the start URL has already been crawled, so the crawl must wait for it.
+        spider = connection_manager.run(crawl_with_source(base_url, 0.3))
+        urls = [str(item.url) for item in spider.items]
+        assert any(url.endswith("/hidden/feed.xml") for url in urls)
+        assert spider.get_stats()["status_codes"].get(200)
+
+        # A second crawl reuses the kept-alive connections of the first.
+        reused = connection_manager.stats()["connections_reused"]
+        connection_manager.run(crawl_with_source(base_url, 0))
+        assert connection_manager.stats()["connections_reused"] > reused
+    finally:
+        connection_manager.run(runner.cleanup())
+        connection_manager.close()
+
+
+def test_spider_expands_source_urls_on_new_host():
+    requested = []
+    runner = connection_manager.run(start_server(requested))
+    port = runner.addresses[0][1]
+
+    async def feedly_source():
+        return [URL(f"http://localhost:{port}/hidden/feed.xml")]
+
+    async def run():
+        spider = GatewaySpider(
+            start_urls=[URL(f"http://127.0.0.1:{port}/")],
+            try_urls=["probe.xml"],
+            crawl_hosts=True,
+            concurrency=2,
+            request_timeout=2,
+            total_timeout=5,
+            max_retries=0,
+            delay=0,
+            favicon_data_uri=False,
+        )
+        await spider.crawl(url_sources=[feedly_source])
+        return spider
+
+    try:
+        spider = connection_manager.run(run())
+    finally:
+        connection_manager.run(runner.cleanup())
+        connection_manager.close()
+
+    assert any(str(item.url).endswith("/hidden/feed.xml") for item in spider.items)
+    # The source's host is crawled for site metadata, and the common feed paths are tried, like the start URLs.
+    assert ("localhost", "/") in requested
+    assert ("localhost", "/probe.xml") in requested
+    assert requested.count(("127.0.0.1", "/")) == 1
+
+
+def test_spider_ignores_failing_source():
+    async def run():
+        async def failing_source():
+            raise ValueError("Feedly failed")
+
+        spider = GatewaySpider(
+            start_urls=[URL("http://127.0.0.1:1/")],
+            concurrency=1,
+            request_timeout=1,
+            total_timeout=2,
+            max_retries=0,
+            delay=0,
+        )
+        await spider.crawl(url_sources=[failing_source])
+        return spider
+
+    # Crawls outside the shared event loop use their own connection pool.
+    spider = asyncio.run(run())
+    assert not spider.items
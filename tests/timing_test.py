@@ -0,0 +1,40 @@
+from gateway.timing import NULL_TIMER, PhaseTimer
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    with timer.phase("db"):
+        pass
+    with timer.phase("crawl"):
+        pass
+    timer.add("db", 2.5)
+
+    assert list(timer.phases) == ["db", "crawl"]
+    assert timer.phases["db"] >= 2.5
+    assert timer.to_dict()["db"] == round(timer.phases["db"], 1)
+
+    timer.phases = {"db": 12.345, "crawl": 800}
+    assert timer.server_timing() == "db;dur=12.3, crawl;dur=800.0"
+
+
+def test_phase_timer_records_failed_phase():
+    timer = PhaseTimer()
+    try:
+        with timer.phase("save"):
+            raise ValueError()
+    except ValueError:
+        pass
+    assert "save" in timer.phases
+
+
+def test_disabled_phase_timer():
+    with NULL_TIMER.phase("db"):
+        pass
+    assert NULL_TIMER.phases == {}
+    assert NULL_TIMER.server_timing() == ""
+
+
+def test_disabled_phase_timer_ignores_added_phases():
+    timer = PhaseTimer(enabled=False)
+    timer.add("search", 12.5)
+    assert timer.phases == {}
@@ -14,6 +14,9 @@ from gateway.utils import (
     has_path,
     validate_query,
     no_response_from_crawl,
+    connection_failed_crawl,
+    validate_fields,
+    validate_limit,
 )
 
 
@@ -144,6 +147,14 @@ def test_validate_query():
         assert isinstance(result, URL)
 
 
+def test_connection_failed_crawl():
+    assert connection_failed_crawl(None) is False
+    assert connection_failed_crawl({"status_codes": {}}) is False
+    assert connection_failed_crawl({"status_codes": {408: 2, 499: 1}}) is True
+    assert connection_failed_crawl({"status_codes": {404: 1}}) is False
+    assert connection_failed_crawl({"status_codes": {408: 1, 403: 1}}) is False
+
+
 def test_no_response_from_crawl():
     assert no_response_from_crawl(None) is False
     assert no_response_from_crawl({}) is False
@@ -152,3 +163,21 @@ def test_no_response_from_crawl():
     assert no_response_from_crawl({"status_codes": [500]}) is False
     assert no_response_from_crawl({"status_codes": {500: 1}}) is True
     assert no_response_from_crawl({"status_codes": {200: 1, 500: 2}}) is False
+
+
+def test_validate_fields():
+    allowed = ["url", "title", "score"]
+    assert validate_fields("", allowed) is None
+    assert validate_fields(" , ", allowed) is None
+    assert validate_fields("url", allowed) == ["url"]
+    assert validate_fields("url, title,url", allowed) == ["url", "title"]
+    with pytest.raises(BadRequestError):
+        validate_fields("url,password", allowed)
+
+
+def test_validate_limit():
+    assert validate_limit("", 100, 1000) == 100
+    assert validate_limit("10", 100, 1000) == 10
+    for limit in ["0", "1001", "-1", "ten"]:
+        with pytest.raises(BadRequestError):
+            validate_limit(limit, 100, 1000)
@@ -0,0 +1,29 @@
+from gateway.timing import PhaseTimer
+from gateway.warmup import run_warm_up
+
+
+def test_run_warm_up():
+    ran = []
+
+    def fail():
+        ran.append("fail")
+        raise ValueError("failed")
+
+    timer = PhaseTimer()
+    results = run_warm_up(
+        {
+            "db": lambda: ran.append("db") or 2,
+            "fail": fail,
+            "templates": lambda: ran.append("templates"),
+        },
+        timer,
+    )
+
+    assert ran == ["db", "fail", "templates"]
+    assert list(timer.phases) == ["db", "fail", "templates"]
+    assert results["db"]["ok"] is True
+    assert results["db"]["result"] == 2
+    assert results["db"]["duration_ms"] == round(timer.phases["db"], 1)
+    assert results["fail"]["ok"] is False
+    assert "failed" in results["fail"]["error"]
+    assert "result" not in results["templates"]